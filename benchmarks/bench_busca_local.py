@@ -0,0 +1,85 @@
+"""
+Busca local (troca/realocação) após o guloso: cobertura ganha por segundo.
+
+Para cada orçamento de câmeras, executa o guloso e em seguida
+`melhorar_por_busca_local` com cada tempo limite, em série e (com
+`--trabalhadores`) em pool de threads e de processos. Mostra a cobertura
+gulosa, a cobertura após a busca, o ganho, o tempo gasto, o ganho por
+segundo e os movimentos aceitos. Com `--dados` usa a base real (planilhas de
+`data/`, incluindo pontos mínimos sem RED); sem ele, uma base sintética.
+
+O pool só compensa quando cada câmera dá trabalho suficiente para cobrir a
+sincronização por lote: com vários núcleos e `--candidatos` na casa das
+centenas. Com o padrão de 64 candidatos, a busca em série costuma convergir
+antes, e as threads não passam da série por causa do GIL.
+
+Uso: python -m benchmarks.bench_busca_local --dados data [--orcamentos 500 1000] [--tempos 1 5 30]
+     python -m benchmarks.bench_busca_local --candidatos 64 512 --trabalhadores 8
+"""
+
+import argparse
+import itertools
+import time
+from pathlib import Path
+
+from benchmarks.sintetico import gerar_base
+from motor.busca_local import POOLS_BUSCA_LOCAL, melhorar_por_busca_local
+from motor.cobertura import RAIO_COBERTURA_PADRAO
+from motor.dados import carregar_dados
+from motor.ipe import ModeloIPE
+from motor.otimizador import MODO_IPE, MODOS_OTIMIZADOR, filtrar_por_cobertura_e_distancia
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dados', type=Path, help="diretório com as planilhas (base real)")
+    parser.add_argument('--cruzamentos', type=int, default=5_000, help="tamanho da base sintética")
+    parser.add_argument('--orcamentos', type=int, nargs='+', default=[500, 1000])
+    parser.add_argument('--dist-min', type=float, default=300)
+    parser.add_argument('--tempos', type=float, nargs='+', default=[1, 5, 30])
+    parser.add_argument('--modo', choices=MODOS_OTIMIZADOR, default=MODO_IPE)
+    parser.add_argument('--candidatos', type=int, nargs='+', default=[64],
+                        help="cruzamentos livres considerados para troca a cada rodada")
+    parser.add_argument('--trabalhadores', type=int, help="também mede os pools com N trabalhadores")
+    args = parser.parse_args()
+
+    pontos_minimos, matriz = None, None
+    if args.dados is not None:
+        dados = carregar_dados(args.dados)
+        if dados.modelo_ipe is None or dados.modelo_ipe.vazio:
+            parser.error(f"nenhum cruzamento válido em {args.dados}")
+        logs, df = dados.logs, dados.modelo_ipe.calcular(0.15, 0.30, 0.15, 0.40)
+        pontos_minimos = dados.pontos_minimos(False)
+        pontos_minimos = pontos_minimos if not pontos_minimos.empty else None
+        matriz = dados.matriz_cobertura(RAIO_COBERTURA_PADRAO)
+        origem = f"base real ({args.dados})"
+    else:
+        logs, cruzamentos = gerar_base(args.cruzamentos)
+        df = ModeloIPE(logs, cruzamentos).calcular(0.15, 0.30, 0.15, 0.40)
+        origem = "base sintética"
+
+    pools = [None] + (list(POOLS_BUSCA_LOCAL) if args.trabalhadores else [])
+    print(f"{origem}: {len(df):,} cruzamentos, distância mínima {args.dist_min:.0f} m, modo {args.modo}")
+    print(f"{'câmeras':>8} {'limite':>7} {'cand.':>6} {'execução':>10} {'guloso':>8} {'busca':>8} {'ganho':>8} "
+          f"{'tempo':>8} {'ganho/s':>9} {'trocas':>7} {'realoc.':>8}  status")
+    for orcamento in args.orcamentos:
+        inicio = time.perf_counter()
+        guloso = filtrar_por_cobertura_e_distancia(
+            df, 1.0, args.dist_min, None, RAIO_COBERTURA_PADRAO, None, pontos_minimos, orcamento, logs,
+            modo=args.modo, matriz_cobertura=matriz
+        )
+        print(f"{orcamento:>8} {'':>7} {'':>6} {'guloso':>10} {guloso[1] * 100:>7.1f}% {'':>8} {'':>8} "
+              f"{time.perf_counter() - inicio:>7.2f}s")
+        for tempo_limite, candidatos, pool in itertools.product(args.tempos, args.candidatos, pools):
+            _, info = melhorar_por_busca_local(
+                df, guloso, args.dist_min, 1.0, RAIO_COBERTURA_PADRAO, logs, matriz_cobertura=matriz,
+                tempo_limite=tempo_limite, candidatos_troca=candidatos, pool=pool, trabalhadores=args.trabalhadores
+            )
+            print(f"{orcamento:>8} {tempo_limite:>6.0f}s {candidatos:>6} {pool or 'série':>10} "
+                  f"{info['cobertura_inicial'] * 100:>7.1f}% {info['cobertura'] * 100:>7.1f}% "
+                  f"{info['ganho'] * 100:>6.2f}pp {info['segundos']:>7.2f}s {info['ganho_por_segundo'] * 100:>6.2f}pp/s "
+                  f"{info['trocas']:>7} {info['realocacoes']:>8}  {info['status']}")
+
+
+if __name__ == '__main__':
+    main()
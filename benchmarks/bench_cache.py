@@ -0,0 +1,53 @@
+"""
+Tempo de carga fria (planilha) e quente (cache Parquet) das entradas.
+
+Gera uma planilha sintética no layout de Cruzamentos.xlsx, carrega-a pela
+primeira vez (lendo o Excel e gravando o cache) e depois novamente (servida
+do Parquet).
+Também mostra a invalidação quando a planilha é substituída.
+
+Uso: python -m benchmarks.bench_cache [--linhas 20000]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.sintetico import escrever_planilha_cruzamentos, gerar_base
+from motor.cache_dados import CacheDados
+from motor.dados import carregar_excel_cruzamentos
+
+
+def cronometrar(cache: CacheDados, caminho: Path) -> tuple:
+    inicio = time.perf_counter()
+    cache.carregar(caminho, carregar_excel_cruzamentos)
+    return time.perf_counter() - inicio, cache.tempos[-1]['origem']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        planilha = tmp / "Cruzamentos.xlsx"
+        logs, cruzamentos = gerar_base(args.linhas)
+        escrever_planilha_cruzamentos(logs, cruzamentos, planilha)
+
+        cache = CacheDados(tmp / ".cache")
+        print(f"{'carga':<28} {'origem':<10} {'tempo':>10}")
+        for rotulo in ("fria", "quente"):
+            segundos, origem = cronometrar(cache, planilha)
+            print(f"{rotulo:<28} {origem:<10} {segundos * 1000:>8.1f}ms")
+
+        # Substitui a planilha: o cache precisa ser invalidado
+        escrever_planilha_cruzamentos(logs, cruzamentos.head(args.linhas // 2), planilha)
+        for rotulo in ("após substituir a planilha", "quente"):
+            segundos, origem = cronometrar(cache, planilha)
+            print(f"{rotulo:<28} {origem:<10} {segundos * 1000:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Pontos com câmera no mapa: um CircleMarker por ponto x uma camada GeoJSON.
+
+Para cada quantidade de pontos em `--pontos`, monta o mapa dos dois jeitos
+(marcadores individuais com popup HTML, como antes, e a camada única de
+`pontos_geojson` em canvas com popups montados no navegador) e mede o tempo de
+montagem + renderização do HTML em Python, o tamanho do HTML enviado ao
+`st_folium` e quantos objetos Leaflet a página cria ao carregar. Os pontos
+vêm de uma base sintética; 10% deles são pontos mínimos.
+
+Uso: python -m benchmarks.bench_camada_pontos [--pontos 500 2000 10000] [--repeticoes 3]
+"""
+
+import argparse
+import time
+import warnings
+
+import folium
+import numpy as np
+import pandas as pd
+
+from benchmarks.sintetico import gerar_base
+from mapa import criar_camada_cameras
+
+
+def gerar_pontos(qtd: int) -> tuple:
+    """(cruzamentos selecionados, pontos mínimos) com `qtd` pontos no total"""
+    _, cruzamentos = gerar_base(qtd)
+    rng = np.random.default_rng(0)
+    cruzamentos['ipe_cruz'] = rng.random(len(cruzamentos))
+    qtd_minimos = qtd // 10
+    minimos = cruzamentos.iloc[:qtd_minimos][['lat', 'lon', 'log1']].rename(columns={'log1': 'logradouro'})
+    minimos['tipo'] = np.where(rng.random(qtd_minimos) < 0.5, 'RED', 'COP')
+    minimos['prioridade'] = rng.integers(1, 5, qtd_minimos)
+    minimos['cameras'] = rng.integers(1, 4, qtd_minimos)
+    minimos['is_red'] = minimos['tipo'] == 'RED'
+    return cruzamentos.iloc[qtd_minimos:].reset_index(drop=True), minimos.reset_index(drop=True)
+
+
+def mapa_marcadores(selecionados: pd.DataFrame, minimos: pd.DataFrame) -> folium.Map:
+    """Caminho anterior de `criar_mapa`: um CircleMarker com Popup por ponto"""
+    m = folium.Map(location=[-8.05, -34.95], zoom_start=12)
+    for _, p in minimos.iterrows():
+        red = p['is_red']
+        cor = "#10b981" if red else "#f6443b"
+        titulo = "📍 PONTO RED (Concessão)" if red else "📍 PONTO OBRIGATÓRIO"
+        popup_html = f"""<div style="font-size:0.8rem; min-width:180px;">
+            <strong>{titulo}</strong><br/>
+            <b>Motivo:</b> {p['tipo']}<br/>
+            <b>Logradouro:</b> {p['logradouro']}<br/>
+            <b>Prioridade:</b> {p['prioridade']}<br/>
+            <b>Câmeras:</b> {p['cameras']}
+        </div>"""
+        folium.CircleMarker(location=[p['lat'], p['lon']], radius=3, color=cor, fill=True, fillColor=cor,
+                            fillOpacity=0.8, weight=2, popup=folium.Popup(popup_html, max_width=250)).add_to(m)
+    for _, c in selecionados.iterrows():
+        popup_html = f"""<div style="font-size:0.8rem; min-width:180px;">
+            <strong>Cruzamento {int(c['id'])}</strong><br/>
+            <b>Ruas:</b> {c['log1']} x {c['log2']}<br/>
+            <b>IPE:</b> {c['ipe_cruz']:.4f}<br/>
+        </div>"""
+        folium.CircleMarker(location=[c['lat'], c['lon']], radius=3, color="#3b82f6", fill=True,
+                            fillColor="#3b82f6", fillOpacity=0.8, weight=1,
+                            popup=folium.Popup(popup_html, max_width=250)).add_to(m)
+    return m
+
+
+def mapa_camada(selecionados: pd.DataFrame, minimos: pd.DataFrame) -> folium.Map:
+    """Caminho atual do app (`mapa.criar_camada_cameras`): uma camada GeoJSON em canvas"""
+    m = folium.Map(location=[-8.05, -34.95], zoom_start=12, prefer_canvas=True)
+    criar_camada_cameras(selecionados, minimos).add_to(m)
+    return m
+
+
+def medir(montar, selecionados, minimos, repeticoes: int) -> tuple:
+    """(menor tempo de montagem + renderização em s, HTML)"""
+    melhor, html = float('inf'), ''
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        html = montar(selecionados, minimos).get_root().render()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, html
+
+
+def objetos_leaflet(html: str) -> int:
+    """Objetos criados ao carregar a página: marcadores, popups e camadas GeoJSON"""
+    return sum(html.count(construtor) for construtor in ('L.circleMarker(', 'L.popup(', 'L.geoJson('))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pontos', type=int, nargs='+', default=[500, 2_000, 10_000])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore', category=UserWarning)
+
+    print(f"{'pontos':>7} {'modo':>11} {'tempo':>9} {'HTML':>10} {'objetos':>8}")
+    for qtd in args.pontos:
+        selecionados, minimos = gerar_pontos(qtd)
+        for nome, montar in (("marcadores", mapa_marcadores), ("camada", mapa_camada)):
+            segundos, html = medir(montar, selecionados, minimos, args.repeticoes)
+            print(f"{qtd:>7,} {nome:>11} {segundos * 1000:>6.0f} ms {len(html) / 1e6:>7.2f} MB "
+                  f"{objetos_leaflet(html):>8,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Exportação: CSV anterior (cópia + `apply` por célula) x CSV vetorizado em
+blocos, e tamanho/tempo do Parquet, GeoJSON e GeoPackage das câmeras.
+
+O caminho anterior (`gerar_csv_download`) copiava a tabela inteira, marcava a
+seleção com um `apply` sobre os ids e formatava cinco colunas com um
+`apply(lambda x: f"{x:.6f}")` por célula, a cada rerun, mesmo sem clique.
+Mede tempo, pico de memória (tracemalloc, em uma execução separada) e confere que os bytes são
+idênticos. Os três formatos das câmeras são medidos para `--cameras` pontos
+selecionados (os de maior IPE). Bases sintéticas de cada tamanho em
+`--tamanhos`.
+
+Uso: python -m benchmarks.bench_exportacao [--tamanhos 20000 100000] [--cameras 500 5000]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.sintetico import gerar_base
+from motor.exportacao import (
+    COLUNAS_CSV, COLUNAS_SEIS_CASAS, gerar_csv, gerar_geojson, gerar_geopackage, gerar_parquet, tabela_cameras
+)
+from motor.ipe import ModeloIPE
+
+PESOS_PADRAO = [0.15, 0.30, 0.15, 0.40]
+
+
+def csv_antes(df_calculados: pd.DataFrame, df_selecionados: pd.DataFrame) -> bytes:
+    """Caminho anterior de `gerar_csv_download`"""
+    if df_calculados.empty:
+        return b""
+    ids_sel = set(df_selecionados['id'].values) if not df_selecionados.empty else set()
+    df_export = df_calculados.copy()
+    df_export['selecionado_no_mapa'] = df_export['id'].apply(lambda x: 1 if x in ids_sel else 0)
+    df_export = df_export[COLUNAS_CSV]
+    for col in COLUNAS_SEIS_CASAS:
+        df_export[col] = df_export[col].apply(lambda x: f"{x:.6f}")
+    return df_export.to_csv(index=False, sep=';').encode('utf-8')
+
+
+def medir(funcao, *args, repeticoes: int = 3) -> tuple:
+    """(menor tempo em s, pico de memória em bytes numa execução à parte, resultado)"""
+    segundos = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        segundos = min(segundos, time.perf_counter() - inicio)
+    tracemalloc.start()
+    funcao(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[20_000, 100_000])
+    parser.add_argument('--cameras', type=int, nargs='+', default=[500, 5_000])
+    args = parser.parse_args()
+
+    for tamanho in args.tamanhos:
+        logs, cruzamentos = gerar_base(tamanho)
+        df = ModeloIPE(logs, cruzamentos).calcular(*PESOS_PADRAO)
+        selecionados = df.head(min(args.cameras))
+
+        print(f"\n{tamanho:,} cruzamentos")
+        s_antes, pico_antes, antes = medir(csv_antes, df, selecionados)
+        s_depois, pico_depois, depois = medir(lambda: gerar_csv(df, selecionados).getvalue())
+        print(f"  CSV ({len(depois) / 1e6:.1f} MB, {'idêntico' if antes == depois else 'DIFERENTE'}): "
+              f"antes {s_antes * 1000:.0f} ms / pico {pico_antes / 1e6:.0f} MB, "
+              f"depois {s_depois * 1000:.0f} ms / pico {pico_depois / 1e6:.0f} MB ({s_antes / s_depois:.1f}x)")
+        print(f"  rerun sem clique: antes {s_antes * 1000:.0f} ms, depois 0 ms (gerado só no download)")
+
+        for cameras in args.cameras:
+            tabela = tabela_cameras(df.head(cameras))
+            linha = []
+            for rotulo, gerar in (("Parquet", gerar_parquet), ("GeoJSON", gerar_geojson),
+                                  ("GeoPackage", gerar_geopackage)):
+                inicio = time.perf_counter()
+                conteudo = gerar(tabela)
+                linha.append(f"{rotulo} {len(conteudo) / 1e3:,.0f} kB / {(time.perf_counter() - inicio) * 1000:.0f} ms")
+            print(f"  {cameras:,} câmeras: " + ", ".join(linha))
+
+
+if __name__ == '__main__':
+    main()
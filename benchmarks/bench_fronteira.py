@@ -0,0 +1,108 @@
+"""
+Limites e máscara do Recife: recálculo a cada rerun x geometria pré-calculada.
+
+Antes, `criar_mapa` percorria todas as features do GeoJSON para achar os
+limites e refazia `shape`, `unary_union` e a diferença com o retângulo
+externo a cada rerun. Mede esse caminho contra o mapa montado a partir de
+`FronteiraRecife` (sem geometria no rerun), o cálculo da fronteira e a sua
+leitura do cache em disco, além do tamanho do HTML do mapa com a máscara
+original e a simplificada.
+
+Uso: python -m benchmarks.bench_fronteira --dados data [--repeticoes 5]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import folium
+from shapely.geometry import box, shape
+from shapely.ops import unary_union
+
+from mapa import criar_mapa_base
+from motor.dados import NOMES_ARQUIVOS
+from motor.fronteira import CAIXA_EXTERNA, FronteiraRecife, obter_fronteira
+
+
+def mapa_base(limites, centro) -> folium.Map:
+    m = folium.Map(location=centro, zoom_start=12, tiles='CartoDB positron', min_zoom=11, max_zoom=18,
+                   max_bounds=True)
+    m.fit_bounds(limites)
+    return m
+
+
+def adicionar_mascara(m: folium.Map, mascara: dict):
+    folium.GeoJson(mascara, style_function=lambda x: {'fillColor': '#000000', 'color': 'transparent',
+                                                      'weight': 0, 'fillOpacity': 0.7}).add_to(m)
+
+
+def mapa_antes(bairros: dict) -> folium.Map:
+    """Caminho anterior de `criar_mapa`: limites e máscara recalculados"""
+    coords = []
+    for feature in bairros.get('features', []):
+        geom = feature.get('geometry', {})
+        if geom.get('type') == 'Polygon':
+            for anel in geom['coordinates']:
+                coords.extend(anel)
+        elif geom.get('type') == 'MultiPolygon':
+            for poligono in geom['coordinates']:
+                for anel in poligono:
+                    coords.extend(anel)
+    lons = [c[0] for c in coords]
+    lats = [c[1] for c in coords]
+    m = mapa_base([[min(lats), min(lons)], [max(lats), max(lons)]],
+                  [(min(lats) + max(lats)) / 2, (min(lons) + max(lons)) / 2])
+    recife = unary_union([shape(feature['geometry']) for feature in bairros.get('features', [])])
+    mascara = box(*CAIXA_EXTERNA).difference(recife)
+    adicionar_mascara(m, {'type': 'Feature', 'geometry': mascara.__geo_interface__})
+    return m
+
+
+def mapa_depois(fronteira: FronteiraRecife) -> folium.Map:
+    """Caminho atual do app (`mapa.criar_mapa_base`), com os níveis de detalhe por zoom"""
+    return criar_mapa_base(fronteira=fronteira, pontos_em_camada=False)
+
+
+def medir(funcao, repeticoes: int) -> tuple:
+    """(menor tempo em s, último resultado)"""
+    melhor, resultado = float('inf'), None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dados', type=Path, default=Path('data'), help="diretório com o GeoJSON de bairros")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    caminho = args.dados / NOMES_ARQUIVOS['bairros']
+    with open(caminho, 'r', encoding='utf-8') as f:
+        bairros = json.load(f)
+
+    segundos_construir, fronteira = medir(lambda: FronteiraRecife.construir(bairros), args.repeticoes)
+    with tempfile.TemporaryDirectory() as tmp:
+        obter_fronteira(bairros, tmp)
+        segundos_cache, _ = medir(lambda: obter_fronteira(bairros, tmp), args.repeticoes)
+    original, simplificada = fronteira.vertices_mascara
+    print(f"{caminho}: {len(bairros.get('features', []))} features")
+    print(f"  fronteira: cálculo {segundos_construir * 1000:.1f} ms, leitura do cache {segundos_cache * 1000:.1f} ms, "
+          f"máscara com {original:,} → {simplificada:,} vértices")
+
+    segundos_antes, m_antes = medir(lambda: mapa_antes(bairros), args.repeticoes)
+    segundos_depois, m_depois = medir(lambda: mapa_depois(fronteira), args.repeticoes)
+    print(f"  criar_mapa (limites + máscara): antes {segundos_antes * 1000:.1f} ms, "
+          f"depois {segundos_depois * 1000:.1f} ms ({segundos_antes / segundos_depois:.0f}x)")
+
+    html_antes = len(m_antes.get_root().render())
+    html_depois = len(m_depois.get_root().render())
+    print(f"  HTML do mapa: {html_antes / 1e3:.0f} kB → {html_depois / 1e3:.0f} kB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Custo de recálculo do IPE a cada mudança de peso (slider).
+
+Compara o cálculo linha a linha (iterrows, implementação anterior) com o
+ModeloIPE, que só faz produto matriz–vetor + ordenação por mudança de peso.
+
+Uso: python -m benchmarks.bench_ipe [--tamanhos 10000 100000] [--repeticoes 20]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.sintetico import gerar_base
+from motor.ipe import ModeloIPE
+
+
+def ipe_por_linha(logs: pd.DataFrame, cruzamentos: pd.DataFrame, w_seg, w_lct, w_com, w_mob) -> pd.DataFrame:
+    """Cálculo anterior: uma iteração Python por cruzamento"""
+    logs_dict = logs.set_index('cod_log').to_dict('index')
+    resultados = []
+    for _, c in cruzamentos.iterrows():
+        cod1, cod2 = c['cod_log1'], c['cod_log2']
+        if cod1 not in logs_dict or cod2 not in logs_dict:
+            continue
+        l1, l2 = logs_dict[cod1], logs_dict[cod2]
+        ipe1 = w_seg * l1['seg'] + w_lct * l1['lct'] + w_com * l1['com'] + w_mob * l1['mob']
+        ipe2 = w_seg * l2['seg'] + w_lct * l2['lct'] + w_com * l2['com'] + w_mob * l2['mob']
+        resultados.append({'id': c['id'], 'ipe_cruz': ipe1 + ipe2})
+    return pd.DataFrame(resultados).sort_values('ipe_cruz', ascending=False)
+
+
+def medir(funcao, repeticoes: int) -> float:
+    """Tempo médio (s) por chamada"""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"{'cruzamentos':>12} {'por linha':>12} {'modelo (build)':>15} {'modelo/slider':>14} {'ganho':>8}")
+    for n in args.tamanhos:
+        logs, cruzamentos = gerar_base(n)
+        pesos = rng.dirichlet(np.ones(4))
+
+        t_linha = medir(lambda: ipe_por_linha(logs, cruzamentos, *pesos), 1)
+        t_build = medir(lambda: ModeloIPE(logs, cruzamentos), 3)
+        modelo = ModeloIPE(logs, cruzamentos)
+        t_slider = medir(lambda: modelo.calcular(*rng.dirichlet(np.ones(4))), args.repeticoes)
+
+        print(f"{n:>12,} {t_linha * 1000:>10.1f}ms {t_build * 1000:>13.1f}ms "
+              f"{t_slider * 1000:>12.2f}ms {t_linha / t_slider:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
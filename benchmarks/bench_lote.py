@@ -0,0 +1,57 @@
+"""
+Escalabilidade da execução em lote de cenários.
+
+Gera uma base sintética no layout de Cruzamentos.xlsx, executa a mesma grade
+de cenários com quantidades crescentes de processos e compara o tempo total
+com a execução serial. O cache de cenários em disco fica desligado para que
+todos os cenários sejam de fato calculados. Uma execução de aquecimento grava
+antes os caches Parquet e de cobertura, para que a leitura da planilha não
+entre no tempo serial.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.sintetico import escrever_planilha_cruzamentos, gerar_base
+from motor.lote import executar_grade, expandir_grade
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cruzamentos', type=int, default=5_000)
+    parser.add_argument('--processos', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    grade = {
+        'dist_min': [200, 300, 400, 500],
+        'max_cameras': {'inicio': 250, 'fim': 1000, 'passo': 250},
+        'pesos': {'padrao': [15, 30, 15, 40], 'seguranca': [40, 20, 20, 20]},
+    }
+    cenarios = expandir_grade(grade)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        logs, cruzamentos = gerar_base(args.cruzamentos)
+        escrever_planilha_cruzamentos(logs, cruzamentos, data_dir / "Cruzamentos.xlsx")
+
+        # Aquecimento: leitura da planilha e gravação dos caches fora da medição
+        executar_grade(cenarios[:1], data_dir, processos=1)
+
+        print(f"{len(cenarios)} cenários, {args.cruzamentos:,} cruzamentos, {os.cpu_count()} núcleos")
+        print(f"{'processos':>10} {'tempo':>10} {'ganho':>8} {'eficiência':>11}")
+        t_serial = None
+        for processos in args.processos:
+            inicio = time.perf_counter()
+            executar_grade(cenarios, data_dir, processos=processos)
+            tempo = time.perf_counter() - inicio
+            t_serial = t_serial or tempo
+            ganho = t_serial / tempo
+            print(f"{processos:>10} {tempo:>9.1f}s {ganho:>7.2f}x {ganho / processos * 100:>10.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Atualização do mapa ao mover o orçamento: mapa inteiro x base fixa + camada.
+
+Simula uma sequência de reruns em que o orçamento de câmeras muda pouco a
+pouco (`--orcamentos`). Antes, cada rerun montava um `folium.Map` novo com
+tiles, máscara, borda dos bairros e câmeras, e o `st_folium` remontava o
+mapa inteiro no navegador. Agora a base é idêntica entre reruns (mesmo hash
+de script no `st_folium`, sem remontar) e só o FeatureGroup das câmeras é
+reexecutado. Mede, por rerun, o tempo em Python e o JavaScript que o
+navegador precisa executar, além de quantos pontos entram e saem.
+
+Monta a base e a camada com as mesmas funções do app (`mapa.criar_mapa_base`
+e `mapa.criar_camada_cameras`, com os níveis de detalhe por zoom) e usa
+funções internas do `streamlit_folium` (`_get_map_string`,
+`_get_feature_group_string`, `generate_js_hash`) para reproduzir o que o
+componente recebe.
+
+Uso: python -m benchmarks.bench_mapa_incremental --dados data [--orcamentos 500 510 520 540 580]
+"""
+
+import argparse
+import json
+import time
+import warnings
+from pathlib import Path
+
+import streamlit_folium
+
+from mapa import criar_camada_cameras, criar_mapa_base
+from motor.cobertura import RAIO_COBERTURA_PADRAO
+from motor.dados import carregar_dados
+from motor.otimizador import filtrar_por_cobertura_e_distancia
+
+PESOS_PADRAO = [0.15, 0.30, 0.15, 0.40]
+
+
+def rerun_antes(dados, selecionados, minimos) -> tuple:
+    """(hash do script, bytes executados no navegador): mapa inteiro, remontado a cada rerun"""
+    m = criar_mapa_base(dados.bairros_geojson, dados.fronteira)
+    criar_camada_cameras(selecionados, minimos).add_to(m)
+    m.get_root().render()
+    script = streamlit_folium._get_map_string(m)
+    return streamlit_folium.generate_js_hash(script, None), len(script)
+
+
+def rerun_depois(dados, selecionados, minimos) -> tuple:
+    """(hash do script, bytes executados no navegador): base fixa + troca do FeatureGroup"""
+    m = criar_mapa_base(dados.bairros_geojson, dados.fronteira)
+    m.get_root().render()
+    script = streamlit_folium._get_map_string(m)
+    grupo = streamlit_folium._get_feature_group_string(criar_camada_cameras(selecionados, minimos), map=m)
+    return streamlit_folium.generate_js_hash(script, 'mapa_principal'), len(grupo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dados', type=Path, default=Path('data'), help="diretório com as planilhas")
+    parser.add_argument('--orcamentos', type=int, nargs='+', default=[500, 510, 520, 540, 580])
+    parser.add_argument('--dist-min', type=float, default=300)
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore', category=UserWarning)
+
+    dados = carregar_dados(args.dados)
+    if dados.modelo_ipe is None or dados.modelo_ipe.vazio or dados.fronteira is None:
+        parser.error(f"base sem cruzamentos ou sem {args.dados / 'bairros.geojson'}")
+    df = dados.modelo_ipe.calcular(*PESOS_PADRAO)
+    pontos_minimos = dados.pontos_minimos(False)
+    pontos_minimos = pontos_minimos if not pontos_minimos.empty else None
+    matriz = dados.matriz_cobertura(RAIO_COBERTURA_PADRAO)
+
+    print(f"{'orçamento':>9} {'pontos':>7} {'+/-':>9} {'antes':>18} {'depois':>28}")
+    hash_anterior = {}
+    ids_anteriores = set()
+    for orcamento in args.orcamentos:
+        selecionados, _, _, _, _, minimos, _ = filtrar_por_cobertura_e_distancia(
+            df, 1.0, args.dist_min, None, RAIO_COBERTURA_PADRAO, None, pontos_minimos, orcamento, dados.logs,
+            matriz_cobertura=matriz
+        )
+        ids = set(selecionados['id'])
+        entram, saem = len(ids - ids_anteriores), len(ids_anteriores - ids)
+        ids_anteriores = ids
+
+        colunas = []
+        for modo, rerun in (('antes', rerun_antes), ('depois', rerun_depois)):
+            inicio = time.perf_counter()
+            hash_script, executado = rerun(dados, selecionados, minimos)
+            segundos = time.perf_counter() - inicio
+            remonta = hash_anterior.get(modo) != hash_script
+            hash_anterior[modo] = hash_script
+            colunas.append(f"{segundos * 1000:>5.0f} ms {executado / 1e3:>6.0f} kB"
+                           f"{' (remonta)' if remonta else ' (camada) ':>11}")
+        print(f"{orcamento:>9} {len(ids) + (0 if minimos is None else len(minimos)):>7} "
+              f"{f'+{entram}/-{saem}':>9} {colunas[0]} {colunas[1]}")
+
+    print(json.dumps({f'nivel_zoom_{nivel.zoom_min}_kB': nivel.bytes / 1e3 for nivel in dados.fronteira.niveis}))
+
+
+if __name__ == '__main__':
+    main()
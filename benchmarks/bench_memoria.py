@@ -0,0 +1,84 @@
+"""
+Memória das estruturas de cruzamentos do otimizador (tracemalloc).
+
+Compara o layout anterior (dicionário por cruzamento, dicionários por
+`cod_log` e índice espacial com uma tupla por cruzamento) com a
+`TabelaCruzamentos` + `MatrizCobertura` (arrays contíguos e CSR), e mede o
+pico de memória de uma execução completa do otimizador.
+
+Uso: python -m benchmarks.bench_memoria [--cruzamentos 100000]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.sintetico import gerar_base
+from motor.cobertura import MatrizCobertura
+from motor.geo import IndiceEspacial
+from motor.ipe import ModeloIPE
+from motor.otimizador import filtrar_por_cobertura_e_distancia
+from motor.tabela_cruzamentos import TabelaCruzamentos
+
+
+def estruturas_dicionarios(df, raio: float) -> tuple:
+    """Layout anterior: o que o otimizador montava antes de percorrer os cruzamentos"""
+    ipe_total_por_log = {}
+    cruz_por_id = {}
+    indice_cruzamentos = IndiceEspacial(raio)
+    for _, c in df.iterrows():
+        cod1, cod2, ipe = c['cod_log1'], c['cod_log2'], c['ipe_cruz']
+        ipe_total_por_log[cod1] = ipe_total_por_log.get(cod1, 0) + ipe
+        ipe_total_por_log[cod2] = ipe_total_por_log.get(cod2, 0) + ipe
+        cruz_por_id[c['id']] = {
+            'lat': c['lat'], 'lon': c['lon'], 'ipe': ipe,
+            'cod_log1': cod1, 'cod_log2': cod2
+        }
+        indice_cruzamentos.inserir(c['id'], c['lat'], c['lon'])
+    ipe_por_logradouro = dict(ipe_total_por_log)
+    return cruz_por_id, indice_cruzamentos, ipe_total_por_log, ipe_por_logradouro
+
+
+def estruturas_arrays(df, raio: float) -> tuple:
+    return TabelaCruzamentos(df), MatrizCobertura.construir(df, raio)
+
+
+def medir(funcao, *args) -> tuple:
+    """(segundos, MB retidos pelo resultado, MB de pico)"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    segundos = time.perf_counter() - inicio
+    retido, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return segundos, retido / 2**20, pico / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cruzamentos', type=int, default=100_000)
+    parser.add_argument('--raio', type=float, default=50)
+    parser.add_argument('--max-cameras', type=int, default=4000)
+    args = parser.parse_args()
+
+    logs, cruzamentos = gerar_base(args.cruzamentos)
+    df = ModeloIPE(logs, cruzamentos).calcular(0.15, 0.30, 0.15, 0.40)
+
+    print(f"{len(df):,} cruzamentos, raio {args.raio:.0f} m")
+    print(f"{'estruturas':<28} {'tempo':>9} {'retido':>10} {'pico':>10}")
+    medidas = {}
+    for rotulo, funcao in [('dicionários (anterior)', estruturas_dicionarios), ('arrays + CSR', estruturas_arrays)]:
+        segundos, retido, pico = medir(funcao, df, args.raio)
+        medidas[rotulo] = retido
+        print(f"{rotulo:<28} {segundos:>8.2f}s {retido:>8.1f}MB {pico:>8.1f}MB")
+    print(f"redução da memória retida: {medidas['dicionários (anterior)'] / medidas['arrays + CSR']:.1f}x")
+
+    segundos, _, pico = medir(
+        filtrar_por_cobertura_e_distancia, df, 1.0, 100, None, args.raio, None, None, args.max_cameras, logs
+    )
+    print(f"\notimizador até {args.max_cameras:,} câmeras: {segundos:.2f}s, pico {pico:.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Métricas por logradouro (sinistros, CVP, vias prioritárias): índice x tabelas.
+
+Compara as três funções `verificar_*_por_logradouro`, que normalizam os
+nomes a cada chamada, com o `IndiceLogradouros` montado uma vez no
+carregamento e consultado a cada rerun (uma chamada devolve as três
+métricas). Bases sintéticas de cada tamanho em `--tamanhos`, com uma fração
+`--cobertos` dos cruzamentos cobertos.
+
+Uso: python -m benchmarks.bench_metricas --tamanhos 5000 20000 100000 [--cobertos 1.0]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.sintetico import gerar_base
+from motor.metricas import (
+    IndiceLogradouros, verificar_cvp_por_logradouro, verificar_sinistros_por_logradouro,
+    verificar_vias_prioritarias_por_logradouro
+)
+
+
+def tabelas_alvo(logs: pd.DataFrame, seed: int = 0) -> dict:
+    """Sinistros, CVP e vias prioritárias em frações dos logradouros, com nomes em caixa mista"""
+    rng = np.random.default_rng(seed + 3)
+    nomes = logs['nome'].str.title()
+
+    def amostra(fracao):
+        return nomes.sample(frac=fracao, random_state=int(rng.integers(1 << 31))).to_numpy()
+
+    sinistros = amostra(0.3)
+    cvp = amostra(0.5)
+    vias = amostra(0.05)
+    return {
+        'sinistros': pd.DataFrame({'logradouro': sinistros, 'qtd': rng.integers(1, 50, len(sinistros))}),
+        'cvp': pd.DataFrame({'logradouro': cvp, 'cvp': rng.integers(1, 50, len(cvp))}),
+        'vias_prioritarias': pd.DataFrame({'logradouro': vias, 'prioridade': rng.integers(1, 9, len(vias))}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[5_000, 20_000, 100_000])
+    parser.add_argument('--cobertos', type=float, default=1.0, help="fração dos cruzamentos cobertos")
+    args = parser.parse_args()
+
+    print(f"{'cruzamentos':>11} {'funções':>9} {'índice':>8} {'consulta':>9} {'speedup':>8}")
+    for tamanho in args.tamanhos:
+        logs, cruzamentos = gerar_base(tamanho)
+        tabelas = tabelas_alvo(logs)
+        cobertos = cruzamentos.sample(frac=args.cobertos, random_state=0)
+
+        inicio = time.perf_counter()
+        esperado = {
+            'sinistros': verificar_sinistros_por_logradouro(cobertos, tabelas['sinistros']),
+            'cvp': verificar_cvp_por_logradouro(cobertos, tabelas['cvp']),
+            'vias_prioritarias': verificar_vias_prioritarias_por_logradouro(cobertos, tabelas['vias_prioritarias']),
+        }
+        segundos_funcoes = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        indice = IndiceLogradouros(cruzamentos, **tabelas)
+        segundos_indice = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        resultado = indice.verificar(cobertos['id'])
+        segundos_consulta = time.perf_counter() - inicio
+        if resultado != esperado:
+            raise AssertionError(f"métricas divergentes com {tamanho} cruzamentos")
+
+        print(f"{tamanho:>11,} {segundos_funcoes * 1000:>6.0f} ms {segundos_indice * 1000:>5.0f} ms "
+              f"{segundos_consulta * 1000:>6.1f} ms {segundos_funcoes / segundos_consulta:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
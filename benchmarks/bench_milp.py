@@ -0,0 +1,66 @@
+"""
+Distância do guloso ao ótimo: solver MILP (HiGHS) com partida gulosa.
+
+Para cada orçamento de câmeras, resolve o MILP de `motor.milp` e mostra a
+cobertura gulosa, a melhor cobertura encontrada, o limitante superior, o gap
+e o tempo de solução. Com `--dados` usa a base real (planilhas de `data/`,
+incluindo pontos mínimos sem RED); sem ele, uma base sintética.
+
+Uso: python -m benchmarks.bench_milp --dados data [--orcamentos 500 1000] [--tempo-limite 120]
+"""
+
+import argparse
+from pathlib import Path
+
+from benchmarks.sintetico import gerar_base
+from motor.cobertura import RAIO_COBERTURA_PADRAO
+from motor.dados import carregar_dados
+from motor.ipe import ModeloIPE
+from motor.milp import milp_disponivel, otimizar_milp
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dados', type=Path, help="diretório com as planilhas (base real)")
+    parser.add_argument('--cruzamentos', type=int, default=3_000, help="tamanho da base sintética")
+    parser.add_argument('--orcamentos', type=int, nargs='+', default=[500, 1000])
+    parser.add_argument('--dist-min', type=float, default=300)
+    parser.add_argument('--tempo-limite', type=float, default=60)
+    args = parser.parse_args()
+
+    if not milp_disponivel():
+        parser.error("o solver HiGHS não está instalado (pip install highspy)")
+
+    pontos_minimos, matriz = None, None
+    if args.dados is not None:
+        dados = carregar_dados(args.dados)
+        if dados.modelo_ipe is None or dados.modelo_ipe.vazio:
+            parser.error(f"nenhum cruzamento válido em {args.dados}")
+        logs, df = dados.logs, dados.modelo_ipe.calcular(0.15, 0.30, 0.15, 0.40)
+        pontos_minimos = dados.pontos_minimos(False)
+        pontos_minimos = pontos_minimos if not pontos_minimos.empty else None
+        matriz = dados.matriz_cobertura(RAIO_COBERTURA_PADRAO)
+        origem = f"base real ({args.dados})"
+    else:
+        logs, cruzamentos = gerar_base(args.cruzamentos)
+        df = ModeloIPE(logs, cruzamentos).calcular(0.15, 0.30, 0.15, 0.40)
+        origem = "base sintética"
+
+    print(f"{origem}: {len(df):,} cruzamentos, distância mínima {args.dist_min:.0f} m, "
+          f"tempo limite {args.tempo_limite:.0f}s")
+    print(f"{'câmeras':>8} {'guloso':>8} {'MILP':>8} {'limite':>8} {'gap':>7} {'tempo':>8} "
+          f"{'variáveis':>10} {'restrições':>11}  status")
+    for orcamento in args.orcamentos:
+        _, info = otimizar_milp(
+            df, 1.0, args.dist_min, None, RAIO_COBERTURA_PADRAO, None, pontos_minimos, orcamento, logs,
+            matriz_cobertura=matriz, tempo_limite=args.tempo_limite
+        )
+        limite = info['limite_superior'] if info['limite_superior'] is not None else float('nan')
+        gap = info['gap'] if info['gap'] is not None else float('nan')
+        print(f"{orcamento:>8} {info['cobertura_gulosa'] * 100:>7.1f}% {info['cobertura'] * 100:>7.1f}% "
+              f"{limite * 100:>7.1f}% {gap * 100:>6.1f}% {info['segundos_milp']:>7.1f}s "
+              f"{info['variaveis']:>10,} {info['restricoes']:>11,}  {info['status']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Níveis de detalhe da borda dos bairros e da máscara: vértices e bytes por zoom.
+
+Antes, o mapa levava o GeoJSON de bairros original (todas as propriedades e
+vértices) e a máscara simplificada a ~1 m em todos os zooms. Agora cada faixa
+de zoom de `NIVEIS_DETALHE` tem a máscara e as divisas entre bairros
+simplificadas para ela, e o navegador desenha só o nível do zoom atual.
+Relata, por nível, os vértices desenhados e os bytes do GeoJSON, o total
+enviado com todos os níveis e o tempo do pré-processamento. `--divisoes N`
+recorta o contorno do GeoJSON em uma grade N×N para simular uma base com
+muitos bairros vizinhos (bordas comuns).
+
+Uso: python -m benchmarks.bench_niveis_detalhe --dados data [--divisoes 8]
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import shapely
+from shapely.geometry import box, mapping, shape
+from shapely.ops import unary_union
+
+from motor.dados import NOMES_ARQUIVOS
+from motor.fronteira import FronteiraRecife, tamanho_geojson
+
+
+def em_grade(bairros: dict, divisoes: int) -> dict:
+    """Contorno dos bairros recortado em `divisoes`×`divisoes` polígonos vizinhos"""
+    contorno = unary_union([shape(feature['geometry']) for feature in bairros.get('features', [])])
+    x0, y0, x1, y1 = contorno.bounds
+    dx, dy = (x1 - x0) / divisoes, (y1 - y0) / divisoes
+    celulas = [box(x0 + i * dx, y0 + j * dy, x0 + (i + 1) * dx, y0 + (j + 1) * dy).intersection(contorno)
+               for i in range(divisoes) for j in range(divisoes)]
+    return {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {}, 'geometry': mapping(c)} for c in celulas if not c.is_empty
+    ]}
+
+
+def relatar(bairros: dict, rotulo: str):
+    fronteira = FronteiraRecife.construir(bairros)
+    vertices_antes = fronteira.vertices_bairros + fronteira.vertices_mascara[1]
+    bytes_antes = tamanho_geojson(bairros) + tamanho_geojson(fronteira.mascara)
+
+    print(f"\n{rotulo}: {len(bairros.get('features', []))} bairros, pré-processamento {fronteira.segundos * 1000:.0f} ms "
+          f"(Shapely {shapely.__version__}{'' if hasattr(shapely, 'coverage_simplify') else ', sem coverage_simplify'})")
+    print(f"  antes (todos os zooms): {vertices_antes:,} vértices "
+          f"({fronteira.vertices_bairros:,} bairros + {fronteira.vertices_mascara[1]:,} máscara), "
+          f"{bytes_antes / 1e3:.0f} kB")
+    print(f"  {'zoom':>6} {'tolerância':>10} {'vértices':>9} {'máscara':>8} {'divisas':>8} {'kB':>6} {'vs antes':>9}")
+    for k, nivel in enumerate(fronteira.niveis):
+        ate = f"-{fronteira.niveis[k + 1].zoom_min - 1}" if k + 1 < len(fronteira.niveis) else "+"
+        vertices = nivel.vertices_mascara + nivel.vertices_divisas
+        print(f"  {f'{nivel.zoom_min}{ate}':>6} {nivel.tolerancia:>10.0e} {vertices:>9,} {nivel.vertices_mascara:>8,} "
+              f"{nivel.vertices_divisas:>8,} {nivel.bytes / 1e3:>6.0f} {vertices / vertices_antes:>8.0%}")
+    total = sum(nivel.bytes for nivel in fronteira.niveis)
+    print(f"  enviado com todos os níveis: {total / 1e3:.0f} kB ({total / bytes_antes:.0%} de antes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dados', type=Path, default=Path('data'), help="diretório com o GeoJSON de bairros")
+    parser.add_argument('--divisoes', type=int, default=8, help="grade da base sintética com bordas comuns (0 = não gera)")
+    args = parser.parse_args()
+
+    caminho = args.dados / NOMES_ARQUIVOS['bairros']
+    with open(caminho, 'r', encoding='utf-8') as f:
+        bairros = json.load(f)
+
+    relatar(bairros, str(caminho))
+    if args.divisoes > 1:
+        relatar(em_grade(bairros, args.divisoes), f"grade {args.divisoes}x{args.divisoes} sobre o mesmo contorno")
+
+
+if __name__ == '__main__':
+    main()
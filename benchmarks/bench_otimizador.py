@@ -0,0 +1,41 @@
+"""
+Critérios de seleção do otimizador: ordem de IPE x ganho marginal (CELF).
+
+Para cada cobertura alvo, executa `filtrar_por_cobertura_e_distancia` nos dois
+modos sobre a mesma base sintética e compara tempo, câmeras usadas e
+cobertura ajustada atingida.
+"""
+
+import argparse
+import time
+
+from benchmarks.sintetico import gerar_base
+from motor.ipe import ModeloIPE
+from motor.otimizador import MODOS_OTIMIZADOR, filtrar_por_cobertura_e_distancia
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cruzamentos', type=int, default=10_000)
+    parser.add_argument('--alvos', type=float, nargs='+', default=[0.2, 0.4, 0.6])
+    parser.add_argument('--dist-min', type=float, default=100)
+    args = parser.parse_args()
+
+    logs, cruzamentos = gerar_base(args.cruzamentos)
+    df = ModeloIPE(logs, cruzamentos).calcular(0.15, 0.30, 0.15, 0.40)
+
+    print(f"{args.cruzamentos:,} cruzamentos, distância mínima {args.dist_min:.0f} m")
+    print(f"{'alvo':>6} {'modo':>15} {'tempo':>9} {'pontos':>7} {'câmeras':>8} {'cobertura':>10} {'atingiu':>8}")
+    for alvo in args.alvos:
+        for modo in MODOS_OTIMIZADOR:
+            inicio = time.perf_counter()
+            df_sel, cobertura, atingido, _, _, _, cameras = filtrar_por_cobertura_e_distancia(
+                df, alvo, args.dist_min, None, 50, None, None, None, logs, modo=modo
+            )
+            tempo = time.perf_counter() - inicio
+            print(f"{alvo * 100:>5.0f}% {modo:>15} {tempo:>8.2f}s {len(df_sel):>7} {cameras:>8} "
+                  f"{cobertura * 100:>9.1f}% {'sim' if atingido else 'não':>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Métricas do painel por rerun: cálculo duplicado x objeto único memorizado.
+
+Antes, a coluna de estatísticas e os cards abaixo do mapa recalculavam cada
+um os pontos com câmera, os equipamentos próximos, os alagamentos e os
+logradouros cobertos, e a coluna ainda somava o IPE coberto linha a linha.
+Mede esse caminho, o `calcular_metricas_painel` único e um rerun com o
+resultado já memorizado (hash do resultado + consulta ao cache). Usa a base
+real (planilhas de `data/`), com o plano do otimizador para cada orçamento em
+`--orcamentos`.
+
+Uso: python -m benchmarks.bench_painel --dados data [--orcamentos 250 500 1000] [--repeticoes 5]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from motor.cache_resultados import CacheResultados, chave_cenario
+from motor.cobertura import RAIO_COBERTURA_PADRAO
+from motor.dados import carregar_dados
+from motor.otimizador import filtrar_por_cobertura_e_distancia
+from motor.painel import calcular_metricas_painel, impressao_resultado
+
+PESOS_PADRAO = [0.15, 0.30, 0.15, 0.40]
+NOTA_MIN_EQUIP = 4
+
+
+def medir(funcao, repeticoes: int) -> float:
+    """Menor tempo (s) entre `repeticoes` execuções"""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dados', type=Path, default=Path('data'), help="diretório com as planilhas")
+    parser.add_argument('--orcamentos', type=int, nargs='+', default=[250, 500, 1000])
+    parser.add_argument('--dist-min', type=float, default=300)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    dados = carregar_dados(args.dados)
+    if dados.modelo_ipe is None or dados.modelo_ipe.vazio:
+        parser.error(f"nenhum cruzamento válido em {args.dados}")
+    df = dados.modelo_ipe.calcular(*PESOS_PADRAO)
+    pontos_minimos = dados.pontos_minimos(False)
+    pontos_minimos = pontos_minimos if not pontos_minimos.empty else None
+    matriz = dados.matriz_cobertura(RAIO_COBERTURA_PADRAO)
+
+    print(f"{'orçamento':>9} {'cobertos':>9} {'antes':>9} {'único':>9} {'memorizado':>11}")
+    for orcamento in args.orcamentos:
+        selecionados, _, _, _, ids_cobertos, minimos_usados, _ = filtrar_por_cobertura_e_distancia(
+            df, 1.0, args.dist_min, None, RAIO_COBERTURA_PADRAO, None, pontos_minimos, orcamento, dados.logs,
+            matriz_cobertura=matriz
+        )
+        cobertos = df['id'][df['id'].isin(ids_cobertos)]
+
+        def calcular():
+            return calcular_metricas_painel(dados, selecionados, minimos_usados, cobertos,
+                                            RAIO_COBERTURA_PADRAO, NOTA_MIN_EQUIP)
+
+        def antes():
+            # Coluna de estatísticas e cards, cada um com o seu cálculo, mais a soma do IPE coberto
+            calcular()
+            calcular()
+            soma = dict.fromkeys(['ipe_cruz', 'ipe_cruz_seg', 'ipe_cruz_lct', 'ipe_cruz_com', 'ipe_cruz_mob'], 0)
+            for _, cruz in df[df['id'].isin(ids_cobertos)].iterrows():
+                for coluna in soma:
+                    soma[coluna] += cruz[coluna]
+
+        cache = CacheResultados()
+
+        def rerun():
+            chave = chave_cenario(dados.impressao_digital, painel=True,
+                                  resultado=impressao_resultado(selecionados, minimos_usados, ids_cobertos),
+                                  raio_cobertura=RAIO_COBERTURA_PADRAO, nota_min_equip=NOTA_MIN_EQUIP)
+            return cache.obter_ou_calcular(chave, calcular)
+
+        rerun()
+        print(f"{orcamento:>9} {len(ids_cobertos):>9,} {medir(antes, args.repeticoes) * 1000:>6.1f} ms "
+              f"{medir(calcular, args.repeticoes) * 1000:>6.1f} ms {medir(rerun, args.repeticoes) * 1000:>8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
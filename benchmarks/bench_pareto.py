@@ -0,0 +1,80 @@
+"""
+Fronteira de Pareto entre eixos: seleções em paralelo e reaproveitamento.
+
+Mede `explorar_fronteira` com pools de 1 a N processos e, em seguida, uma
+nova exploração com uma rodada a mais reaproveitando o cache de seleções.
+Com `--dados` usa a base real (planilhas de `data/`, incluindo pontos
+mínimos sem RED); sem ele, uma base sintética.
+
+Uso: python -m benchmarks.bench_pareto --dados data [--passo 0.25] [--rodadas 2] [--processos 1 2 4 8]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from benchmarks.sintetico import gerar_base
+from motor.cobertura import RAIO_COBERTURA_PADRAO
+from motor.dados import carregar_dados
+from motor.ipe import ModeloIPE
+from motor.pareto import explorar_fronteira
+
+PESOS_PADRAO = [0.15, 0.30, 0.15, 0.40]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dados', type=Path, help="diretório com as planilhas (base real)")
+    parser.add_argument('--cruzamentos', type=int, default=5_000, help="tamanho da base sintética")
+    parser.add_argument('--passo', type=float, default=0.25)
+    parser.add_argument('--rodadas', type=int, default=2)
+    parser.add_argument('--max-cameras', type=int, default=500)
+    parser.add_argument('--dist-min', type=float, default=300)
+    parser.add_argument('--processos', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    pontos_minimos, matriz = None, None
+    if args.dados is not None:
+        dados = carregar_dados(args.dados)
+        if dados.modelo_ipe is None or dados.modelo_ipe.vazio:
+            parser.error(f"nenhum cruzamento válido em {args.dados}")
+        logs, modelo = dados.logs, dados.modelo_ipe
+        pontos_minimos = dados.pontos_minimos(False)
+        pontos_minimos = pontos_minimos if not pontos_minimos.empty else None
+        matriz = dados.matriz_cobertura(RAIO_COBERTURA_PADRAO)
+        origem = f"base real ({args.dados})"
+    else:
+        logs, cruzamentos = gerar_base(args.cruzamentos)
+        modelo = ModeloIPE(logs, cruzamentos)
+        origem = "base sintética"
+
+    print(f"{origem}: {len(modelo):,} cruzamentos, passo {args.passo:g}, {args.rodadas} rodadas de refinamento, "
+          f"{args.max_cameras} câmeras, distância mínima {args.dist_min:.0f} m")
+
+    def explorar(rodadas, processos, cache=None):
+        return explorar_fronteira(modelo, PESOS_PADRAO, args.max_cameras, args.dist_min, RAIO_COBERTURA_PADRAO,
+                                  pontos_minimos, logs, matriz_cobertura=matriz, passo=args.passo,
+                                  rodadas=rodadas, processos=processos, cache_selecoes=cache)
+
+    print(f"\n{'processos':>9} {'total':>8} {'seleção':>9} {'por plano':>10} {'speedup':>8} "
+          f"{'planos':>7} {'fronteira':>10}")
+    referencia = None
+    for processos in args.processos:
+        resultado = explorar(args.rodadas, processos)
+        info = resultado.info
+        referencia = referencia or info['segundos']
+        print(f"{processos:>9} {info['segundos']:>7.2f}s {info['segundos_selecao']:>8.2f}s "
+              f"{info['segundos_selecao'] / max(info['selecoes'], 1) * 1000:>7.1f} ms "
+              f"{referencia / info['segundos']:>7.2f}x {info['avaliados']:>7} {info['fronteira']:>10}")
+
+    cache = {}
+    explorar(args.rodadas, args.processos[-1], cache)
+    inicio = time.perf_counter()
+    refinada = explorar(args.rodadas + 1, args.processos[-1], cache)
+    segundos = time.perf_counter() - inicio
+    print(f"\nMais uma rodada com cache: {segundos:.2f}s, {refinada.info['reaproveitadas']} seleções "
+          f"reaproveitadas, {refinada.info['selecoes']} novas, {refinada.info['fronteira']} na fronteira")
+
+
+if __name__ == '__main__':
+    main()
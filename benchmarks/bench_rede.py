@@ -0,0 +1,121 @@
+"""
+Distância pela rede de logradouros: custo do pré-cálculo e das consultas.
+
+Mede a construção do grafo, o Dijkstra limitado a partir de cada cruzamento,
+a gravação e a leitura do cache em disco, a latência de uma consulta
+(`distancia`, uma busca binária) e de consultas em lote (`distancias_entre`)
+contra a Haversine, e o tempo do otimizador em linha reta e pela rede. Com
+`--dados` usa a base real (planilhas de `data/`); sem ele, bases sintéticas
+de cada tamanho em `--tamanhos`.
+
+Uso: python -m benchmarks.bench_rede --dados data [--alcance 500] [--consultas 100000]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.sintetico import gerar_base
+from motor.cobertura import RAIO_COBERTURA_PADRAO, MatrizCobertura
+from motor.dados import carregar_dados
+from motor.geo import haversine_metros
+from motor.ipe import ModeloIPE
+from motor.otimizador import filtrar_por_cobertura_e_distancia
+from motor.rede import DistanciasRede, GrafoLogradouros
+
+PESOS_PADRAO = [0.15, 0.30, 0.15, 0.40]
+
+
+def medir(modelo: ModeloIPE, logs, rotulo: str, args):
+    cruzamentos = modelo.cruzamentos
+    n = len(cruzamentos)
+
+    inicio = time.perf_counter()
+    grafo = GrafoLogradouros.construir(cruzamentos)
+    segundos_grafo = time.perf_counter() - inicio
+    rede = DistanciasRede.construir(cruzamentos, args.alcance)
+    pares = len(rede.indices) - len(rede)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = Path(tmp) / 'rede.npz'
+        inicio = time.perf_counter()
+        rede.salvar(caminho)
+        segundos_salvar = time.perf_counter() - inicio
+        tamanho = caminho.stat().st_size
+        inicio = time.perf_counter()
+        DistanciasRede.carregar(caminho)
+        segundos_carregar = time.perf_counter() - inicio
+
+    print(f"\n{rotulo}: {n:,} cruzamentos, {grafo.qtd_arestas:,} trechos, alcance {args.alcance:.0f} m")
+    print(f"  grafo {segundos_grafo * 1000:.0f} ms, Dijkstra limitado {rede.segundos:.2f} s "
+          f"({rede.segundos / max(n, 1) * 1e6:.0f} µs por origem), {pares:,} pares alcançáveis "
+          f"({pares / max(n, 1):.1f} por cruzamento)")
+    print(f"  cache: {tamanho / 1e6:.2f} MB, gravação {segundos_salvar * 1000:.0f} ms, "
+          f"leitura {segundos_carregar * 1000:.0f} ms")
+
+    # Metade das consultas em pares alcançáveis, metade em pares aleatórios (quase sempre além do alcance)
+    rng = np.random.default_rng(0)
+    metade = args.consultas // 2
+    k = rng.integers(0, len(rede.indices), metade)
+    linhas = np.repeat(np.arange(n), np.diff(rede.indptr))
+    i = np.concatenate([linhas[k], rng.integers(0, n, args.consultas - metade)])
+    j = np.concatenate([rede.indices[k], rng.integers(0, n, args.consultas - metade)])
+
+    amostra = min(len(i), 20_000)
+    inicio = time.perf_counter()
+    for a, b in zip(i[:amostra].tolist(), j[:amostra].tolist()):
+        rede.distancia(a, b)
+    por_consulta = (time.perf_counter() - inicio) / amostra
+
+    inicio = time.perf_counter()
+    rede.distancias_entre(i, j)
+    em_lote = (time.perf_counter() - inicio) / len(i)
+
+    lats = cruzamentos['lat'].to_numpy(dtype=float)
+    lons = cruzamentos['lon'].to_numpy(dtype=float)
+    inicio = time.perf_counter()
+    haversine_metros(lats[i], lons[i], lats[j], lons[j])
+    haversine = (time.perf_counter() - inicio) / len(i)
+    print(f"  consulta: {por_consulta * 1e6:.1f} µs (uma a uma), {em_lote * 1e9:.0f} ns por par em lote, "
+          f"Haversine em lote {haversine * 1e9:.0f} ns por par")
+
+    df = modelo.calcular(*PESOS_PADRAO)
+    for nome, distancias_rede in (("linha reta", None), ("rede", rede)):
+        matriz = MatrizCobertura.construir(cruzamentos, RAIO_COBERTURA_PADRAO, distancias_rede)
+        inicio = time.perf_counter()
+        resultado = filtrar_por_cobertura_e_distancia(
+            df, 1.0, args.dist_min, None, RAIO_COBERTURA_PADRAO, None, None, args.max_cameras, logs,
+            matriz_cobertura=matriz, distancias_rede=distancias_rede
+        )
+        segundos = time.perf_counter() - inicio
+        print(f"  otimizador ({nome}): {segundos:.2f} s, {len(resultado[0])} pontos, "
+              f"cobertura {resultado[1] * 100:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dados', type=Path, help="diretório com as planilhas (base real)")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[5_000, 20_000],
+                        help="tamanhos das bases sintéticas")
+    parser.add_argument('--alcance', type=float, default=500)
+    parser.add_argument('--consultas', type=int, default=100_000)
+    parser.add_argument('--max-cameras', type=int, default=500)
+    parser.add_argument('--dist-min', type=float, default=300)
+    args = parser.parse_args()
+
+    if args.dados is not None:
+        dados = carregar_dados(args.dados)
+        if dados.modelo_ipe is None or dados.modelo_ipe.vazio:
+            parser.error(f"nenhum cruzamento válido em {args.dados}")
+        medir(dados.modelo_ipe, dados.logs, f"base real ({args.dados})", args)
+    else:
+        for tamanho in args.tamanhos:
+            logs, cruzamentos = gerar_base(tamanho)
+            medir(ModeloIPE(logs, cruzamentos), logs, "base sintética", args)
+
+
+if __name__ == '__main__':
+    main()
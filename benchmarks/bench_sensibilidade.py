@@ -0,0 +1,86 @@
+"""
+Análise de sensibilidade aos pesos: IPE em lote e seleção em paralelo.
+
+Mede o IPE de K vetores de pesos calculado com `ModeloIPE.calcular` (um
+DataFrame por amostra) e com `ModeloIPE.ipe_em_lote` (um único produto
+matricial), e o tempo total de `analisar_sensibilidade` com pools de 1 a N
+processos. Com `--dados` usa a base real (planilhas de `data/`, incluindo
+pontos mínimos sem RED); sem ele, uma base sintética.
+
+Uso: python -m benchmarks.bench_sensibilidade --dados data [--amostras 200] [--processos 1 2 4 8]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from benchmarks.sintetico import gerar_base
+from motor.cobertura import RAIO_COBERTURA_PADRAO
+from motor.dados import carregar_dados
+from motor.ipe import ModeloIPE
+from motor.sensibilidade import amostrar_pesos, analisar_sensibilidade
+
+PESOS_PADRAO = [0.15, 0.30, 0.15, 0.40]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dados', type=Path, help="diretório com as planilhas (base real)")
+    parser.add_argument('--cruzamentos', type=int, default=5_000, help="tamanho da base sintética")
+    parser.add_argument('--amostras', type=int, default=200)
+    parser.add_argument('--amplitude', type=float, default=0.10)
+    parser.add_argument('--max-cameras', type=int, default=500)
+    parser.add_argument('--dist-min', type=float, default=300)
+    parser.add_argument('--processos', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    pontos_minimos, matriz = None, None
+    if args.dados is not None:
+        dados = carregar_dados(args.dados)
+        if dados.modelo_ipe is None or dados.modelo_ipe.vazio:
+            parser.error(f"nenhum cruzamento válido em {args.dados}")
+        logs, modelo = dados.logs, dados.modelo_ipe
+        pontos_minimos = dados.pontos_minimos(False)
+        pontos_minimos = pontos_minimos if not pontos_minimos.empty else None
+        matriz = dados.matriz_cobertura(RAIO_COBERTURA_PADRAO)
+        origem = f"base real ({args.dados})"
+    else:
+        logs, cruzamentos = gerar_base(args.cruzamentos)
+        modelo = ModeloIPE(logs, cruzamentos)
+        origem = "base sintética"
+
+    print(f"{origem}: {len(modelo):,} cruzamentos, {args.amostras} amostras (±{args.amplitude * 100:.0f} p.p.), "
+          f"{args.max_cameras} câmeras, distância mínima {args.dist_min:.0f} m")
+
+    pesos = amostrar_pesos(PESOS_PADRAO, args.amostras, args.amplitude, semente=0)
+    inicio = time.perf_counter()
+    for linha in pesos:
+        modelo.calcular(*linha)
+    por_amostra = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    modelo.ipe_em_lote(pesos)
+    em_lote = time.perf_counter() - inicio
+    print(f"IPE: por amostra {por_amostra * 1000:.0f} ms, em lote {em_lote * 1000:.1f} ms "
+          f"({por_amostra / em_lote:.0f}x)")
+
+    print(f"\n{'processos':>9} {'total':>8} {'seleção':>9} {'por amostra':>12} {'speedup':>8} "
+          f"{'cobertura':>16} {'estáveis':>9}")
+    referencia = None
+    for processos in args.processos:
+        inicio = time.perf_counter()
+        analise = analisar_sensibilidade(
+            modelo, PESOS_PADRAO, 1.0, args.dist_min, None, RAIO_COBERTURA_PADRAO, None, pontos_minimos,
+            args.max_cameras, logs, matriz_cobertura=matriz, amostras=args.amostras, amplitude=args.amplitude,
+            processos=processos
+        )
+        total = time.perf_counter() - inicio
+        referencia = referencia or total
+        resumo = analise.resumo()
+        print(f"{processos:>9} {total:>7.2f}s {resumo['segundos_selecao']:>8.2f}s "
+              f"{resumo['segundos_selecao'] / len(analise) * 1000:>9.1f} ms {referencia / total:>7.2f}x "
+              f"{resumo['cobertura_media'] * 100:>8.1f}% ± {resumo['cobertura_desvio'] * 100:.1f} "
+              f"{resumo['pontos_estaveis'] * 100:>8.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Geração de bases sintéticas (logradouros e cruzamentos) para os benchmarks"""
+
+import numpy as np
+import pandas as pd
+
+# Centro aproximado do Recife
+LAT_CENTRO = -8.05
+LON_CENTRO = -34.92
+
+
+def gerar_logs(n_logs: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cod = np.arange(1, n_logs + 1)
+    return pd.DataFrame({
+        'cod_log': cod,
+        'nome': [f"RUA {c}" for c in cod],
+        'seg': rng.random(n_logs),
+        'lct': rng.random(n_logs),
+        'com': rng.random(n_logs),
+        'mob': rng.random(n_logs),
+    })
+
+
+def gerar_cruzamentos(n_cruz: int, n_logs: int, seed: int = 0, dispersao: float = 0.04) -> pd.DataFrame:
+    """Cruzamentos aleatórios entre logradouros, espalhados em torno do centro"""
+    rng = np.random.default_rng(seed + 1)
+    a = rng.integers(1, n_logs + 1, n_cruz)
+    b = rng.integers(1, n_logs + 1, n_cruz)
+    b = np.where(a == b, (b % n_logs) + 1, b)
+    cod1, cod2 = np.minimum(a, b), np.maximum(a, b)
+    return pd.DataFrame({
+        'id': np.arange(1, n_cruz + 1),
+        'cod_log1': cod1,
+        'log1': [f"RUA {c}" for c in cod1],
+        'cod_log2': cod2,
+        'log2': [f"RUA {c}" for c in cod2],
+        'lat': LAT_CENTRO + rng.uniform(-dispersao, dispersao, n_cruz),
+        'lon': LON_CENTRO + rng.uniform(-dispersao, dispersao, n_cruz),
+    })
+
+
+def gerar_base(n_cruz: int, seed: int = 0) -> tuple:
+    """Retorna (logs, cruzamentos) com ~1 logradouro para cada 5 cruzamentos"""
+    n_logs = max(n_cruz // 5, 2)
+    return gerar_logs(n_logs, seed), gerar_cruzamentos(n_cruz, n_logs, seed)
+
+
+def gerar_pontos(n: int, seed: int = 0, dispersao: float = 0.04) -> pd.DataFrame:
+    rng = np.random.default_rng(seed + 2)
+    return pd.DataFrame({
+        'lat': LAT_CENTRO + rng.uniform(-dispersao, dispersao, n),
+        'lon': LON_CENTRO + rng.uniform(-dispersao, dispersao, n),
+    })
+
+
+def escrever_planilha_cruzamentos(logs: pd.DataFrame, cruzamentos: pd.DataFrame, caminho) -> None:
+    """Grava logs/cruzamentos no mesmo layout de Cruzamentos.xlsx (abas MODELO e cruzamentos_100%)"""
+    modelo = pd.DataFrame(
+        [['MODELO IPE'] + [''] * 6, ['RANKING_IPE', 'cod_log', 'nome', 'seg', 'lct', 'com', 'mob']] +
+        [[i + 1, r.cod_log, r.nome, r.seg, r.lct, r.com, r.mob] for i, r in enumerate(logs.itertuples())]
+    )
+    vazio = [''] * len(cruzamentos)
+    # Colunas lidas por posição: 0 e 4 (códigos), 2 e 6 (nomes), 11 e 12 (lat/lon)
+    aba_cruzamentos = pd.DataFrame({
+        'cod_log1': cruzamentos['cod_log1'], 'tipo1': vazio, 'nome_log1': cruzamentos['log1'], 'bairro1': vazio,
+        'cod_log2': cruzamentos['cod_log2'], 'tipo2': vazio, 'nome_log2': cruzamentos['log2'], 'bairro2': vazio,
+        'extra1': vazio, 'extra2': vazio, 'extra3': vazio,
+        'latitude': cruzamentos['lat'], 'longitude': cruzamentos['lon'],
+    })
+    with pd.ExcelWriter(caminho) as writer:
+        modelo.to_excel(writer, sheet_name='MODELO', header=False, index=False)
+        aba_cruzamentos.to_excel(writer, sheet_name='cruzamentos_100%', index=False)
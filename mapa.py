@@ -0,0 +1,211 @@
+"""
+Camadas Folium do mapa principal e do mapa de robustez.
+
+Separado de `simulador.py` para que a base estática (tiles, limites, máscara
+e divisas por nível de zoom) e a camada de câmeras possam ser montadas fora
+do Streamlit, como faz `benchmarks/bench_mapa_incremental.py`. O pacote
+`motor` continua sem depender do Folium.
+"""
+
+import folium
+import pandas as pd
+from folium.elements import MacroElement
+from folium.template import Template
+from folium.utilities import JsCode
+
+from motor.camada_pontos import ESTILO_PONTOS, POPUP_PONTOS_JS, pontos_geojson
+from motor.fronteira import FronteiraRecife
+from motor.sensibilidade import FREQUENCIA_ESTAVEL
+
+
+class NiveisPorZoom(MacroElement):
+    """Mantém no mapa só o grupo do nível de detalhe do zoom atual: [(zoom mínimo, FeatureGroup)]"""
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var mapa = {{ this._parent.get_name() }};
+            var niveis = [{% for zoom, grupo in this.niveis %}[{{ zoom }}, {{ grupo.get_name() }}], {% endfor %}];
+            function atualizarNivel() {
+                var zoom = mapa.getZoom(), ativo = niveis[0][1];
+                niveis.forEach(function(n) { if (zoom >= n[0]) ativo = n[1]; });
+                niveis.forEach(function(n) {
+                    if (n[1] !== ativo && mapa.hasLayer(n[1])) mapa.removeLayer(n[1]);
+                });
+                if (!mapa.hasLayer(ativo)) {
+                    mapa.addLayer(ativo);
+                    // Abaixo das câmeras, com a máscara sob as divisas
+                    ativo.getLayers().reverse().forEach(function(camada) { camada.bringToBack(); });
+                }
+            }
+            mapa.on('zoomend', atualizarNivel);
+            atualizarNivel();
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, niveis: list):
+        super().__init__()
+        self._name = 'NiveisPorZoom'
+        self.niveis = niveis
+
+
+def criar_mapa_base(bairros_geojson=None, fronteira: FronteiraRecife = None,
+                    pontos_em_camada: bool = True) -> folium.Map:
+    """
+    Parte estática do mapa: tiles, limites, máscara externa e borda dos bairros.
+
+    Limites, máscara externa e divisas vêm de `fronteira` (pré-calculada no
+    carregamento, com um nível de detalhe por faixa de zoom); sem ela, são
+    calculados a partir de `bairros_geojson`. Não depende do
+    resultado do otimizador, então o `st_folium` não remonta o mapa quando só
+    as câmeras mudam.
+    """
+    if fronteira is None and bairros_geojson is not None:
+        fronteira = FronteiraRecife.construir(bairros_geojson)
+    
+    if fronteira is not None and fronteira.limites is not None:
+        m = folium.Map(
+            location=fronteira.centro,
+            zoom_start=12,
+            tiles='CartoDB positron',
+            min_zoom=11,
+            max_zoom=18,
+            max_bounds=True,
+            prefer_canvas=pontos_em_camada
+        )
+        m.fit_bounds(fronteira.limites)
+    else:
+        m = folium.Map(
+            location=[-8.05, -34.95],
+            zoom_start=12,
+            tiles='CartoDB positron',
+            min_zoom=11,
+            max_zoom=18,
+            prefer_canvas=pontos_em_camada
+        )
+    
+    # Máscara escura FORA do Recife e divisas dos bairros, simplificadas por faixa de zoom.
+    # O contorno da máscara é a borda do Recife; só o nível do zoom atual fica no mapa
+    if fronteira is not None and fronteira.niveis:
+        grupos = []
+        for nivel in fronteira.niveis:
+            grupo = folium.FeatureGroup(name=f'Limites do Recife (zoom {nivel.zoom_min}+)', show=False, control=False)
+            folium.GeoJson(
+                nivel.mascara,
+                style_function=lambda x: {
+                    'fillColor': '#000000',
+                    'color': '#6b7280',
+                    'weight': 2,
+                    'fillOpacity': 0.7
+                }
+            ).add_to(grupo)
+            if nivel.vertices_divisas:
+                folium.GeoJson(
+                    nivel.divisas,
+                    style_function=lambda x: {
+                        'color': '#6b7280',
+                        'weight': 2
+                    }
+                ).add_to(grupo)
+            grupo.add_to(m)
+            grupos.append((nivel.zoom_min, grupo))
+        NiveisPorZoom(grupos).add_to(m)
+    
+    return m
+
+
+def criar_camada_cameras(cruzamentos_selecionados: pd.DataFrame, pontos_minimos_usados: pd.DataFrame = None,
+                         mostrar_pontos_minimos: bool = True, mostrar_pontos_ipe: bool = True,
+                         pontos_em_camada: bool = True) -> folium.FeatureGroup:
+    """
+    Parte dinâmica do mapa: pontos mínimos e pontos via IPE em um FeatureGroup.
+
+    Com `pontos_em_camada`, os pontos vão em uma única camada GeoJSON desenhada
+    em canvas, com popups montados no navegador; sem ele, um `CircleMarker` com
+    popup por ponto.
+    """
+    grupo = folium.FeatureGroup(name='Câmeras')
+    
+    # Pontos mínimos e pontos via IPE em uma única camada
+    if pontos_em_camada:
+        camada = pontos_geojson(cruzamentos_selecionados, pontos_minimos_usados,
+                                mostrar_pontos_minimos, mostrar_pontos_ipe)
+        if camada['features']:
+            folium.GeoJson(
+                camada,
+                marker=folium.CircleMarker(radius=3, fill=True, fill_opacity=0.8),
+                style_function=lambda x: ESTILO_PONTOS[x['properties']['grupo']],
+                on_each_feature=JsCode(POPUP_PONTOS_JS)
+            ).add_to(grupo)
+        return grupo
+    
+    # Pontos Mínimos
+    if mostrar_pontos_minimos and pontos_minimos_usados is not None and not pontos_minimos_usados.empty:
+        for _, p in pontos_minimos_usados.iterrows():
+            is_red = p.get('is_red', False) or (str(p.get('tipo', '')).strip().upper() == 'RED')
+            
+            if is_red:
+                cor = "#10b981"
+                titulo = "📍 PONTO RED (Concessão)"
+            else:
+                cor = "#f6443b"
+                titulo = "📍 PONTO OBRIGATÓRIO"
+            
+            popup_html = f"""<div style="font-size:0.8rem; min-width:180px;">
+                <strong>{titulo}</strong><br/>
+                <b>Motivo:</b> {p.get('tipo', 'N/A')}<br/>
+                <b>Logradouro:</b> {p.get('logradouro', 'N/A')}<br/>
+                <b>Prioridade:</b> {p.get('prioridade', 'N/A')}<br/>
+                <b>Câmeras:</b> {p.get('cameras', 1)}
+            </div>"""
+            folium.CircleMarker(
+                location=[p['lat'], p['lon']], radius=3, color=cor,
+                fill=True, fillColor=cor, fillOpacity=0.8, weight=2,
+                popup=folium.Popup(popup_html, max_width=250)
+            ).add_to(grupo)
+    
+    # Pontos via IPE
+    if mostrar_pontos_ipe and not cruzamentos_selecionados.empty:
+        for _, c in cruzamentos_selecionados.iterrows():
+            popup_html = f"""<div style="font-size:0.8rem; min-width:180px;">
+                <strong>Cruzamento {int(c['id'])}</strong><br/>
+                <b>Ruas:</b> {c['log1']} x {c['log2']}<br/>
+                <b>IPE:</b> {c['ipe_cruz']:.4f}<br/>
+            </div>"""
+            folium.CircleMarker(
+                location=[c['lat'], c['lon']], radius=3, color="#3b82f6",
+                fill=True, fillColor="#3b82f6", fillOpacity=0.8, weight=1,
+                popup=folium.Popup(popup_html, max_width=250)
+            ).add_to(grupo)
+    
+    return grupo
+
+
+def criar_mapa_robustez(frequencia: pd.DataFrame) -> folium.Map:
+    """Cruzamentos selecionados em alguma amostra, coloridos pela frequência de seleção"""
+    selecionados = frequencia[frequencia['freq_selecao'] > 0]
+    m = folium.Map(location=[-8.05, -34.95], zoom_start=12, tiles='CartoDB positron', min_zoom=11, max_zoom=18)
+    if selecionados.empty:
+        return m
+    m.fit_bounds([[selecionados['lat'].min(), selecionados['lon'].min()],
+                  [selecionados['lat'].max(), selecionados['lon'].max()]])
+    for c in selecionados.itertuples():
+        if c.freq_selecao >= FREQUENCIA_ESTAVEL:
+            cor = "#10b981"
+        elif c.freq_selecao >= 0.5:
+            cor = "#f59e0b"
+        else:
+            cor = "#f6443b"
+        popup_html = f"""<div style="font-size:0.8rem; min-width:180px;">
+            <strong>Cruzamento {int(c.id)}</strong><br/>
+            <b>Ruas:</b> {c.log1} x {c.log2}<br/>
+            <b>Selecionado em:</b> {c.freq_selecao * 100:.0f}% das amostras<br/>
+            <b>Coberto em:</b> {c.freq_cobertura * 100:.0f}% das amostras<br/>
+            <b>No plano atual:</b> {'sim' if c.no_plano_atual else 'não'}
+        </div>"""
+        folium.CircleMarker(
+            location=[c.lat, c.lon], radius=3 if c.no_plano_atual else 2, color=cor,
+            fill=True, fillColor=cor, fillOpacity=0.4 + 0.5 * c.freq_selecao, weight=1,
+            popup=folium.Popup(popup_html, max_width=250)
+        ).add_to(m)
+    return m
@@ -0,0 +1,41 @@
+"""
+Motor de otimização do videomonitoramento.
+
+API de funções puras (carregamento, IPE, otimização e métricas) que pode ser
+importada, testada e executada em lote sem Streamlit nem Folium. O pacote
+reexporta só esse núcleo; os subsistemas opcionais são importados dos
+próprios módulos (`motor.curva`, `motor.busca_local`, `motor.milp`,
+`motor.sensibilidade`, `motor.pareto`, `motor.rede`, `motor.cobertura`,
+`motor.fronteira`, `motor.camada_pontos`, `motor.painel`, `motor.exportacao`).
+"""
+
+from motor.cache_dados import CacheDados
+from motor.cache_resultados import CacheResultados, chave_cenario
+from motor.dados import (
+    DadosReferencia, NOMES_ARQUIVOS, assinatura_arquivos, caminhos_arquivos, carregar_alagamentos,
+    carregar_bairros_geojson, carregar_cvp, carregar_dados, carregar_excel_cruzamentos,
+    carregar_excel_equipamentos, carregar_pontos_minimos, carregar_sinistros, carregar_vias_prioritarias
+)
+from motor.ipe import ModeloIPE, calcular_ipe_cruzamentos, ordem_por_ipe
+from motor.metricas import (
+    ALVOS_LOGRADOURO, CUSTO_UNITARIO_CAMERA, IndiceLogradouros, calcular_cobertura_por_logradouro_ajustada,
+    normalizar_logradouros, verificar_alagamentos_por_raio, verificar_cvp_por_logradouro,
+    verificar_equipamentos_proximos, verificar_sinistros_por_logradouro, verificar_vias_prioritarias_por_logradouro
+)
+from motor.otimizador import (
+    MODO_GANHO_MARGINAL, MODO_IPE, MODOS_OTIMIZADOR, AcumuladorCoberturaAjustada, calcular_cameras_por_ponto,
+    filtrar_por_cobertura_e_distancia
+)
+
+__all__ = [
+    'ALVOS_LOGRADOURO', 'CUSTO_UNITARIO_CAMERA', 'MODOS_OTIMIZADOR', 'MODO_GANHO_MARGINAL', 'MODO_IPE',
+    'NOMES_ARQUIVOS', 'AcumuladorCoberturaAjustada', 'CacheDados', 'CacheResultados', 'DadosReferencia',
+    'IndiceLogradouros', 'ModeloIPE', 'assinatura_arquivos', 'calcular_cameras_por_ponto',
+    'calcular_cobertura_por_logradouro_ajustada', 'calcular_ipe_cruzamentos', 'caminhos_arquivos',
+    'carregar_alagamentos', 'carregar_bairros_geojson', 'carregar_cvp', 'carregar_dados',
+    'carregar_excel_cruzamentos', 'carregar_excel_equipamentos', 'carregar_pontos_minimos',
+    'carregar_sinistros', 'carregar_vias_prioritarias', 'chave_cenario',
+    'filtrar_por_cobertura_e_distancia', 'normalizar_logradouros', 'ordem_por_ipe',
+    'verificar_alagamentos_por_raio', 'verificar_cvp_por_logradouro', 'verificar_equipamentos_proximos',
+    'verificar_sinistros_por_logradouro', 'verificar_vias_prioritarias_por_logradouro',
+]
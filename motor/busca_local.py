@@ -0,0 +1,391 @@
+"""
+Busca local (troca e realocação) após a seleção gulosa.
+
+Parte da tupla devolvida por `filtrar_por_cobertura_e_distancia` e tenta
+mover cada câmera selecionada para outro cruzamento, mantendo o número de
+pontos (e portanto de câmeras):
+
+- realocação: para um cruzamento a menos de `min_dist` da própria câmera,
+  que só ela impedia;
+- troca: para um dos cruzamentos livres com maior ganho de IPE no momento.
+
+Cada movimento é avaliado de forma incremental: o estado guarda quantas
+câmeras cobrem cada cruzamento, quantas câmeras (e pontos mínimos) estão a
+menos de `min_dist` de cada cruzamento e o IPE coberto por logradouro, então
+o ganho de cobertura ajustada (regra de 15%) de um movimento só olha os
+cruzamentos cobertos pelas duas câmeras envolvidas. A busca aceita o melhor
+movimento de cada câmera enquanto houver ganho e houver tempo.
+
+Com `pool`, as câmeras de cada lote são avaliadas em paralelo (threads ou
+processos) sobre o estado do início do lote; os movimentos propostos são
+conferidos no estado atual antes de serem aplicados, e a câmera cuja
+proposta deixou de valer é reavaliada em série. Cada processo recebe o
+espaço de busca e o estado inicial uma única vez e, a cada tarefa, só os
+movimentos aplicados desde então. O pool só compensa com vários núcleos e
+listas de troca longas (`candidatos_troca` na casa das centenas): com o
+padrão de 64 candidatos a busca em série costuma convergir antes, e as
+threads ficam limitadas pelo GIL, pois a cobertura ajustada é avaliada em
+laços Python.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from motor.cobertura import MatrizCobertura
+from motor.geo import pares_mais_perto_que
+from motor.otimizador import calcular_cameras_por_ponto
+from motor.rede import DistanciasRede, pares_cruzamentos_mais_perto_que
+from motor.tabela_cruzamentos import TabelaCruzamentos
+
+POOL_THREADS = 'threads'
+POOL_PROCESSOS = 'processos'
+POOLS_BUSCA_LOCAL = (POOL_THREADS, POOL_PROCESSOS)
+
+# Ganho mínimo (fração de cobertura) para aceitar um movimento
+GANHO_MINIMO = 1e-9
+
+# Câmeras avaliadas por trabalhador a cada lote do pool
+CAMERAS_POR_TAREFA = 16
+
+# Estado de cada processo do pool (preenchido por `_iniciar_processo`)
+_espaco = None
+_estado = None
+_movimentos_aplicados = 0
+
+
+def _csr(origem: np.ndarray, destino: np.ndarray, n: int) -> tuple:
+    ordem = np.lexsort((destino, origem))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(origem, minlength=n), out=indptr[1:])
+    return indptr, destino[ordem].astype(np.int32)
+
+
+class EspacoBusca:
+    """
+    Dados fixos da busca, indexados pela posição em `df`: cobertura de cada
+    cruzamento (CSR), vizinhos a menos de `min_dist` (CSR, sem o próprio) e
+    IPE por logradouro.
+    """
+
+    def __init__(self, tabela: TabelaCruzamentos, cob_indptr, cob_indices, viz_indptr, viz_indices,
+                 usar_cobertura_ajustada: bool, limiar: float = 0.15):
+        self.ipe = tabela.ipe
+        self.log1 = tabela.log1
+        self.log2 = tabela.log2
+        self.ipe_por_log = tabela.ipe_por_log.tolist()
+        self.cob_indptr, self.cob_indices = cob_indptr, cob_indices
+        self.viz_indptr, self.viz_indices = viz_indptr, viz_indices
+        self.usar_cobertura_ajustada = usar_cobertura_ajustada
+        self.limiar = limiar
+        self.ipe_total = float(tabela.ipe_por_log.sum() if usar_cobertura_ajustada else tabela.ipe.sum())
+
+    def __len__(self) -> int:
+        return len(self.ipe)
+
+    def cobertos(self, i: int) -> np.ndarray:
+        return self.cob_indices[self.cob_indptr[i]:self.cob_indptr[i + 1]]
+
+    def vizinhos(self, i: int) -> np.ndarray:
+        return self.viz_indices[self.viz_indptr[i]:self.viz_indptr[i + 1]]
+
+    def _contribuicao(self, log: int, ipe_coberto: float) -> float:
+        ipe_total_log = self.ipe_por_log[log]
+        if ipe_total_log <= 0:
+            return 0.0
+        return ipe_total_log if ipe_coberto >= self.limiar * ipe_total_log else ipe_coberto
+
+    def ganho_movimento(self, estado: 'EstadoBusca', perdidos: np.ndarray, c: int) -> float:
+        """
+        Variação da cobertura ao trocar a câmera cujos cruzamentos exclusivos
+        são `perdidos` por uma câmera em `c`.
+        """
+        cob_c = self.cobertos(c)
+        ganhos = cob_c[estado.vezes[cob_c] == 0]
+        if perdidos.size:
+            perdidos = perdidos[~np.isin(perdidos, cob_c, assume_unique=True)]
+        if not ganhos.size and not perdidos.size:
+            return 0.0
+        if not self.usar_cobertura_ajustada:
+            return (self.ipe[ganhos].sum() - self.ipe[perdidos].sum()) / self.ipe_total
+
+        variacao = {}
+        for sinal, posicoes in ((1.0, ganhos), (-1.0, perdidos)):
+            for ipe, log1, log2 in zip(self.ipe[posicoes].tolist(), self.log1[posicoes].tolist(),
+                                       self.log2[posicoes].tolist()):
+                variacao[log1] = variacao.get(log1, 0.0) + sinal * ipe
+                variacao[log2] = variacao.get(log2, 0.0) + sinal * ipe
+        ganho = 0.0
+        for log, delta in variacao.items():
+            anterior = estado.coberto_log[log]
+            ganho += self._contribuicao(log, anterior + delta) - self._contribuicao(log, anterior)
+        return ganho / self.ipe_total
+
+    def melhor_movimento(self, estado: 'EstadoBusca', s: int, candidatos_troca: np.ndarray) -> tuple:
+        """
+        Melhor destino para a câmera em `s`: `(ganho, destino, realocacao, avaliados)`,
+        com `destino=None` se nenhum movimento viável melhora a cobertura.
+        """
+        cob_s = self.cobertos(s)
+        perdidos = cob_s[estado.vezes[cob_s] == 1]
+        vizinhos = self.vizinhos(s)
+        # Realocação: cruzamentos bloqueados apenas pela própria câmera
+        realocaveis = vizinhos[(estado.bloqueio[vizinhos] == 1) & ~estado.selecionado[vizinhos]]
+        livres = candidatos_troca[(estado.bloqueio[candidatos_troca] == 0) & ~estado.selecionado[candidatos_troca]]
+
+        melhor = (GANHO_MINIMO, None, False)
+        for destinos, realocacao in ((realocaveis, True), (livres, False)):
+            for c in destinos.tolist():
+                ganho = self.ganho_movimento(estado, perdidos, c)
+                if ganho > melhor[0]:
+                    melhor = (ganho, c, realocacao)
+        return melhor + (len(realocaveis) + len(livres),)
+
+
+class EstadoBusca:
+    """Estado incremental: câmeras por cruzamento coberto, bloqueios de distância e IPE coberto por logradouro"""
+
+    def __init__(self, selecionado: np.ndarray, vezes: np.ndarray, bloqueio: np.ndarray, coberto_log: np.ndarray):
+        self.selecionado = selecionado
+        self.vezes = vezes
+        self.bloqueio = bloqueio
+        self.coberto_log = coberto_log
+
+    def copia(self) -> 'EstadoBusca':
+        return EstadoBusca(self.selecionado.copy(), self.vezes.copy(), self.bloqueio.copy(), self.coberto_log.copy())
+
+    def _somar_logradouros(self, espaco: EspacoBusca, posicoes: np.ndarray, sinal: float):
+        np.add.at(self.coberto_log, espaco.log1[posicoes], sinal * espaco.ipe[posicoes])
+        np.add.at(self.coberto_log, espaco.log2[posicoes], sinal * espaco.ipe[posicoes])
+
+    def adicionar(self, espaco: EspacoBusca, c: int):
+        cob_c = espaco.cobertos(c)
+        self.vezes[cob_c] += 1
+        self._somar_logradouros(espaco, cob_c[self.vezes[cob_c] == 1], 1.0)
+        self.bloqueio[espaco.vizinhos(c)] += 1
+        self.selecionado[c] = True
+
+    def remover(self, espaco: EspacoBusca, s: int):
+        cob_s = espaco.cobertos(s)
+        self.vezes[cob_s] -= 1
+        self._somar_logradouros(espaco, cob_s[self.vezes[cob_s] == 0], -1.0)
+        self.bloqueio[espaco.vizinhos(s)] -= 1
+        self.selecionado[s] = False
+
+
+def candidatos_por_ganho(espaco: EspacoBusca, estado: EstadoBusca, quantidade: int) -> np.ndarray:
+    """Cruzamentos livres com maior IPE ainda não coberto no raio (ordem decrescente)"""
+    livres = np.flatnonzero((estado.bloqueio == 0) & ~estado.selecionado)
+    if not livres.size or quantidade <= 0:
+        return livres[:0]
+    descoberto = np.where(estado.vezes[espaco.cob_indices] == 0, espaco.ipe[espaco.cob_indices], 0.0)
+    # Toda linha tem ao menos o próprio cruzamento, então reduceat não encontra fatias vazias
+    ganho = np.add.reduceat(descoberto, espaco.cob_indptr[:-1])[livres]
+    if len(livres) > quantidade:
+        topo = np.argpartition(-ganho, quantidade - 1)[:quantidade]
+        livres, ganho = livres[topo], ganho[topo]
+    return livres[np.argsort(-ganho, kind='stable')]
+
+
+def _melhores_movimentos(espaco: EspacoBusca, estado: EstadoBusca, cameras: list, candidatos: np.ndarray) -> list:
+    return [(s,) + espaco.melhor_movimento(estado, s, candidatos) for s in cameras]
+
+
+def _iniciar_processo(espaco: EspacoBusca, estado: EstadoBusca):
+    """Recebe os dados fixos e o estado inicial da busca uma única vez por processo do pool"""
+    global _espaco, _estado, _movimentos_aplicados
+    _espaco, _estado, _movimentos_aplicados = espaco, estado, 0
+
+
+def _melhores_movimentos_no_processo(movimentos: list, cameras: list, candidatos: np.ndarray) -> list:
+    """Reaplica na cópia do processo os movimentos `(s, c)` que ela ainda não viu e avalia `cameras`"""
+    global _movimentos_aplicados
+    for s, c in movimentos[_movimentos_aplicados:]:
+        _estado.remover(_espaco, s)
+        _estado.adicionar(_espaco, c)
+    _movimentos_aplicados = len(movimentos)
+    return _melhores_movimentos(_espaco, _estado, cameras, candidatos)
+
+
+def melhorar_por_busca_local(df: pd.DataFrame, resultado: tuple, min_dist: float,
+                             cobertura_frac: float = 1.0, raio_cobertura: float = 50,
+                             logs: pd.DataFrame = None,
+                             matriz_cobertura: MatrizCobertura = None,
+                             distancias_rede: DistanciasRede = None,
+                             limite_cobertura_logradouro: float = None,
+                             tempo_limite: float = 5.0, candidatos_troca: int = 64,
+                             pool: str = None, trabalhadores: int = None) -> tuple:
+    """
+    Melhora por busca local a seleção `resultado` de `filtrar_por_cobertura_e_distancia`
+    (chamada com os mesmos `df`, `min_dist`, `raio_cobertura`, `logs` e `distancias_rede`).
+
+    Devolve `(resultado, info)`: `resultado` é a mesma tupla, com os pontos
+    movidos, e `info` traz cobertura inicial e final, ganho, tempo, ganho por
+    segundo e os movimentos aceitos. Pontos mínimos ficam fixos e o número de
+    pontos não muda. Com `limite_cobertura_logradouro` a seleção é devolvida
+    sem alteração (o limite por logradouro não é reavaliado nos movimentos).
+
+    `pool` (`'threads'` ou `'processos'`) avalia as câmeras de cada lote em
+    paralelo com `trabalhadores` (padrão: CPUs disponíveis); ver a nota do
+    módulo sobre quando compensa.
+    """
+    if pool is not None and pool not in POOLS_BUSCA_LOCAL:
+        raise ValueError(f"Pool desconhecido: {pool!r}")
+
+    inicio = time.perf_counter()
+    df_sel, cobertura_inicial, _, motivo_limite, _, df_minimos, total_cameras = resultado
+    info = {
+        'status': 'sem pontos', 'cobertura_inicial': float(cobertura_inicial), 'cobertura': float(cobertura_inicial),
+        'ganho': 0.0, 'segundos': 0.0, 'ganho_por_segundo': 0.0, 'trocas': 0, 'realocacoes': 0,
+        'avaliacoes': 0, 'rodadas': 0,
+    }
+    if df_sel.empty or df.empty or df['ipe_cruz'].sum() <= 0:
+        return resultado, info
+    if limite_cobertura_logradouro is not None:
+        info['status'] = 'limite por logradouro'
+        return resultado, info
+
+    tabela = TabelaCruzamentos(df)
+    n = len(tabela)
+    if matriz_cobertura is None or not matriz_cobertura.compativel(tabela.ids, raio_cobertura, distancias_rede):
+        matriz_cobertura = MatrizCobertura.construir(df, raio_cobertura, distancias_rede)
+    cob_indptr, cob_indices = matriz_cobertura.em_ordem(tabela.ids)
+
+    viz_indptr, viz_indices = np.zeros(n + 1, dtype=np.int64), np.zeros(0, dtype=np.int32)
+    bloqueio = np.zeros(n, dtype=np.int32)
+    vezes = np.zeros(n, dtype=np.int32)
+    if min_dist > 0:
+        ia, jb = pares_cruzamentos_mais_perto_que(tabela.ids, tabela.lat, tabela.lon, min_dist, distancias_rede,
+                                                  so_i_menor_j=True)
+        viz_indptr, viz_indices = _csr(np.concatenate([ia, jb]), np.concatenate([jb, ia]), n)
+
+    # Pontos mínimos: cobertura e bloqueios fixos
+    if not df_minimos.empty:
+        lat_min = df_minimos['lat'].to_numpy(dtype=float)
+        lon_min = df_minimos['lon'].to_numpy(dtype=float)
+        _, cobertos = matriz_cobertura.cobertos_por_pontos(lat_min, lon_min)
+        posicao_em_df = np.empty(n, dtype=np.int64)
+        posicao_em_df[matriz_cobertura.posicoes(tabela.ids)] = np.arange(n)
+        np.add.at(vezes, posicao_em_df[cobertos], 1)
+        if min_dist > 0:
+            _, perto = pares_mais_perto_que(lat_min, lon_min, tabela.lat, tabela.lon, min_dist)
+            np.add.at(bloqueio, perto, 1)
+
+    usar_cobertura_ajustada = logs is not None and not logs.empty
+    espaco = EspacoBusca(tabela, cob_indptr, cob_indices, viz_indptr, viz_indices, usar_cobertura_ajustada)
+    posicoes_iniciais = pd.Index(tabela.ids).get_indexer(df_sel['id'])
+    estado = EstadoBusca(np.zeros(n, dtype=bool), vezes, bloqueio, np.zeros(tabela.qtd_logradouros))
+    estado._somar_logradouros(espaco, np.flatnonzero(vezes > 0), 1.0)
+    for i in posicoes_iniciais.tolist():
+        estado.adicionar(espaco, i)
+
+    def tempo_esgotado():
+        return time.perf_counter() - inicio >= tempo_limite
+
+    movimentos = []
+
+    def aplicar(s, c, realocacao):
+        estado.remover(espaco, s)
+        estado.adicionar(espaco, c)
+        movimentos.append((s, c))
+        info['realocacoes' if realocacao else 'trocas'] += 1
+
+    def ainda_melhora(s, c):
+        """Confere no estado atual uma proposta feita no início do lote"""
+        if estado.selecionado[c] or estado.bloqueio[c] - int(c in espaco.vizinhos(s)) != 0:
+            return False
+        cob_s = espaco.cobertos(s)
+        return espaco.ganho_movimento(estado, cob_s[estado.vezes[cob_s] == 1], c) > GANHO_MINIMO
+
+    executor = None
+    if pool is not None:
+        trabalhadores = trabalhadores or os.cpu_count() or 1
+        if pool == POOL_PROCESSOS:
+            # Cópia do estado inicial: os processos sobem sob demanda, depois de movimentos já aplicados
+            executor = ProcessPoolExecutor(max_workers=trabalhadores, initializer=_iniciar_processo,
+                                           initargs=(espaco, estado.copia()))
+        else:
+            executor = ThreadPoolExecutor(max_workers=trabalhadores)
+
+    info['status'] = 'ótimo local'
+    try:
+        melhorou = True
+        while melhorou and info['status'] == 'ótimo local':
+            melhorou = False
+            info['rodadas'] += 1
+            candidatos = candidatos_por_ganho(espaco, estado, candidatos_troca)
+            # Câmeras de menor IPE primeiro: são as que mais provavelmente valem a pena mover
+            cameras = np.flatnonzero(estado.selecionado)[::-1].tolist()
+
+            if executor is None:
+                for s in cameras:
+                    if tempo_esgotado():
+                        info['status'] = 'tempo limite'
+                        break
+                    if not estado.selecionado[s]:
+                        continue
+                    ganho, c, realocacao, avaliados = espaco.melhor_movimento(estado, s, candidatos)
+                    info['avaliacoes'] += avaliados
+                    if c is not None:
+                        aplicar(s, c, realocacao)
+                        melhorou = True
+                continue
+
+            tamanho_lote = trabalhadores * CAMERAS_POR_TAREFA
+            for inicio_lote in range(0, len(cameras), tamanho_lote):
+                if tempo_esgotado():
+                    info['status'] = 'tempo limite'
+                    break
+                lote = cameras[inicio_lote:inicio_lote + tamanho_lote]
+                tarefas = [lote[k:k + CAMERAS_POR_TAREFA] for k in range(0, len(lote), CAMERAS_POR_TAREFA)]
+                if pool == POOL_PROCESSOS:
+                    futuros = [executor.submit(_melhores_movimentos_no_processo, movimentos, t, candidatos)
+                               for t in tarefas]
+                else:
+                    futuros = [executor.submit(_melhores_movimentos, espaco, estado, t, candidatos) for t in tarefas]
+                # O estado só muda depois que todas as propostas do lote chegaram
+                propostas = [proposta for futuro in futuros for proposta in futuro.result()]
+                for s, _, c, realocacao, avaliados in propostas:
+                    info['avaliacoes'] += avaliados
+                    if c is None or not estado.selecionado[s]:
+                        continue
+                    if not ainda_melhora(s, c):
+                        # Um movimento anterior do lote invalidou a proposta: reavalia em série
+                        _, c, realocacao, avaliados = espaco.melhor_movimento(estado, s, candidatos)
+                        info['avaliacoes'] += avaliados
+                        if c is None:
+                            continue
+                    aplicar(s, c, realocacao)
+                    melhorou = True
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    coberto = estado.vezes > 0
+    if usar_cobertura_ajustada:
+        cobertura = tabela.cobertura_ajustada(coberto, espaco.limiar)
+    else:
+        cobertura = float(tabela.ipe[coberto].sum() / tabela.ipe.sum())
+    info['segundos'] = time.perf_counter() - inicio
+    if info['trocas'] + info['realocacoes'] == 0 or cobertura <= cobertura_inicial:
+        info['trocas'] = info['realocacoes'] = 0
+        return resultado, info
+
+    info['cobertura'] = cobertura
+    info['ganho'] = cobertura - float(cobertura_inicial)
+    info['ganho_por_segundo'] = info['ganho'] / info['segundos'] if info['segundos'] > 0 else 0.0
+
+    selecionados = np.flatnonzero(estado.selecionado)
+    minimos_pontos = len(df_minimos)
+    df_result = df.iloc[selecionados].reset_index(drop=True)
+    df_result['cameras'] = [calcular_cameras_por_ponto(minimos_pontos + t) for t in range(len(selecionados))]
+    df_result['cobertura_acum'] = df_result['ipe_cruz'].cumsum() / df['ipe_cruz'].sum()
+
+    alvo_atingido = cobertura >= cobertura_frac * 0.99
+    if alvo_atingido:
+        motivo_limite = None
+    ids_cobertos = set(tabela.ids[coberto].tolist())
+    return (df_result, cobertura, alvo_atingido, motivo_limite, ids_cobertos, df_minimos, total_cameras), info
@@ -0,0 +1,128 @@
+"""
+Cache colunar (Parquet) das planilhas de entrada.
+
+Cada planilha é lida e normalizada uma única vez; os DataFrames resultantes
+ficam em disco, identificados pelo caminho do arquivo de origem, seu mtime e o
+hash SHA-256 do conteúdo. Se a planilha for substituída, o cache é refeito
+automaticamente na próxima carga.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Incrementar quando a normalização feita pelos carregadores mudar
+VERSAO_CACHE = 1
+
+
+def hash_arquivo(caminho: Path, tamanho_bloco: int = 1 << 20) -> str:
+    """SHA-256 do conteúdo do arquivo"""
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+class CacheDados:
+    """
+    Serve os DataFrames normalizados de cada planilha a partir de Parquet.
+
+    `carregar(caminho, carregador, *args)` aceita qualquer carregador no padrão
+    do projeto, que devolve `(df1, ..., dfN, msg)` e `None` nos DataFrames em
+    caso de erro. Erros nunca são gravados no cache.
+    """
+
+    def __init__(self, diretorio: Path):
+        self.diretorio = Path(diretorio)
+        self.tempos = []
+
+    def _pasta(self, caminho: Path, variante: str) -> Path:
+        chave = f"{Path(caminho).resolve()}|{variante}"
+        sufixo = hashlib.sha1(chave.encode('utf-8')).hexdigest()[:12]
+        return self.diretorio / f"{Path(caminho).stem}-{sufixo}"
+
+    def _ler_meta(self, pasta: Path):
+        try:
+            with open(pasta / 'meta.json', 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _valido(self, meta: dict, caminho: Path, stat: os.stat_result, pasta: Path) -> bool:
+        if meta is None or meta.get('versao') != VERSAO_CACHE:
+            return False
+        if meta.get('caminho') != str(Path(caminho).resolve()):
+            return False
+        if meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('tamanho') == stat.st_size:
+            return True
+        # mtime mudou: só refaz se o conteúdo realmente mudou
+        if meta.get('tamanho') == stat.st_size and meta.get('sha256') == hash_arquivo(caminho):
+            meta['mtime_ns'] = stat.st_mtime_ns
+            self._gravar_meta(pasta, meta)
+            return True
+        return False
+
+    def _gravar_meta(self, pasta: Path, meta: dict):
+        tmp = pasta / 'meta.json.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, pasta / 'meta.json')
+
+    def _gravar(self, pasta: Path, caminho: Path, stat: os.stat_result, tabelas: tuple, msg: str):
+        pasta.mkdir(parents=True, exist_ok=True)
+        for i, tabela in enumerate(tabelas):
+            tmp = pasta / f"tabela_{i}.parquet.tmp"
+            tabela.to_parquet(tmp)
+            os.replace(tmp, pasta / f"tabela_{i}.parquet")
+        self._gravar_meta(pasta, {
+            'versao': VERSAO_CACHE,
+            'caminho': str(Path(caminho).resolve()),
+            'mtime_ns': stat.st_mtime_ns,
+            'tamanho': stat.st_size,
+            'sha256': hash_arquivo(caminho),
+            'qtd_tabelas': len(tabelas),
+            'msg': msg,
+        })
+
+    def carregar(self, caminho: Path, carregador, *args, variante: str = '') -> tuple:
+        """Carrega do cache se válido; senão executa `carregador(caminho, *args)` e grava"""
+        inicio = time.perf_counter()
+        caminho = Path(caminho)
+        if not caminho.exists():
+            return carregador(caminho, *args)
+
+        stat = caminho.stat()
+        pasta = self._pasta(caminho, variante)
+        meta = self._ler_meta(pasta)
+
+        if self._valido(meta, caminho, stat, pasta):
+            try:
+                tabelas = tuple(
+                    pd.read_parquet(pasta / f"tabela_{i}.parquet") for i in range(meta['qtd_tabelas'])
+                )
+                self._registrar_tempo(caminho, 'cache', inicio)
+                return (*tabelas, meta['msg'])
+            except Exception:
+                pass  # Cache corrompido ou sem engine Parquet: relê a planilha
+
+        resultado = carregador(caminho, *args)
+        tabelas, msg = resultado[:-1], resultado[-1]
+        if all(t is not None for t in tabelas):
+            try:
+                self._gravar(pasta, caminho, stat, tabelas, msg)
+            except Exception:
+                pass  # Sem permissão de escrita ou sem pyarrow: segue sem cache
+        self._registrar_tempo(caminho, 'planilha', inicio)
+        return resultado
+
+    def _registrar_tempo(self, caminho: Path, origem: str, inicio: float):
+        self.tempos.append({
+            'arquivo': Path(caminho).name,
+            'origem': origem,
+            'segundos': time.perf_counter() - inicio,
+        })
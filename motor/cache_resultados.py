@@ -0,0 +1,188 @@
+"""
+Memoização dos resultados do otimizador por cenário.
+
+O resultado de `filtrar_por_cobertura_e_distancia` depende apenas dos
+parâmetros do cenário (pesos, cobertura alvo, distância mínima, limite de
+câmeras, RED...), da versão da base e do código do motor. A chave é um hash
+canônico desses parâmetros somado à impressão digital da base e a
+`VERSAO_RESULTADOS`; os resultados ficam em um LRU em memória e,
+opcionalmente, em um SQLite em disco compartilhado entre processos e
+preservado entre deploys.
+"""
+
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+# Incrementar a cada mudança no motor que altere resultados ou objetos guardados
+# (otimizador, curva, busca local, MILP, Pareto, sensibilidade, cobertura, IPE):
+# as chaves antigas deixam de ser consultadas e saem do SQLite pelo LRU
+VERSAO_RESULTADOS = 1
+
+
+def _canonico(valor):
+    """Normaliza valores para que cenários equivalentes gerem a mesma chave"""
+    if isinstance(valor, float):
+        return round(valor, 12)
+    if hasattr(valor, 'item'):  # escalares NumPy
+        return _canonico(valor.item())
+    if isinstance(valor, (list, tuple)):
+        return [_canonico(v) for v in valor]
+    if isinstance(valor, dict):
+        return {str(k): _canonico(v) for k, v in valor.items()}
+    if isinstance(valor, Path):
+        return str(valor)
+    return valor
+
+
+def chave_cenario(impressao_digital: str, **parametros) -> str:
+    """Hash SHA-256 dos parâmetros do cenário + impressão digital da base + versão do motor"""
+    conteudo = json.dumps(
+        {'versao': VERSAO_RESULTADOS, 'base': impressao_digital, 'parametros': _canonico(parametros)},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+class CacheResultados:
+    """
+    LRU limitado de resultados, com backend SQLite opcional.
+
+    É seguro para uso concorrente (várias sessões do Streamlit no mesmo
+    processo). Os valores devolvidos são compartilhados e devem ser tratados
+    como somente leitura.
+    """
+
+    def __init__(self, max_itens: int = 64, caminho_sqlite: Path = None, max_itens_disco: int = 1000):
+        self.max_itens = max_itens
+        self.max_itens_disco = max_itens_disco
+        self.caminho_sqlite = Path(caminho_sqlite) if caminho_sqlite is not None else None
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+        if self.caminho_sqlite is not None:
+            self._iniciar_sqlite()
+
+    def _conectar(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.caminho_sqlite, timeout=30)
+
+    def _iniciar_sqlite(self):
+        try:
+            self.caminho_sqlite.parent.mkdir(parents=True, exist_ok=True)
+            with self._conectar() as con:
+                con.execute("""CREATE TABLE IF NOT EXISTS resultados (
+                    chave TEXT PRIMARY KEY, valor BLOB NOT NULL, acessado_em REAL NOT NULL)""")
+        except sqlite3.Error:
+            self.caminho_sqlite = None  # Sem disco gravável: apenas memória
+
+    def _ler_disco(self, chave: str):
+        if self.caminho_sqlite is None:
+            return None
+        try:
+            with self._conectar() as con:
+                linha = con.execute("SELECT valor FROM resultados WHERE chave = ?", (chave,)).fetchone()
+                if linha is None:
+                    return None
+                con.execute("UPDATE resultados SET acessado_em = ? WHERE chave = ?", (time.time(), chave))
+        except sqlite3.Error:
+            return None
+        try:
+            return pickle.loads(linha[0])
+        except Exception:
+            # Classe renomeada ou movida, pickle corrompido...: falha de cache, e a linha é descartada
+            self._remover_disco(chave)
+            return None
+
+    def _remover_disco(self, chave: str):
+        try:
+            with self._conectar() as con:
+                con.execute("DELETE FROM resultados WHERE chave = ?", (chave,))
+        except sqlite3.Error:
+            pass
+
+    def _gravar_disco(self, chave: str, valor):
+        if self.caminho_sqlite is None:
+            return
+        try:
+            with self._conectar() as con:
+                con.execute(
+                    "INSERT OR REPLACE INTO resultados (chave, valor, acessado_em) VALUES (?, ?, ?)",
+                    (chave, pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL), time.time())
+                )
+                con.execute("""DELETE FROM resultados WHERE chave IN (
+                    SELECT chave FROM resultados ORDER BY acessado_em DESC LIMIT -1 OFFSET ?)""",
+                            (self.max_itens_disco,))
+        except sqlite3.Error:
+            pass
+
+    def _guardar_memoria(self, chave: str, valor):
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def obter(self, chave: str, contar: bool = True):
+        """
+        Resultado em cache para `chave` (memória ou disco), ou None se ainda não foi calculado.
+
+        Com `contar=False` a consulta não entra nos acertos: para leituras que
+        só redesenham um resultado já exibido, sem poupar cálculo algum.
+        """
+        with self._lock:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                if contar:
+                    self.acertos_memoria += 1
+                return self._itens[chave]
+
+        valor = self._ler_disco(chave)
+        if valor is not None:
+            if contar:
+                with self._lock:
+                    self.acertos_disco += 1
+            self._guardar_memoria(chave, valor)
+        return valor
+
+    def obter_ou_calcular(self, chave: str, calcular):
+        """Devolve o resultado em cache para `chave` ou executa `calcular()` e guarda"""
+        valor = self.obter(chave)
+        if valor is not None:
+            return valor
+
+        valor = calcular()
+        with self._lock:
+            self.falhas += 1
+        self._guardar_memoria(chave, valor)
+        self._gravar_disco(chave, valor)
+        return valor
+
+    def _contar_disco(self) -> int:
+        if self.caminho_sqlite is None:
+            return 0
+        try:
+            with self._conectar() as con:
+                return con.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def estatisticas(self) -> dict:
+        itens_disco = self._contar_disco()
+        with self._lock:
+            acertos = self.acertos_memoria + self.acertos_disco
+            consultas = acertos + self.falhas
+            return {
+                'acertos_memoria': self.acertos_memoria,
+                'acertos_disco': self.acertos_disco,
+                'falhas': self.falhas,
+                'taxa_acerto': acertos / consultas if consultas else 0.0,
+                'itens_memoria': len(self._itens),
+                'itens_disco': itens_disco,
+            }
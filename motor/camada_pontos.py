@@ -0,0 +1,100 @@
+"""
+Pontos com câmera como uma única camada GeoJSON para o mapa.
+
+Em vez de um `CircleMarker` com o HTML do popup por ponto, os pontos
+otimizados e os pontos mínimos viram uma FeatureCollection com só os campos
+do popup em `properties`; o navegador desenha os círculos em um canvas e
+monta o popup ao clicar (`POPUP_PONTOS_JS`, passado a `on_each_feature`).
+O módulo não depende do Folium: `pontos_geojson` devolve um dict e o estilo de
+cada grupo está em `ESTILO_PONTOS`.
+"""
+
+import numpy as np
+import pandas as pd
+
+GRUPO_IPE = 'ipe'
+GRUPO_MINIMO = 'minimo'
+GRUPO_RED = 'red'
+
+# Cor e espessura da borda de cada grupo, iguais às dos marcadores individuais
+ESTILO_PONTOS = {
+    GRUPO_IPE: {'color': '#3b82f6', 'fillColor': '#3b82f6', 'weight': 1},
+    GRUPO_MINIMO: {'color': '#f6443b', 'fillColor': '#f6443b', 'weight': 2},
+    GRUPO_RED: {'color': '#10b981', 'fillColor': '#10b981', 'weight': 2},
+}
+
+# Casas decimais das coordenadas (~0,1 m)
+CASAS_COORDENADAS = 6
+
+# Popup montado no navegador a partir de `properties` (mesmo HTML dos marcadores individuais)
+POPUP_PONTOS_JS = """
+function(feature, layer) {
+    var p = feature.properties;
+    var esc = function(v) {
+        return String(v).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+    };
+    var corpo;
+    if (p.grupo === 'ipe') {
+        corpo = '<strong>Cruzamento ' + p.id + '</strong><br/>'
+            + '<b>Ruas:</b> ' + esc(p.log1) + ' x ' + esc(p.log2) + '<br/>'
+            + '<b>IPE:</b> ' + Number(p.ipe).toFixed(4) + '<br/>';
+    } else {
+        corpo = '<strong>' + (p.grupo === 'red' ? '📍 PONTO RED (Concessão)' : '📍 PONTO OBRIGATÓRIO') + '</strong><br/>'
+            + '<b>Motivo:</b> ' + esc(p.tipo) + '<br/>'
+            + '<b>Logradouro:</b> ' + esc(p.logradouro) + '<br/>'
+            + '<b>Prioridade:</b> ' + esc(p.prioridade) + '<br/>'
+            + '<b>Câmeras:</b> ' + esc(p.cameras);
+    }
+    layer.bindPopup('<div style="font-size:0.8rem; min-width:180px;">' + corpo + '</div>', {maxWidth: 250});
+}
+"""
+
+
+def _coluna(df: pd.DataFrame, nome: str, padrao) -> list:
+    """Valores da coluna `nome` como tipos Python, com `padrao` para ausentes"""
+    if nome not in df.columns:
+        return [padrao] * len(df)
+    return df[nome].astype(object).where(df[nome].notna(), padrao).tolist()
+
+
+def _features(lats, lons, propriedades: dict) -> list:
+    coords = np.round(np.column_stack([lons, lats]).astype(float), CASAS_COORDENADAS).tolist()
+    nomes = list(propriedades)
+    return [
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': xy},
+         'properties': dict(zip(nomes, valores))}
+        for xy, valores in zip(coords, zip(*propriedades.values()))
+    ]
+
+
+def pontos_geojson(cruzamentos_selecionados: pd.DataFrame, pontos_minimos_usados: pd.DataFrame = None,
+                   mostrar_pontos_minimos: bool = True, mostrar_pontos_ipe: bool = True) -> dict:
+    """
+    FeatureCollection com os pontos mínimos (grupos `minimo` e `red`) seguidos
+    dos pontos otimizados (grupo `ipe`), na ordem em que são desenhados.
+    """
+    features = []
+    if mostrar_pontos_minimos and pontos_minimos_usados is not None and not pontos_minimos_usados.empty:
+        df = pontos_minimos_usados
+        tipos = _coluna(df, 'tipo', 'N/A')
+        red = np.array(_coluna(df, 'is_red', False), dtype=bool)
+        red |= np.array([str(t).strip().upper() == 'RED' for t in tipos], dtype=bool)
+        features += _features(df['lat'], df['lon'], {
+            'grupo': np.where(red, GRUPO_RED, GRUPO_MINIMO).tolist(),
+            'tipo': tipos,
+            'logradouro': _coluna(df, 'logradouro', 'N/A'),
+            'prioridade': _coluna(df, 'prioridade', 'N/A'),
+            'cameras': _coluna(df, 'cameras', 1),
+        })
+
+    if mostrar_pontos_ipe and not cruzamentos_selecionados.empty:
+        df = cruzamentos_selecionados
+        features += _features(df['lat'], df['lon'], {
+            'grupo': [GRUPO_IPE] * len(df),
+            'id': df['id'].astype(int).tolist(),
+            'log1': _coluna(df, 'log1', ''),
+            'log2': _coluna(df, 'log2', ''),
+            'ipe': df['ipe_cruz'].astype(float).round(6).tolist(),
+        })
+
+    return {'type': 'FeatureCollection', 'features': features}
@@ -0,0 +1,172 @@
+"""
+Matriz esparsa de cobertura entre cruzamentos.
+
+As coordenadas dos cruzamentos não mudam entre reruns, então o conjunto de
+cruzamentos cobertos por uma câmera em cada cruzamento (a até
+`raio_cobertura` metros e com logradouro em comum) é calculado uma única vez
+por base e raio, em formato CSR (`indptr`/`indices`), e gravado junto ao
+cache Parquet. No otimizador, expandir a cobertura de uma câmera passa a ser
+uma fatia de array.
+
+Com `distancias_rede` (ver `motor.rede`), o raio passa a ser medido pela rede
+de logradouros em vez da linha reta.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from motor.geo import pares_no_raio
+from motor.rede import DistanciasRede
+
+# Incrementar quando o critério de cobertura mudar
+VERSAO_MATRIZ = 1
+
+# Raio de cobertura de cada câmera usado pela aplicação (m)
+RAIO_COBERTURA_PADRAO = 50
+
+
+class MatrizCobertura:
+    """
+    CSR cruzamento → cruzamentos cobertos.
+
+    A linha `i` (cruzamento `ids[i]`) lista as posições `j` com distância de
+    Haversine ≤ `raio` e algum logradouro em comum, incluindo o próprio `i`.
+    Com `por_rede`, a distância também precisa ser ≤ `raio` pela rede.
+    """
+
+    def __init__(self, ids: np.ndarray, lats: np.ndarray, lons: np.ndarray, raio: float,
+                 indptr: np.ndarray, indices: np.ndarray, impressao: str, por_rede: bool = False):
+        self.ids = ids
+        self.lats = lats
+        self.lons = lons
+        self.raio = float(raio)
+        self.indptr = indptr
+        self.indices = indices
+        self.impressao = impressao
+        self.por_rede = bool(por_rede)
+        self._posicao = pd.Index(ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def impressao_cruzamentos(cruzamentos: pd.DataFrame, distancias_rede: DistanciasRede = None) -> str:
+        """Hash das colunas que definem a cobertura (id, coordenadas e logradouros) e da rede usada"""
+        h = hashlib.sha256(f"v{VERSAO_MATRIZ}".encode('utf-8'))
+        for coluna in ('id', 'lat', 'lon', 'cod_log1', 'cod_log2'):
+            h.update(np.ascontiguousarray(cruzamentos[coluna].to_numpy(dtype=float)).tobytes())
+        if distancias_rede is not None:
+            h.update(distancias_rede.impressao.encode('utf-8'))
+        return h.hexdigest()
+
+    @classmethod
+    def construir(cls, cruzamentos: pd.DataFrame, raio: float,
+                  distancias_rede: DistanciasRede = None) -> 'MatrizCobertura':
+        lats = cruzamentos['lat'].to_numpy(dtype=float)
+        lons = cruzamentos['lon'].to_numpy(dtype=float)
+        cods1 = cruzamentos['cod_log1'].to_numpy()
+        cods2 = cruzamentos['cod_log2'].to_numpy()
+
+        if distancias_rede is not None:
+            if distancias_rede.alcance < raio:
+                raise ValueError(f"Raio {raio:g} m acima do alcance da rede ({distancias_rede.alcance:g} m)")
+            posicao_na_rede = distancias_rede.posicoes(cruzamentos['id'])
+
+        def mesmo_logradouro(ia, jb):
+            # Câmera só cobre cruzamentos que compartilham logradouro com ela
+            manter = ((cods1[ia] == cods1[jb]) | (cods1[ia] == cods2[jb]) |
+                      (cods2[ia] == cods1[jb]) | (cods2[ia] == cods2[jb]))
+            if distancias_rede is not None:
+                manter &= distancias_rede.distancias_entre(posicao_na_rede[ia], posicao_na_rede[jb]) <= raio
+            return manter
+
+        ia, jb = pares_no_raio(lats, lons, lats, lons, raio, filtro=mesmo_logradouro)
+        indptr = np.zeros(len(lats) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ia, minlength=len(lats)), out=indptr[1:])
+        return cls(cruzamentos['id'].to_numpy(), lats, lons, raio, indptr, jb.astype(np.int32),
+                   cls.impressao_cruzamentos(cruzamentos, distancias_rede), por_rede=distancias_rede is not None)
+
+    def compativel(self, ids, raio: float, distancias_rede: DistanciasRede = None) -> bool:
+        """Indica se a matriz serve para os cruzamentos `ids`, o raio e a medida de distância"""
+        return (self.raio == float(raio) and self.por_rede == (distancias_rede is not None)
+                and len(self) == len(ids) and bool((self.posicoes(ids) >= 0).all()))
+
+    def posicoes(self, ids) -> np.ndarray:
+        """Linha de cada id (-1 se ausente)"""
+        return self._posicao.get_indexer(ids)
+
+    def cobertos(self, posicao: int) -> np.ndarray:
+        """Posições dos cruzamentos cobertos por uma câmera no cruzamento da linha `posicao`"""
+        return self.indices[self.indptr[posicao]:self.indptr[posicao + 1]]
+
+    def em_ordem(self, ids) -> tuple:
+        """
+        CSR `(indptr, indices)` com linhas e colunas na ordem de `ids` (ex.:
+        as posições do DataFrame de IPE, ordenado por IPE). Todos os ids
+        precisam estar na matriz.
+        """
+        linhas = self.posicoes(ids)
+        nova_posicao = np.empty(len(self), dtype=np.int64)
+        nova_posicao[linhas] = np.arange(len(linhas))
+        contagens = np.diff(self.indptr)[linhas]
+        indptr = np.zeros(len(linhas) + 1, dtype=np.int64)
+        np.cumsum(contagens, out=indptr[1:])
+        origem = np.repeat(self.indptr[linhas] - indptr[:-1], contagens) + np.arange(indptr[-1])
+        return indptr, nova_posicao[self.indices[origem]]
+
+    def cobertos_por_pontos(self, lats, lons) -> tuple:
+        """
+        CSR ponto → cruzamentos a até `raio` metros, para pontos arbitrários
+        (ex.: pontos mínimos), sem a restrição de logradouro.
+        """
+        ia, jb = pares_no_raio(lats, lons, self.lats, self.lons, self.raio)
+        indptr = np.zeros(len(np.atleast_1d(lats)) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ia, minlength=len(indptr) - 1), out=indptr[1:])
+        return indptr, jb
+
+    def salvar(self, caminho: Path):
+        caminho = Path(caminho)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        tmp = caminho.with_name(caminho.name + '.tmp.npz')
+        np.savez(tmp, ids=self.ids, lats=self.lats, lons=self.lons, raio=self.raio,
+                 indptr=self.indptr, indices=self.indices, impressao=self.impressao, por_rede=self.por_rede)
+        os.replace(tmp, caminho)
+
+    @classmethod
+    def carregar(cls, caminho: Path) -> 'MatrizCobertura':
+        with np.load(caminho, allow_pickle=False) as dados:
+            # Arquivos anteriores ao modo de rede não têm `por_rede`: são de linha reta
+            por_rede = bool(dados['por_rede']) if 'por_rede' in dados.files else False
+            return cls(dados['ids'], dados['lats'], dados['lons'], float(dados['raio']),
+                       dados['indptr'], dados['indices'], str(dados['impressao']), por_rede)
+
+
+def obter_matriz_cobertura(cruzamentos: pd.DataFrame, raio: float, dir_cache: Path = None,
+                           distancias_rede: DistanciasRede = None) -> MatrizCobertura:
+    """
+    Matriz de cobertura do raio, lida de `dir_cache` se corresponder aos
+    mesmos cruzamentos e à mesma medida de distância; senão é calculada e gravada.
+    """
+    impressao = MatrizCobertura.impressao_cruzamentos(cruzamentos, distancias_rede)
+    por_rede = distancias_rede is not None
+    caminho = None
+    if dir_cache is not None:
+        caminho = Path(dir_cache) / f"cobertura-{float(raio):g}m{'-rede' if por_rede else ''}.npz"
+        try:
+            matriz = MatrizCobertura.carregar(caminho)
+            if matriz.impressao == impressao and matriz.raio == float(raio) and matriz.por_rede == por_rede:
+                return matriz
+        except (OSError, ValueError, KeyError):
+            pass  # Ausente ou corrompida: recalcula
+
+    matriz = MatrizCobertura.construir(cruzamentos, raio, distancias_rede)
+    if caminho is not None:
+        try:
+            matriz.salvar(caminho)
+        except OSError:
+            pass  # Sem permissão de escrita: segue só em memória
+    return matriz
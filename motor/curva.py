@@ -0,0 +1,233 @@
+"""
+Curva cobertura x orçamento a partir de uma única execução gulosa.
+
+Para pesos, distância mínima e pontos mínimos fixos, a ordem de aceitação
+do otimizador não depende do limite de câmeras nem da cobertura alvo: os
+cenários de 500, 1.000 e 2.000 câmeras são prefixos da mesma execução. A
+curva roda o guloso uma vez até o teto de câmeras, registra cobertura,
+câmeras e custo após cada ponto aceito e responde qualquer orçamento ou
+cobertura alvo por busca binária, devolvendo o mesmo resultado de
+`filtrar_por_cobertura_e_distancia`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from motor.metricas import CUSTO_UNITARIO_CAMERA
+from motor.cobertura import MatrizCobertura
+from motor.otimizador import MODO_IPE, calcular_cameras_por_ponto, filtrar_por_cobertura_e_distancia
+from motor.rede import DistanciasRede
+
+# Teto do orçamento (total de câmeras, com RED); a curva cobertura x orçamento vai até ele
+CAMERAS_MAXIMO = 4032
+
+EIXOS_COBERTURA = ('total', 'seg', 'lct', 'com', 'mob')
+LIMIAR_LOGRADOURO = 0.15
+
+
+def cobertura_eixos_por_passo(df: pd.DataFrame, passo_cruzamento: np.ndarray, qtd_passos: int) -> tuple:
+    """
+    Cobertura ajustada (regra de 15%) total e por eixo, em %, após cada passo.
+
+    Equivale a `calcular_cobertura_por_logradouro_ajustada` para cada prefixo,
+    mas calculada de uma vez: cada logradouro contribui com o IPE coberto até
+    o passo em que atinge 15% e com o IPE total a partir dele.
+    """
+    colunas = ['ipe_cruz', 'ipe_cruz_seg', 'ipe_cruz_lct', 'ipe_cruz_com', 'ipe_cruz_mob']
+    valores = np.vstack([df[colunas].to_numpy(dtype=float)] * 2)
+    logs = np.concatenate([df['cod_log1'].to_numpy(), df['cod_log2'].to_numpy()])
+    passos = np.concatenate([passo_cruzamento, passo_cruzamento])
+
+    codigos, log_idx = np.unique(logs, return_inverse=True)
+    totais_log = np.zeros((len(codigos), len(colunas)))
+    np.add.at(totais_log, log_idx, valores)
+    totais_eixo = totais_log.sum(axis=0)
+
+    # Passo em que cada logradouro atinge 15% do seu IPE (nunca = qtd_passos)
+    ordem = np.lexsort((passos, log_idx))
+    log_ord, passo_ord = log_idx[ordem], passos[ordem]
+    acumulado = np.cumsum(valores[ordem, 0])
+    inicio_grupo = np.searchsorted(log_ord, np.arange(len(codigos)))
+    acumulado -= np.concatenate([[0.0], acumulado])[inicio_grupo][log_ord]
+    total_ord = totais_log[log_ord, 0]
+    atingiu = (total_ord > 0) & (acumulado / np.where(total_ord > 0, total_ord, 1) >= LIMIAR_LOGRADOURO)
+    atingiu &= passo_ord < qtd_passos
+    passo_limiar = np.full(len(codigos), qtd_passos)
+    primeiros = np.flatnonzero(atingiu)
+    logs_atingidos, pos = np.unique(log_ord[primeiros], return_index=True)
+    passo_limiar[logs_atingidos] = passo_ord[primeiros[pos]]
+
+    ativo = totais_log[:, 0] > 0
+    delta = np.zeros((qtd_passos + 1, len(colunas)))
+    # Trechos parciais: IPE coberto conta do passo de cobertura até o limiar
+    limiar_entrada = passo_limiar[log_idx]
+    parcial = ativo[log_idx] & (passos < limiar_entrada)
+    np.add.at(delta, passos[parcial], valores[parcial])
+    np.add.at(delta, limiar_entrada[parcial], -valores[parcial])
+    # Logradouros que atingiram o limiar passam a contar 100%
+    completos = ativo & (passo_limiar < qtd_passos)
+    np.add.at(delta, passo_limiar[completos], totais_log[completos])
+
+    ajustado = np.cumsum(delta[:qtd_passos], axis=0)
+    percentual = np.divide(ajustado * 100, totais_eixo, out=np.zeros_like(ajustado), where=totais_eixo > 0)
+    qtd_100 = np.searchsorted(np.sort(passo_limiar[completos]), np.arange(qtd_passos), side='right')
+    return percentual, qtd_100, len(codigos)
+
+
+class CurvaOrcamento:
+    """
+    Trajetória da seleção gulosa com consultas O(log n) por orçamento ou cobertura.
+
+    O passo 0 corresponde aos pontos mínimos; o passo j, aos pontos mínimos
+    mais os j primeiros cruzamentos aceitos. `consultar` devolve `None`
+    quando a pergunta está fora do que a trajetória cobre (orçamento acima do
+    teto ou abaixo dos pontos mínimos, cobertura não atingida até o teto).
+    """
+
+    def __init__(self, df: pd.DataFrame, resultado: tuple, trajetoria: list, teto_cameras: int = None,
+                 pontos_minimos: pd.DataFrame = None, usar_eixos: bool = True, modo: str = MODO_IPE):
+        df_result, _, _, motivo_limite, _, df_minimos, _ = resultado
+        self.teto_cameras = teto_cameras
+        self.selecionados = df_result
+        self.df_pontos_minimos = df_minimos
+        # Teto atingido antes do fim da lista de cruzamentos
+        self.truncada = motivo_limite == 'cameras'
+        qtd_minimos = 0 if pontos_minimos is None else len(pontos_minimos)
+        self.valida = bool(trajetoria) and len(df_minimos) == qtd_minimos
+
+        qtd_passos = len(trajetoria)
+        self.cameras = np.array([t[0] for t in trajetoria], dtype=np.int64)
+        self.cobertura = np.array([t[1] for t in trajetoria], dtype=float)
+
+        # Passo em que cada cruzamento foi coberto pela primeira vez
+        ids = df['id'].to_numpy()
+        posicao = pd.Series(np.arange(len(ids)), index=ids)
+        passo_cruzamento = np.full(len(ids), qtd_passos, dtype=np.int64)
+        ids_novos = [cruz_id for t in trajetoria for cruz_id in t[2]]
+        passos_novos = np.repeat(np.arange(qtd_passos), [len(t[2]) for t in trajetoria])
+        if ids_novos:
+            alvo = posicao.reindex(ids_novos).to_numpy()
+            validos = ~np.isnan(alvo)
+            np.minimum.at(passo_cruzamento, alvo[validos].astype(np.int64), passos_novos[validos])
+        ordem = np.argsort(passo_cruzamento, kind='stable')
+        self._ids_por_passo = ids[ordem]
+        self._passos_ordenados = passo_cruzamento[ordem]
+
+        cameras_red = 0
+        if not df_minimos.empty and 'is_red' in df_minimos.columns:
+            cameras_red = int(df_minimos.loc[df_minimos['is_red'] == True, 'cameras'].sum())
+        self.custo = (self.cameras - cameras_red) * CUSTO_UNITARIO_CAMERA
+
+        if usar_eixos and qtd_passos:
+            self.cobertura_eixos, self.qtd_100, self.total_logs = cobertura_eixos_por_passo(
+                df, passo_cruzamento, qtd_passos
+            )
+        else:
+            self.cobertura_eixos = np.zeros((qtd_passos, len(EIXOS_COBERTURA)))
+            self.qtd_100, self.total_logs = np.zeros(qtd_passos, dtype=np.int64), 0
+
+        # Há cruzamento depois do último aceito? (decide se o limite de câmeras foi o motivo da parada)
+        if modo != MODO_IPE:
+            # Por ganho marginal o limite só é testado ao aceitar um ponto
+            self._ha_linhas_apos_ultimo = False
+        elif df_result.empty:
+            self._ha_linhas_apos_ultimo = len(df) > 0
+        else:
+            self._ha_linhas_apos_ultimo = int(posicao[df_result['id'].iloc[-1]]) < len(df) - 1
+        self._cameras_proximo = calcular_cameras_por_ponto(len(df_minimos) + len(df_result))
+
+    @property
+    def qtd_passos(self) -> int:
+        return len(self.cameras)
+
+    def passo_para_cameras(self, max_cameras: int):
+        """Último passo com total de câmeras ≤ `max_cameras` (None se fora da curva)"""
+        if not self.valida or max_cameras < self.cameras[0]:
+            return None
+        if self.truncada and max_cameras > self.teto_cameras:
+            return None
+        return int(np.searchsorted(self.cameras, max_cameras, side='right')) - 1
+
+    def passo_para_cobertura(self, cobertura_frac: float):
+        """Primeiro passo com cobertura ajustada ≥ `cobertura_frac` (None se fora da curva)"""
+        if not self.valida:
+            return None
+        passo = int(np.searchsorted(self.cobertura, cobertura_frac, side='left'))
+        if passo < self.qtd_passos:
+            return passo
+        return None if self.truncada else self.qtd_passos - 1
+
+    def resultado(self, passo: int, cobertura_frac: float = 1.0, max_cameras: int = None) -> tuple:
+        """Mesma tupla de `filtrar_por_cobertura_e_distancia` para o prefixo `passo`"""
+        if passo == 0 and self.df_pontos_minimos.empty:
+            return pd.DataFrame(), 0.0, False, None, set(), self.df_pontos_minimos, 0
+
+        motivo_limite = None
+        if max_cameras is not None:
+            ultimo = passo == self.qtd_passos - 1
+            if not ultimo or self.truncada:
+                motivo_limite = 'cameras'
+            elif self._ha_linhas_apos_ultimo and self.cameras[passo] + self._cameras_proximo > max_cameras:
+                motivo_limite = 'cameras'
+
+        cobertura_real = float(self.cobertura[passo])
+        alvo_atingido = cobertura_real >= cobertura_frac * 0.99
+        if not alvo_atingido and motivo_limite is None:
+            motivo_limite = 'restricoes'
+
+        df_result = self.selecionados.iloc[:passo].copy() if passo else pd.DataFrame()
+        return (df_result, cobertura_real, alvo_atingido, motivo_limite, self.ids_cobertos(passo),
+                self.df_pontos_minimos, int(self.cameras[passo]))
+
+    def consultar(self, max_cameras: int = None, cobertura_frac: float = 1.0):
+        """Resultado para um orçamento (ou, sem orçamento, para a cobertura alvo); None se fora da curva"""
+        if max_cameras is not None:
+            passo = self.passo_para_cameras(max_cameras)
+        else:
+            passo = self.passo_para_cobertura(cobertura_frac)
+        if passo is None:
+            return None
+        return self.resultado(passo, cobertura_frac, max_cameras)
+
+    def ids_cobertos(self, passo: int) -> set:
+        fim = int(np.searchsorted(self._passos_ordenados, passo, side='right'))
+        return set(self._ids_por_passo[:fim].tolist())
+
+    def cobertura_por_eixo(self, passo: int) -> tuple:
+        """(cobertura ajustada %, dict por eixo) no formato de `calcular_cobertura_por_logradouro_ajustada`"""
+        if passo is None or not self.ids_cobertos(passo):
+            return 0.0, {'seg': 0.0, 'lct': 0.0, 'com': 0.0, 'mob': 0.0, 'qtd_100': 0, 'total_logs': 0}
+        linha = self.cobertura_eixos[passo]
+        eixos = {eixo: float(linha[i]) for i, eixo in enumerate(EIXOS_COBERTURA) if eixo != 'total'}
+        eixos['qtd_100'] = int(self.qtd_100[passo])
+        eixos['total_logs'] = self.total_logs
+        return float(linha[0]), eixos
+
+    def tabela(self) -> pd.DataFrame:
+        """Uma linha por passo: câmeras, custo e cobertura ajustada total e por eixo (%)"""
+        tabela = pd.DataFrame({
+            'passo': np.arange(self.qtd_passos),
+            'cameras': self.cameras,
+            'custo': self.custo,
+        })
+        for i, eixo in enumerate(EIXOS_COBERTURA):
+            tabela[f'cobertura_{eixo}'] = self.cobertura_eixos[:, i]
+        return tabela
+
+
+def calcular_curva_orcamento(df: pd.DataFrame, min_dist: float, raio_cobertura: float = 50,
+                             pontos_minimos: pd.DataFrame = None, logs: pd.DataFrame = None,
+                             teto_cameras: int = None, modo: str = MODO_IPE,
+                             matriz_cobertura: MatrizCobertura = None,
+                             distancias_rede: DistanciasRede = None) -> CurvaOrcamento:
+    """
+    Executa o guloso uma única vez até `teto_cameras` (ou até esgotar os
+    cruzamentos) e devolve a curva para consultas por orçamento/cobertura.
+    """
+    trajetoria = []
+    resultado = filtrar_por_cobertura_e_distancia(
+        df, float('inf'), min_dist, None, raio_cobertura, None, pontos_minimos, teto_cameras, logs,
+        trajetoria=trajetoria, modo=modo, matriz_cobertura=matriz_cobertura, distancias_rede=distancias_rede
+    )
+    return CurvaOrcamento(df, resultado, trajetoria, teto_cameras, pontos_minimos,
+                          usar_eixos=logs is not None and not logs.empty, modo=modo)
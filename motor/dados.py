@@ -0,0 +1,501 @@
+"""
+Carregamento das bases de referência (planilhas e GeoJSON) do diretório de
+dados, com cache Parquet, e o contêiner somente leitura que as agrupa.
+"""
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+from motor.cache_dados import CacheDados
+from motor.cobertura import RAIO_COBERTURA_PADRAO, MatrizCobertura, obter_matriz_cobertura
+from motor.ipe import ModeloIPE
+from motor.metricas import IndiceLogradouros
+from motor.rede import ALCANCE_REDE_PADRAO, DistanciasRede, obter_distancias_rede
+
+if TYPE_CHECKING:
+    from motor.fronteira import FronteiraRecife
+
+NOMES_ARQUIVOS = {
+    'cruzamentos': "Cruzamentos.xlsx",
+    'prioridades': "Prioridades.xlsx",
+    'equipamentos': "Equipamentos.xlsx",
+    'bairros': "bairros.geojson",
+    'alagamentos': "Alagamentos.xlsx",
+    'sinistros': "Sinistros.xlsx",
+    'vias_prioritarias': "Vias Prioritarias.xlsx",
+    'cvp': "CVP.xlsx",
+}
+
+
+def carregar_excel_cruzamentos(filepath: Path) -> tuple:
+    """Carrega e processa o Excel de cruzamentos"""
+    try:
+        if not filepath.exists():
+            return None, None, f"Arquivo não encontrado: {filepath}"
+        
+        xls = pd.ExcelFile(filepath)
+        
+        if "MODELO" not in xls.sheet_names or "cruzamentos_100%" not in xls.sheet_names:
+            return None, None, "Abas 'MODELO' e 'cruzamentos_100%' não encontradas."
+        
+        df_modelo = pd.read_excel(filepath, sheet_name="MODELO", header=None)
+        
+        idx_header = None
+        for i, row in df_modelo.iterrows():
+            if row.iloc[0] == "RANKING_IPE":
+                idx_header = i
+                break
+        
+        if idx_header is None:
+            return None, None, "Cabeçalho da aba MODELO não identificado."
+        
+        df_logs = df_modelo.iloc[idx_header + 1:].copy()
+        df_logs.columns = df_modelo.iloc[idx_header].values
+        df_logs = df_logs.dropna(subset=[df_logs.columns[1]])
+        
+        logs = pd.DataFrame({
+            'cod_log': pd.to_numeric(df_logs.iloc[:, 1], errors='coerce'),
+            'nome': df_logs.iloc[:, 2].astype(str),
+            'seg': pd.to_numeric(df_logs.iloc[:, 3], errors='coerce').fillna(0),
+            'lct': pd.to_numeric(df_logs.iloc[:, 4], errors='coerce').fillna(0),
+            'com': pd.to_numeric(df_logs.iloc[:, 5], errors='coerce').fillna(0),
+            'mob': pd.to_numeric(df_logs.iloc[:, 6], errors='coerce').fillna(0)
+        }).dropna(subset=['cod_log'])
+        
+        df_cruz = pd.read_excel(filepath, sheet_name="cruzamentos_100%", header=0)
+        
+        cruz_dict = {}
+        id_counter = 1
+        
+        for _, row in df_cruz.iterrows():
+            cod1, cod2 = row.iloc[0], row.iloc[4]
+            if pd.isna(cod1) or pd.isna(cod2):
+                continue
+            
+            cod1, cod2 = int(cod1), int(cod2)
+            log1 = str(row.iloc[2]) if not pd.isna(row.iloc[2]) else ""
+            log2 = str(row.iloc[6]) if not pd.isna(row.iloc[6]) else ""
+            lat = float(row.iloc[11]) if not pd.isna(row.iloc[11]) else 0
+            lon = float(row.iloc[12]) if not pd.isna(row.iloc[12]) else 0
+            
+            if cod1 < cod2:
+                cod_min, cod_max, log_min, log_max = cod1, cod2, log1, log2
+            else:
+                cod_min, cod_max, log_min, log_max = cod2, cod1, log2, log1
+            
+            chave = f"{cod_min}|{cod_max}"
+            
+            if chave not in cruz_dict:
+                cruz_dict[chave] = {
+                    'id': id_counter, 'cod_log1': cod_min, 'log1': log_min,
+                    'cod_log2': cod_max, 'log2': log_max, 'lat': lat, 'lon': lon
+                }
+                id_counter += 1
+            elif lat != 0 and lon != 0:
+                cruz_dict[chave]['lat'] = (cruz_dict[chave]['lat'] + lat) / 2
+                cruz_dict[chave]['lon'] = (cruz_dict[chave]['lon'] + lon) / 2
+        
+        cruzamentos = pd.DataFrame(list(cruz_dict.values()))
+        return logs, cruzamentos, f"✓ {len(logs)} logradouros, {len(cruzamentos)} cruzamentos"
+    
+    except Exception as e:
+        return None, None, f"Erro: {str(e)}"
+
+
+def carregar_excel_equipamentos(filepath: Path) -> tuple:
+    """Carrega o Excel de equipamentos"""
+    try:
+        if not filepath.exists():
+            return None, f"Arquivo não encontrado: {filepath}"
+        
+        df = pd.read_excel(filepath, header=0)
+        cols_necessarias = ["LATITUDE COM PONTO", "LONGITUDE COM PONTO", "PESO"]
+        for col in cols_necessarias:
+            if col not in df.columns:
+                return None, f"Coluna '{col}' não encontrada."
+        
+        equip = pd.DataFrame({
+            'eixo': df.get("EIXO", pd.Series([""] * len(df))).astype(str),
+            'tipo': df.get("TIPO DE EQUIPAMENTO", pd.Series([""] * len(df))).astype(str),
+            'log': df.get("LOG_CORRIGIDO", pd.Series([""] * len(df))).astype(str),
+            'lat': pd.to_numeric(df["LATITUDE COM PONTO"], errors='coerce'),
+            'lon': pd.to_numeric(df["LONGITUDE COM PONTO"], errors='coerce'),
+            'peso': pd.to_numeric(df["PESO"], errors='coerce').fillna(0)
+        }).dropna(subset=['lat', 'lon'])
+        
+        return equip, f"✓ {len(equip)} equipamentos"
+    except Exception as e:
+        return None, f"Erro: {str(e)}"
+
+
+def carregar_pontos_minimos(filepath: Path, incluir_red: bool = False) -> tuple:
+    """Carrega o Excel de pontos mínimos obrigatórios"""
+    try:
+        if not filepath.exists():
+            return None, f"Arquivo não encontrado: {filepath}"
+        
+        df = pd.read_excel(filepath, header=0)
+        
+        col_map = {}
+        for col in df.columns:
+            col_lower = col.lower().strip()
+            if 'tipo' in col_lower:
+                col_map['tipo'] = col
+            elif 'logradouro' in col_lower or 'log' in col_lower:
+                col_map['logradouro'] = col
+            elif 'lat' in col_lower:
+                col_map['lat'] = col
+            elif 'lon' in col_lower or 'lng' in col_lower:
+                col_map['lon'] = col
+            elif 'prioridade' in col_lower or 'peso' in col_lower:
+                col_map['prioridade'] = col
+            elif 'camera' in col_lower or 'câmera' in col_lower:
+                col_map['cameras'] = col
+        
+        if 'lat' not in col_map or 'lon' not in col_map:
+            return None, "Colunas 'latitude' e 'longitude' são obrigatórias."
+        
+        pontos = pd.DataFrame({
+            'id_minimo': range(1, len(df) + 1),
+            'tipo': df[col_map.get('tipo', df.columns[0])].astype(str) if 'tipo' in col_map else 'PONTO_MINIMO',
+            'logradouro': df[col_map.get('logradouro', df.columns[0])].astype(str) if 'logradouro' in col_map else '',
+            'lat': pd.to_numeric(df[col_map['lat']], errors='coerce'),
+            'lon': pd.to_numeric(df[col_map['lon']], errors='coerce'),
+            'prioridade': pd.to_numeric(df[col_map.get('prioridade', df.columns[0])], errors='coerce').fillna(5) if 'prioridade' in col_map else 5,
+            'cameras': pd.to_numeric(df[col_map.get('cameras', df.columns[0])], errors='coerce').fillna(1).astype(int) if 'cameras' in col_map else 1
+        }).dropna(subset=['lat', 'lon'])
+        
+        # ===== NOVO: FILTRAR PONTOS RED =====
+        if not incluir_red:
+            # Remove pontos RED se não estiverem incluídos
+            pontos = pontos[pontos['tipo'].str.strip().str.upper() != 'RED']
+        else:
+            # Adiciona coluna identificadora para pontos RED
+            pontos['is_red'] = pontos['tipo'].str.strip().str.upper() == 'RED'
+        # ===== FIM NOVO =====
+        
+        pontos = pontos.sort_values('prioridade', ascending=True).reset_index(drop=True)
+        
+        msg = f"✓ {len(pontos)} pontos mínimos carregados"
+        if incluir_red:
+            qtd_red = (pontos['tipo'].str.strip().str.upper() == 'RED').sum()
+            msg += f" ({qtd_red} RED)"
+        
+        return pontos, msg
+    except Exception as e:
+        return None, f"Erro: {str(e)}"
+
+
+def carregar_alagamentos(filepath: Path) -> tuple:
+    """Carrega o Excel de pontos de alagamento"""
+    try:
+        if not filepath.exists():
+            return None, f"Arquivo não encontrado: {filepath}"
+        
+        df = pd.read_excel(filepath, header=0)
+        
+        col_map = {}
+        for col in df.columns:
+            col_lower = col.lower().strip()
+            if 'nome' in col_lower or 'descricao' in col_lower or 'descrição' in col_lower:
+                col_map['nome'] = col
+            elif 'lat' in col_lower:
+                col_map['lat'] = col
+            elif 'lon' in col_lower or 'lng' in col_lower:
+                col_map['lon'] = col
+            elif 'id' in col_lower:
+                col_map['id'] = col
+        
+        if 'lat' not in col_map or 'lon' not in col_map:
+            return None, "Colunas 'latitude' e 'longitude' são obrigatórias."
+        
+        alagamentos = pd.DataFrame({
+            'id': df[col_map['id']].astype(str) if 'id' in col_map else range(1, len(df) + 1),
+            'nome': df[col_map.get('nome', df.columns[0])].astype(str) if 'nome' in col_map else [f"Alagamento {i+1}" for i in range(len(df))],
+            'lat': pd.to_numeric(df[col_map['lat']], errors='coerce'),
+            'lon': pd.to_numeric(df[col_map['lon']], errors='coerce')
+        }).dropna(subset=['lat', 'lon'])
+        
+        return alagamentos, f"✓ {len(alagamentos)} pontos de alagamento carregados"
+    except Exception as e:
+        return None, f"Erro: {str(e)}"
+
+
+def carregar_sinistros(filepath: Path) -> tuple:
+    """Carrega o Excel de sinistros por logradouro"""
+    try:
+        if not filepath.exists():
+            return None, f"Arquivo não encontrado: {filepath}"
+        
+        df = pd.read_excel(filepath, header=0)
+        
+        col_map = {}
+        for col in df.columns:
+            col_lower = col.lower().strip()
+            if 'logradouro' in col_lower or 'log' in col_lower or 'rua' in col_lower:
+                col_map['logradouro'] = col
+            elif 'qtd' in col_lower or 'quantidade' in col_lower or 'total' in col_lower:
+                col_map['qtd'] = col
+            elif 'id' in col_lower:
+                col_map['id'] = col
+        
+        if 'logradouro' not in col_map:
+            return None, "Coluna 'LOGRADOURO' é obrigatória."
+        
+        sinistros = pd.DataFrame({
+            'id': df[col_map['id']].astype(str) if 'id' in col_map else df[col_map['logradouro']].astype(str),
+            'logradouro': df[col_map['logradouro']].astype(str),
+            'qtd': pd.to_numeric(df[col_map.get('qtd', df.columns[0])], errors='coerce').fillna(1).astype(int) if 'qtd' in col_map else 1
+        })
+        
+        sinistros['logradouro'] = sinistros['logradouro'].str.strip().str.upper()
+        
+        return sinistros, f"✓ {len(sinistros)} logradouros com sinistros carregados"
+    except Exception as e:
+        return None, f"Erro: {str(e)}"
+
+
+def carregar_bairros_geojson(filepath: Path) -> tuple:
+    """Carrega o arquivo GeoJSON de bairros"""
+    try:
+        if not filepath.exists():
+            return None, f"Arquivo não encontrado: {filepath}"
+        
+        with open(filepath, 'r', encoding='utf-8') as f:
+            geojson_data = json.load(f)
+        
+        return geojson_data, "✓ Fronteira carregada"
+    except Exception as e:
+        return None, f"Erro: {str(e)}"
+
+def carregar_vias_prioritarias(filepath: Path) -> tuple:
+    """Carrega o Excel de vias prioritárias"""
+    try:
+        if not filepath.exists():
+            return None, f"Arquivo não encontrado: {filepath}"
+        
+        df = pd.read_excel(filepath, header=0)
+        
+        col_map = {}
+        for col in df.columns:
+            col_lower = col.lower().strip()
+            if 'logradouro' in col_lower or 'log' in col_lower or 'rua' in col_lower or 'via' in col_lower:
+                col_map['logradouro'] = col
+            elif 'prioridade' in col_lower or 'peso' in col_lower or 'nota' in col_lower:
+                col_map['prioridade'] = col
+            elif 'id' in col_lower:
+                col_map['id'] = col
+        
+        if 'logradouro' not in col_map:
+            return None, "Coluna 'LOGRADOURO' é obrigatória."
+        
+        vias = pd.DataFrame({
+            'id': df[col_map['id']].astype(str) if 'id' in col_map else df[col_map['logradouro']].astype(str),
+            'logradouro': df[col_map['logradouro']].astype(str),
+            'prioridade': pd.to_numeric(df[col_map.get('prioridade', df.columns[0])], errors='coerce').fillna(5).astype(int) if 'prioridade' in col_map else 5
+        })
+        
+        vias['logradouro'] = vias['logradouro'].str.strip().str.upper()
+        
+        return vias, f"✓ {len(vias)} vias prioritárias carregadas"
+    except Exception as e:
+        return None, f"Erro: {str(e)}"
+
+def carregar_cvp(filepath: Path) -> tuple:
+    """Carrega o Excel de CVP (Crimes Contra o Patrimônio) por logradouro"""
+    try:
+        if not filepath.exists():
+            return None, f"Arquivo não encontrado: {filepath}"
+        
+        df = pd.read_excel(filepath, header=0)
+        
+        col_map = {}
+        for col in df.columns:
+            col_lower = col.lower().strip()
+            if 'logradouro' in col_lower or 'log' in col_lower or 'rua' in col_lower:
+                col_map['logradouro'] = col
+            elif 'cvp' in col_lower or 'crime' in col_lower or 'patrimonio' in col_lower or 'patrimônio' in col_lower:
+                col_map['cvp'] = col
+            elif 'id' in col_lower:
+                col_map['id'] = col
+        
+        if 'logradouro' not in col_map:
+            return None, "Coluna 'LOGRADOURO' é obrigatória."
+        
+        if 'cvp' not in col_map:
+            return None, "Coluna 'CVP' é obrigatória."
+        
+        cvp_data = pd.DataFrame({
+            'id': df[col_map['id']].astype(str) if 'id' in col_map else df[col_map['logradouro']].astype(str),
+            'logradouro': df[col_map['logradouro']].astype(str),
+            'cvp': pd.to_numeric(df[col_map['cvp']], errors='coerce').fillna(0).astype(int)
+        })
+        
+        cvp_data['logradouro'] = cvp_data['logradouro'].str.strip().str.upper()
+        
+        # Remover registros com CVP = 0
+        cvp_data = cvp_data[cvp_data['cvp'] > 0]
+        
+        return cvp_data, f"✓ {len(cvp_data)} logradouros com CVP carregados"
+    except Exception as e:
+        return None, f"Erro: {str(e)}"
+
+
+@dataclass(frozen=True)
+class DadosReferencia:
+    """Bases de referência (somente leitura) compartilhadas entre as sessões"""
+    logs: pd.DataFrame = field(default_factory=pd.DataFrame)
+    cruzamentos: pd.DataFrame = field(default_factory=pd.DataFrame)
+    modelo_ipe: ModeloIPE = None
+    pontos_minimos_sem_red: pd.DataFrame = field(default_factory=pd.DataFrame)
+    pontos_minimos_com_red: pd.DataFrame = field(default_factory=pd.DataFrame)
+    equipamentos: pd.DataFrame = field(default_factory=pd.DataFrame)
+    alagamentos: pd.DataFrame = field(default_factory=pd.DataFrame)
+    sinistros: pd.DataFrame = field(default_factory=pd.DataFrame)
+    vias_prioritarias: pd.DataFrame = field(default_factory=pd.DataFrame)
+    cvp: pd.DataFrame = field(default_factory=pd.DataFrame)
+    bairros_geojson: dict = None
+    fronteira: 'FronteiraRecife' = None
+    indice_logradouros: IndiceLogradouros = None
+    tempos_carregamento: list = field(default_factory=list)
+    impressao_digital: str = ''
+    dir_cache: Path = None
+    matrizes_cobertura: dict = field(default_factory=dict, repr=False, compare=False)
+    redes: dict = field(default_factory=dict, repr=False, compare=False)
+
+    def pontos_minimos(self, incluir_red: bool) -> pd.DataFrame:
+        return self.pontos_minimos_com_red if incluir_red else self.pontos_minimos_sem_red
+
+    def matriz_cobertura(self, raio: float, por_rede: bool = False) -> MatrizCobertura:
+        """Matriz de cobertura dos cruzamentos do modelo, calculada uma vez por raio e medida de distância"""
+        if self.modelo_ipe is None or self.modelo_ipe.vazio:
+            return None
+        chave = (raio, por_rede)
+        if chave not in self.matrizes_cobertura:
+            self.matrizes_cobertura[chave] = obter_matriz_cobertura(
+                self.modelo_ipe.cruzamentos, raio, self.dir_cache,
+                self.distancias_rede() if por_rede else None
+            )
+        return self.matrizes_cobertura[chave]
+
+    def distancias_rede(self, alcance: float = ALCANCE_REDE_PADRAO) -> DistanciasRede:
+        """Distâncias pela rede de logradouros entre os cruzamentos do modelo, calculadas uma vez por alcance"""
+        if self.modelo_ipe is None or self.modelo_ipe.vazio:
+            return None
+        if alcance not in self.redes:
+            self.redes[alcance] = obter_distancias_rede(self.modelo_ipe.cruzamentos, alcance, self.dir_cache)
+        return self.redes[alcance]
+
+
+def caminhos_arquivos(data_dir: Path) -> dict:
+    """Caminho de cada arquivo de entrada dentro de `data_dir`"""
+    return {chave: Path(data_dir) / nome for chave, nome in NOMES_ARQUIVOS.items()}
+
+
+def assinatura_arquivos(data_dir: Path) -> tuple:
+    """(arquivo, mtime, tamanho) de cada entrada; muda quando algum arquivo é substituído"""
+    assinatura = []
+    for caminho in caminhos_arquivos(data_dir).values():
+        if caminho.exists():
+            stat = caminho.stat()
+            assinatura.append((str(caminho), stat.st_mtime_ns, stat.st_size))
+        else:
+            assinatura.append((str(caminho), None, None))
+    return tuple(assinatura)
+
+
+def carregar_dados(data_dir: Path, dir_cache: Path = None) -> DadosReferencia:
+    """
+    Carrega todas as bases de referência de `data_dir`.
+
+    As planilhas passam pelo cache Parquet em `dir_cache` (padrão:
+    `data_dir/.cache`). Arquivos ausentes ou inválidos resultam em tabelas vazias.
+    """
+    arquivos = caminhos_arquivos(data_dir)
+    dir_cache = Path(dir_cache) if dir_cache is not None else Path(data_dir) / ".cache"
+    cache = CacheDados(dir_cache)
+    assinatura = assinatura_arquivos(data_dir)
+    dados = {}
+    
+    logs, cruzamentos, msg = cache.carregar(arquivos['cruzamentos'], carregar_excel_cruzamentos)
+    if logs is not None:
+        dados['logs'] = logs
+        dados['cruzamentos'] = cruzamentos
+        dados['modelo_ipe'] = ModeloIPE(logs, cruzamentos)
+    
+    # Pontos mínimos nas duas variantes: a escolha do RED é por sessão
+    for incluir_red, chave in [(False, 'pontos_minimos_sem_red'), (True, 'pontos_minimos_com_red')]:
+        pontos_min, msg = cache.carregar(arquivos['prioridades'], carregar_pontos_minimos, incluir_red,
+                                         variante=f"red={incluir_red}")
+        if pontos_min is not None:
+            dados[chave] = pontos_min
+    
+    equip, msg = cache.carregar(arquivos['equipamentos'], carregar_excel_equipamentos)
+    if equip is not None:
+        dados['equipamentos'] = equip
+    
+    alag, msg = cache.carregar(arquivos['alagamentos'], carregar_alagamentos)
+    if alag is not None:
+        dados['alagamentos'] = alag
+    
+    sinist, msg = cache.carregar(arquivos['sinistros'], carregar_sinistros)
+    if sinist is not None:
+        dados['sinistros'] = sinist
+    
+    vias_prior, msg = cache.carregar(arquivos['vias_prioritarias'], carregar_vias_prioritarias)
+    if vias_prior is not None:
+        dados['vias_prioritarias'] = vias_prior
+
+    cvp_data, msg = cache.carregar(arquivos['cvp'], carregar_cvp)
+    if cvp_data is not None:
+        dados['cvp'] = cvp_data
+
+    if arquivos['bairros'].exists():
+        geojson_data, msg = carregar_bairros_geojson(arquivos['bairros'])
+        if geojson_data is not None:
+            dados['bairros_geojson'] = geojson_data
+            # Limites e máscara externa do mapa: estáticos, calculados uma vez por versão do GeoJSON.
+            # Importado aqui para que o núcleo do motor não dependa do shapely
+            from motor.fronteira import obter_fronteira
+            inicio = time.perf_counter()
+            dados['fronteira'] = obter_fronteira(geojson_data, dir_cache)
+            cache.tempos.append({
+                'arquivo': "fronteira e máscara",
+                'origem': 'geometria',
+                'segundos': time.perf_counter() - inicio,
+            })
+    
+    # Nomes de logradouro normalizados uma vez para as métricas de sinistros, CVP e vias prioritárias
+    if 'cruzamentos' in dados:
+        inicio = time.perf_counter()
+        dados['indice_logradouros'] = IndiceLogradouros(
+            dados['cruzamentos'], sinistros=dados.get('sinistros'), cvp=dados.get('cvp'),
+            vias_prioritarias=dados.get('vias_prioritarias')
+        )
+        cache.tempos.append({
+            'arquivo': "índice de logradouros",
+            'origem': 'índice',
+            'segundos': time.perf_counter() - inicio,
+        })
+    
+    # Só nome, mtime e tamanho: a mesma base aberta por caminhos diferentes (app, lote) tem a mesma impressão
+    versao_base = tuple((Path(caminho).name, mtime, tamanho) for caminho, mtime, tamanho in assinatura)
+    impressao_digital = hashlib.sha256(repr(versao_base).encode('utf-8')).hexdigest()
+    referencia = DadosReferencia(tempos_carregamento=cache.tempos, impressao_digital=impressao_digital,
+                                 dir_cache=dir_cache, **dados)
+    
+    # Cobertura entre cruzamentos no raio da aplicação; outros raios são calculados sob demanda
+    inicio = time.perf_counter()
+    if referencia.matriz_cobertura(RAIO_COBERTURA_PADRAO) is not None:
+        cache.tempos.append({
+            'arquivo': f"cobertura {RAIO_COBERTURA_PADRAO} m",
+            'origem': 'matriz',
+            'segundos': time.perf_counter() - inicio,
+        })
+    return referencia
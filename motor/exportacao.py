@@ -0,0 +1,257 @@
+"""
+Exportação dos resultados: CSV de todos os cruzamentos e Parquet, GeoJSON e
+GeoPackage das câmeras selecionadas.
+
+As funções só montam o arquivo quando chamadas: o app as passa ao
+`st.download_button` como callables, executados apenas no clique. O CSV é
+montado coluna a coluna (`isin` para a coluna de seleção, uma conversão para
+texto por coluna) e escrito em blocos de linhas, sem a cópia formatada da
+tabela inteira nem o formatador linha a linha do `to_csv`. O GeoPackage é
+escrito com `sqlite3` (cabeçalho GPKG + WKB de ponto), sem GDAL.
+"""
+
+import io
+import json
+import os
+import sqlite3
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from motor.camada_pontos import GRUPO_IPE, GRUPO_MINIMO, GRUPO_RED
+
+COLUNAS_CSV = ['id', 'cod_log1', 'log1', 'cod_log2', 'log2', 'lat', 'lon',
+               'ipe_log1', 'ipe_log2', 'ipe_cruz', 'perc_ipe', 'cobertura_acum', 'selecionado_no_mapa']
+
+# Colunas escritas com 6 casas decimais; as coordenadas mantêm a precisão original
+COLUNAS_SEIS_CASAS = ['ipe_log1', 'ipe_log2', 'ipe_cruz', 'perc_ipe', 'cobertura_acum']
+
+COLUNAS_CAMERAS = ['grupo', 'id_cruzamento', 'id_minimo', 'log1', 'log2', 'logradouro', 'tipo', 'prioridade',
+                   'ipe_cruz', 'cameras', 'lat', 'lon']
+
+LINHAS_POR_BLOCO = 10_000
+
+# Extensão e MIME de cada formato
+FORMATOS_EXPORTACAO = {
+    'csv': ('.csv', 'text/csv'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+    'geojson': ('.geojson', 'application/geo+json'),
+    'gpkg': ('.gpkg', 'application/geopackage+sqlite3'),
+}
+
+SRS_WGS84 = 4326
+WKT_WGS84 = (
+    'GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,298.257223563,AUTHORITY["EPSG","7030"]],'
+    'AUTHORITY["EPSG","6326"]],PRIMEM["Greenwich",0,AUTHORITY["EPSG","8901"]],'
+    'UNIT["degree",0.0174532925199433,AUTHORITY["EPSG","9122"]],AUTHORITY["EPSG","4326"]]'
+)
+
+
+def tabela_csv(df_calculados: pd.DataFrame, df_selecionados: pd.DataFrame) -> pd.DataFrame:
+    """Colunas do CSV, com `selecionado_no_mapa` (0/1) marcado por `isin`"""
+    ids_sel = df_selecionados['id'] if not df_selecionados.empty else []
+    tabela = df_calculados[COLUNAS_CSV[:-1]].copy()
+    tabela['selecionado_no_mapa'] = df_calculados['id'].isin(ids_sel).astype(int)
+    return tabela
+
+
+def _textos_csv(serie: pd.Series) -> list:
+    """Textos da coluna como o `to_csv` do pandas os escreveria (ausentes vazios, aspas só quando preciso)"""
+    if serie.name in COLUNAS_SEIS_CASAS:
+        return list(map('{:.6f}'.format, serie.tolist()))
+    if serie.dtype.kind in 'iub':
+        return serie.to_numpy().astype(str).tolist()
+    if serie.dtype.kind == 'f':
+        textos = list(map(repr, serie.tolist()))
+        if serie.hasnans:
+            textos = pd.Series(textos, index=serie.index).where(serie.notna(), '').tolist()
+        return textos
+    textos = serie.astype(object).where(serie.notna(), '').astype(str)
+    precisa_aspas = textos.str.contains('[;"\r\n]', regex=True)
+    if precisa_aspas.any():
+        textos = textos.where(~precisa_aspas, '"' + textos.str.replace('"', '""', regex=False) + '"')
+    return textos.tolist()
+
+
+def blocos_csv(df_calculados: pd.DataFrame, df_selecionados: pd.DataFrame,
+               linhas_por_bloco: int = LINHAS_POR_BLOCO):
+    """
+    Gera o CSV (separador `;`, UTF-8) em blocos de bytes, cabeçalho no primeiro.
+
+    Em cada bloco, as colunas são convertidas de uma vez para texto e as
+    linhas são montadas com `join`, sem o formatador linha a linha do pandas;
+    o resultado é o mesmo do `to_csv(sep=';')` com as colunas de IPE em 6 casas.
+    """
+    if df_calculados.empty:
+        return
+    tabela = tabela_csv(df_calculados, df_selecionados)
+    yield (';'.join(tabela.columns) + os.linesep).encode('utf-8')
+    for inicio in range(0, len(tabela), linhas_por_bloco):
+        bloco = tabela.iloc[inicio:inicio + linhas_por_bloco]
+        linhas = map(';'.join, zip(*(_textos_csv(bloco[coluna]) for coluna in bloco.columns)))
+        yield (os.linesep.join(linhas) + os.linesep).encode('utf-8')
+
+
+def gerar_csv(df_calculados: pd.DataFrame, df_selecionados: pd.DataFrame,
+              linhas_por_bloco: int = LINHAS_POR_BLOCO) -> io.BytesIO:
+    """
+    CSV de todos os cruzamentos calculados, com a coluna de seleção no mapa.
+
+    Devolve o buffer em vez de bytes para não copiar o arquivo inteiro mais uma vez.
+    """
+    saida = io.BytesIO()
+    for bloco in blocos_csv(df_calculados, df_selecionados, linhas_por_bloco):
+        saida.write(bloco)
+    saida.seek(0)
+    return saida
+
+
+def tabela_cameras(selecionados: pd.DataFrame, pontos_minimos_usados: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Uma linha por ponto com câmera: pontos mínimos (grupos `minimo` e `red`)
+    seguidos dos pontos otimizados (grupo `ipe`), como no mapa.
+    """
+    partes = []
+    if pontos_minimos_usados is not None and not pontos_minimos_usados.empty:
+        df = pontos_minimos_usados
+        tipo = df['tipo'] if 'tipo' in df.columns else pd.Series('N/A', index=df.index)
+        red = tipo.astype(str).str.strip().str.upper().eq('RED')
+        if 'is_red' in df.columns:
+            red |= df['is_red'].fillna(False).astype(bool)
+        partes.append(pd.DataFrame({
+            'grupo': np.where(red, GRUPO_RED, GRUPO_MINIMO),
+            'id_minimo': df['id_minimo'] if 'id_minimo' in df.columns else pd.NA,
+            'logradouro': df.get('logradouro'),
+            'tipo': tipo,
+            'prioridade': df.get('prioridade'),
+            'cameras': df['cameras'] if 'cameras' in df.columns else 1,
+            'lat': df['lat'],
+            'lon': df['lon'],
+        }))
+    if selecionados is not None and not selecionados.empty:
+        df = selecionados
+        partes.append(pd.DataFrame({
+            'grupo': GRUPO_IPE,
+            'id_cruzamento': df['id'],
+            'log1': df.get('log1'),
+            'log2': df.get('log2'),
+            'ipe_cruz': df.get('ipe_cruz'),
+            'cameras': df['cameras'] if 'cameras' in df.columns else 1,
+            'lat': df['lat'],
+            'lon': df['lon'],
+        }))
+
+    if not partes:
+        return pd.DataFrame({coluna: pd.Series(dtype=float if coluna in ('lat', 'lon') else object)
+                             for coluna in COLUNAS_CAMERAS})
+    cameras = pd.concat(partes, ignore_index=True).reindex(columns=COLUNAS_CAMERAS)
+    for coluna in ('id_cruzamento', 'id_minimo', 'prioridade', 'cameras'):
+        cameras[coluna] = pd.to_numeric(cameras[coluna], errors='coerce').astype('Int64')
+    for coluna in ('grupo', 'log1', 'log2', 'logradouro', 'tipo'):
+        cameras[coluna] = cameras[coluna].astype('string')
+    cameras['ipe_cruz'] = cameras['ipe_cruz'].astype(float)
+    return cameras
+
+
+def gerar_parquet(cameras: pd.DataFrame) -> bytes:
+    """Tabela das câmeras em Parquet (pyarrow)"""
+    saida = io.BytesIO()
+    cameras.to_parquet(saida, index=False)
+    return saida.getvalue()
+
+
+def _valores(serie: pd.Series) -> list:
+    """Valores como tipos Python, com None para ausentes"""
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+def gerar_geojson(cameras: pd.DataFrame) -> bytes:
+    """FeatureCollection de pontos (WGS 84) com as demais colunas em `properties`"""
+    nomes = [coluna for coluna in cameras.columns if coluna not in ('lat', 'lon')]
+    coords = np.column_stack([cameras['lon'].to_numpy(dtype=float), cameras['lat'].to_numpy(dtype=float)]).tolist()
+    valores = zip(*(_valores(cameras[coluna]) for coluna in nomes)) if nomes else [()] * len(cameras)
+    features = [
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': xy}, 'properties': dict(zip(nomes, linha))}
+        for xy, linha in zip(coords, valores)
+    ]
+    return json.dumps({'type': 'FeatureCollection', 'features': features}, ensure_ascii=False).encode('utf-8')
+
+
+def _geometrias_gpkg(lons: np.ndarray, lats: np.ndarray, srs_id: int = SRS_WGS84) -> list:
+    """Blobs de geometria GeoPackage (cabeçalho sem envelope + WKB Point little-endian)"""
+    registro = np.dtype([('magica', 'S2'), ('versao', 'u1'), ('flags', 'u1'), ('srs', '<i4'),
+                         ('ordem', 'u1'), ('tipo', '<u4'), ('x', '<f8'), ('y', '<f8')])
+    blobs = np.empty(len(lons), dtype=registro)
+    blobs['magica'], blobs['versao'], blobs['flags'], blobs['srs'] = b'GP', 0, 1, srs_id
+    blobs['ordem'], blobs['tipo'], blobs['x'], blobs['y'] = 1, 1, lons, lats
+    dados = blobs.tobytes()
+    return [dados[i:i + registro.itemsize] for i in range(0, len(dados), registro.itemsize)]
+
+
+def _tipo_sqlite(serie: pd.Series) -> str:
+    if pd.api.types.is_integer_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(serie):
+        return 'DOUBLE'
+    return 'TEXT'
+
+
+def gerar_geopackage(cameras: pd.DataFrame, camada: str = 'cameras') -> bytes:
+    """GeoPackage 1.4 com uma camada de pontos (WGS 84) e as demais colunas como atributos"""
+    nomes = [coluna for coluna in cameras.columns if coluna not in ('lat', 'lon')]
+    lons = cameras['lon'].to_numpy(dtype=float)
+    lats = cameras['lat'].to_numpy(dtype=float)
+    envelope = (lons.min(), lats.min(), lons.max(), lats.max()) if len(cameras) else (None,) * 4
+
+    arquivo, caminho = tempfile.mkstemp(suffix='.gpkg')
+    os.close(arquivo)
+    try:
+        conexao = sqlite3.connect(caminho)
+        try:
+            conexao.execute("PRAGMA application_id = 1196444487")  # 'GPKG'
+            conexao.execute("PRAGMA user_version = 10400")
+            conexao.executescript("""
+                CREATE TABLE gpkg_spatial_ref_sys (
+                    srs_name TEXT NOT NULL, srs_id INTEGER NOT NULL PRIMARY KEY, organization TEXT NOT NULL,
+                    organization_coordsys_id INTEGER NOT NULL, definition TEXT NOT NULL, description TEXT);
+                CREATE TABLE gpkg_contents (
+                    table_name TEXT NOT NULL PRIMARY KEY, data_type TEXT NOT NULL, identifier TEXT UNIQUE,
+                    description TEXT DEFAULT '',
+                    last_change DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+                    min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE, srs_id INTEGER,
+                    FOREIGN KEY (srs_id) REFERENCES gpkg_spatial_ref_sys(srs_id));
+                CREATE TABLE gpkg_geometry_columns (
+                    table_name TEXT NOT NULL, column_name TEXT NOT NULL, geometry_type_name TEXT NOT NULL,
+                    srs_id INTEGER NOT NULL, z TINYINT NOT NULL, m TINYINT NOT NULL,
+                    PRIMARY KEY (table_name, column_name), UNIQUE (table_name),
+                    FOREIGN KEY (table_name) REFERENCES gpkg_contents(table_name),
+                    FOREIGN KEY (srs_id) REFERENCES gpkg_spatial_ref_sys(srs_id));
+            """)
+            conexao.executemany("INSERT INTO gpkg_spatial_ref_sys VALUES (?, ?, ?, ?, ?, ?)", [
+                ('Undefined cartesian SRS', -1, 'NONE', -1, 'undefined', None),
+                ('Undefined geographic SRS', 0, 'NONE', 0, 'undefined', None),
+                ('WGS 84 geodetic', SRS_WGS84, 'EPSG', SRS_WGS84, WKT_WGS84, None),
+            ])
+            colunas = ''.join(f', "{coluna}" {_tipo_sqlite(cameras[coluna])}' for coluna in nomes)
+            conexao.execute(f'CREATE TABLE "{camada}" (fid INTEGER PRIMARY KEY AUTOINCREMENT, geom POINT{colunas})')
+            conexao.execute(
+                "INSERT INTO gpkg_contents (table_name, data_type, identifier, min_x, min_y, max_x, max_y, srs_id) "
+                "VALUES (?, 'features', ?, ?, ?, ?, ?, ?)", (camada, camada, *envelope, SRS_WGS84)
+            )
+            conexao.execute("INSERT INTO gpkg_geometry_columns VALUES (?, 'geom', 'POINT', ?, 0, 0)",
+                            (camada, SRS_WGS84))
+
+            marcadores = ', '.join('?' * (len(nomes) + 1))
+            campos = ', '.join(['geom'] + [f'"{coluna}"' for coluna in nomes])
+            conexao.executemany(
+                f'INSERT INTO "{camada}" ({campos}) VALUES ({marcadores})',
+                zip(_geometrias_gpkg(lons, lats), *(_valores(cameras[coluna]) for coluna in nomes))
+            )
+            conexao.commit()
+        finally:
+            conexao.close()
+        with open(caminho, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(caminho)
@@ -0,0 +1,253 @@
+"""
+Geometria estática do mapa derivada do GeoJSON de bairros: limites (bounds),
+centro, a máscara escura fora do Recife e versões simplificadas por zoom.
+
+A união dos bairros e a diferença com o retângulo externo só dependem do
+GeoJSON, então são calculadas uma vez por versão do arquivo e gravadas em
+`data/.cache/fronteira.json`, identificadas por um hash do conteúdo. A máscara
+é gravada já simplificada (tolerância de ~1 m, abaixo da largura da borda dos
+bairros), o que reduz o GeoJSON enviado ao navegador a cada rerun.
+
+Para cada faixa de zoom de `NIVEIS_DETALHE` são gravadas também a máscara e
+as divisas entre bairros simplificadas com tolerância de cerca de meio pixel
+no maior zoom da faixa (`NivelDetalhe`). Os bairros são simplificados como
+uma cobertura (bordas comuns simplificadas uma vez só, sem frestas entre
+vizinhos) e a máscara sai da união dos bairros já simplificados, então as
+duas camadas coincidem em cada nível. O mapa desenha só o nível do zoom atual.
+"""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+import shapely
+from shapely.geometry import box, mapping, shape
+from shapely.ops import unary_union
+
+# Incrementar quando o cálculo da máscara ou dos limites mudar
+VERSAO_FRONTEIRA = 2
+
+# Retângulo que cobre toda a área visível do mapa (lon_min, lat_min, lon_max, lat_max)
+CAIXA_EXTERNA = (-36.5, -9.0, -33.0, -7.5)
+
+# Tolerância da simplificação da máscara, em graus (~1 m)
+TOLERANCIA_MASCARA = 1e-5
+
+# Níveis de detalhe: (zoom mínimo, tolerância em graus). Um pixel no zoom z mede
+# ~360 / (256 · 2^z) graus; a tolerância fica perto de meio pixel no maior zoom da faixa
+NIVEIS_DETALHE = ((11, 2e-4), (13, 5e-5), (15, 2e-5))
+
+
+def impressao_geojson(geojson: dict) -> str:
+    """Hash SHA-256 do conteúdo do GeoJSON (independe da ordem das chaves)"""
+    conteudo = json.dumps(geojson, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(f"v{VERSAO_FRONTEIRA}|{conteudo}".encode('utf-8')).hexdigest()
+
+
+def _coordenadas(geometria: dict) -> list:
+    """Vértices (lon, lat) dos anéis de um Polygon ou MultiPolygon"""
+    tipo = geometria.get('type', '')
+    coords = geometria.get('coordinates', [])
+    if tipo == 'Polygon':
+        return [ponto for anel in coords for ponto in anel]
+    if tipo == 'MultiPolygon':
+        return [ponto for poligono in coords for anel in poligono for ponto in anel]
+    return []
+
+
+def _contar_vertices(geometria) -> int:
+    """Vértices dos anéis de um Polygon ou MultiPolygon"""
+    poligonos = getattr(geometria, 'geoms', [geometria])
+    return sum(len(p.exterior.coords) + sum(len(anel.coords) for anel in p.interiors)
+               for p in poligonos if not p.is_empty)
+
+
+def _casas_decimais(tolerancia: float) -> int:
+    """Casas decimais que mantêm o arredondamento ~10x abaixo da tolerância"""
+    return int(np.ceil(-np.log10(tolerancia))) + 1
+
+
+def _arredondar(geometria, casas: int) -> dict:
+    """Geometria GeoJSON com as coordenadas arredondadas em `casas` decimais"""
+    return mapping(shapely.transform(geometria, lambda xy: np.round(xy, casas)))
+
+
+def _simplificar_cobertura(geometrias: list, tolerancia: float) -> list:
+    """Simplifica os bairros mantendo as bordas comuns iguais entre vizinhos"""
+    if hasattr(shapely, 'coverage_simplify'):  # Shapely >= 2.1
+        return list(shapely.coverage_simplify(geometrias, tolerancia))
+    return [g.simplify(tolerancia, preserve_topology=True) for g in geometrias]
+
+
+def tamanho_geojson(objeto: dict) -> int:
+    """Bytes do GeoJSON serializado como no HTML do mapa"""
+    return len(json.dumps(objeto).encode('utf-8'))
+
+
+@dataclass(frozen=True)
+class NivelDetalhe:
+    """
+    Máscara e divisas entre bairros simplificadas para os zooms a partir de `zoom_min`.
+
+    `mascara` é uma Feature (retângulo externo menos a união dos bairros
+    simplificados): o contorno dela é a borda do Recife. `divisas` é uma
+    Feature MultiLineString só com as bordas internas, cada uma uma vez, em vez
+    de cada borda comum repetida nos dois bairros vizinhos. Juntas desenham o
+    mesmo que a borda dos bairros sobre a máscara.
+    """
+    zoom_min: int
+    tolerancia: float
+    mascara: dict
+    divisas: dict
+    vertices_mascara: int
+    vertices_divisas: int
+
+    @property
+    def bytes(self) -> int:
+        return tamanho_geojson(self.mascara) + tamanho_geojson(self.divisas)
+
+    @classmethod
+    def construir(cls, geometrias: list, zoom_min: int, tolerancia: float) -> 'NivelDetalhe':
+        simplificadas = _simplificar_cobertura(geometrias, tolerancia)
+        recife = unary_union(simplificadas)
+        mascara = box(*CAIXA_EXTERNA).difference(recife)
+        divisas = unary_union([g.boundary for g in simplificadas]).difference(recife.boundary)
+        divisas = shapely.line_merge(shapely.multilinestrings(shapely.get_parts(divisas)))
+        casas = _casas_decimais(tolerancia)
+        return cls(
+            zoom_min=zoom_min,
+            tolerancia=tolerancia,
+            mascara={'type': 'Feature', 'properties': {}, 'geometry': _arredondar(mascara, casas)},
+            divisas={'type': 'Feature', 'properties': {}, 'geometry': _arredondar(divisas, casas)},
+            vertices_mascara=_contar_vertices(mascara),
+            vertices_divisas=int(shapely.get_num_coordinates(divisas)),
+        )
+
+
+@dataclass(frozen=True)
+class FronteiraRecife:
+    """
+    Limites e máscara externa do Recife.
+
+    `limites` é `[[lat_min, lon_min], [lat_max, lon_max]]` (formato do
+    `fit_bounds` do Folium), ou None se o GeoJSON não tiver polígonos;
+    `mascara` é uma Feature GeoJSON com o retângulo externo menos a união dos
+    bairros, simplificada. `vertices_mascara` conta os vértices antes e depois
+    da simplificação, `vertices_bairros` os vértices do GeoJSON original,
+    `niveis` são os `NivelDetalhe` em ordem de zoom e `segundos` é o tempo do
+    cálculo.
+    """
+    impressao: str
+    limites: list
+    mascara: dict
+    vertices_mascara: tuple = (0, 0)
+    vertices_bairros: int = 0
+    niveis: tuple = ()
+    segundos: float = 0.0
+
+    @property
+    def centro(self) -> list:
+        """[lat, lon] do centro dos limites"""
+        (lat_min, lon_min), (lat_max, lon_max) = self.limites
+        return [(lat_min + lat_max) / 2, (lon_min + lon_max) / 2]
+
+    def nivel(self, zoom: float) -> NivelDetalhe:
+        """Nível de detalhe desenhado no `zoom` (o mais grosso abaixo do primeiro nível)"""
+        escolhido = self.niveis[0] if self.niveis else None
+        for nivel in self.niveis:
+            if zoom >= nivel.zoom_min:
+                escolhido = nivel
+        return escolhido
+
+    @classmethod
+    def construir(cls, bairros_geojson: dict, tolerancia: float = TOLERANCIA_MASCARA,
+                  niveis_detalhe=NIVEIS_DETALHE) -> 'FronteiraRecife':
+        inicio = time.perf_counter()
+        features = bairros_geojson.get('features', [])
+
+        coords = [ponto for feature in features for ponto in _coordenadas(feature.get('geometry') or {})]
+        limites = None
+        if coords:
+            lonlat = np.array([ponto[:2] for ponto in coords], dtype=float)
+            lon_min, lat_min = lonlat.min(axis=0)
+            lon_max, lat_max = lonlat.max(axis=0)
+            limites = [[float(lat_min), float(lon_min)], [float(lat_max), float(lon_max)]]
+
+        geometrias = [shape(feature['geometry']) for feature in features]
+        recife = unary_union(geometrias)
+        mascara = box(*CAIXA_EXTERNA).difference(recife)
+        simplificada = mascara.simplify(tolerancia, preserve_topology=True) if tolerancia > 0 else mascara
+        vertices = (_contar_vertices(mascara), _contar_vertices(simplificada))
+        niveis = tuple(NivelDetalhe.construir(geometrias, zoom_min, tol)
+                       for zoom_min, tol in sorted(niveis_detalhe)) if geometrias else ()
+
+        return cls(
+            impressao=impressao_geojson(bairros_geojson),
+            limites=limites,
+            mascara={'type': 'Feature', 'geometry': mapping(simplificada)},
+            vertices_mascara=vertices,
+            vertices_bairros=sum(_contar_vertices(g) for g in geometrias),
+            niveis=niveis,
+            segundos=time.perf_counter() - inicio,
+        )
+
+    def salvar(self, caminho: Path):
+        caminho = Path(caminho)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        tmp = caminho.with_name(caminho.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                'versao': VERSAO_FRONTEIRA,
+                'impressao': self.impressao,
+                'limites': self.limites,
+                'mascara': self.mascara,
+                'vertices_mascara': list(self.vertices_mascara),
+                'vertices_bairros': self.vertices_bairros,
+                'niveis': [asdict(nivel) for nivel in self.niveis],
+                'segundos': self.segundos,
+            }, f)
+        os.replace(tmp, caminho)
+
+    @classmethod
+    def carregar(cls, caminho: Path) -> 'FronteiraRecife':
+        with open(caminho, 'r', encoding='utf-8') as f:
+            conteudo = json.load(f)
+        if conteudo.get('versao') != VERSAO_FRONTEIRA:
+            raise ValueError(f"versão {conteudo.get('versao')} do cache da fronteira")
+        return cls(
+            impressao=conteudo['impressao'],
+            limites=conteudo['limites'],
+            mascara=conteudo['mascara'],
+            vertices_mascara=tuple(conteudo['vertices_mascara']),
+            vertices_bairros=conteudo['vertices_bairros'],
+            niveis=tuple(NivelDetalhe(**nivel) for nivel in conteudo['niveis']),
+            segundos=conteudo['segundos'],
+        )
+
+
+def obter_fronteira(bairros_geojson: dict, dir_cache: Path = None) -> FronteiraRecife:
+    """
+    Limites e máscara do Recife, lidos de `dir_cache` se corresponderem ao
+    mesmo GeoJSON; senão são calculados e gravados.
+    """
+    caminho = None
+    if dir_cache is not None:
+        caminho = Path(dir_cache) / "fronteira.json"
+        try:
+            fronteira = FronteiraRecife.carregar(caminho)
+            if fronteira.impressao == impressao_geojson(bairros_geojson):
+                return fronteira
+        except (OSError, ValueError, KeyError):
+            pass  # Ausente, corrompido ou de outra versão: recalcula
+
+    fronteira = FronteiraRecife.construir(bairros_geojson)
+    if caminho is not None:
+        try:
+            fronteira.salvar(caminho)
+        except OSError:
+            pass  # Sem permissão de escrita: segue só em memória
+    return fronteira
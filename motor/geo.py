@@ -0,0 +1,207 @@
+"""
+Funções geográficas do motor: distância de Haversine (escalar e vetorizada)
+e índice espacial em grade para consultas de raio.
+"""
+
+import math
+
+import numpy as np
+
+# Limite de elementos por bloco nas matrizes de distância (~32 MB em float64)
+MAX_ELEMENTOS_BLOCO = 4_000_000
+
+
+def haversine_metros(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Fórmula de Haversine vetorizada (NumPy), em metros.
+
+    Aceita escalares ou arrays com broadcasting: um ponto contra muitos
+    (`haversine_metros(lat, lon, lats, lons)`) ou matrizes via `[:, None]`.
+    """
+    R = 6371000
+    to_rad = math.pi / 180
+    lat1 = np.asarray(lat1, dtype=float)
+    lon1 = np.asarray(lon1, dtype=float)
+    lat2 = np.asarray(lat2, dtype=float)
+    lon2 = np.asarray(lon2, dtype=float)
+    d_lat = (lat2 - lat1) * to_rad
+    d_lon = (lon2 - lon1) * to_rad
+    a = (np.sin(d_lat / 2) ** 2 +
+         np.cos(lat1 * to_rad) * np.cos(lat2 * to_rad) *
+         np.sin(d_lon / 2) ** 2)
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return R * c
+
+
+def distancia_metros(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Calcula distância geodésica em metros usando fórmula de Haversine"""
+    return float(haversine_metros(lat1, lon1, lat2, lon2))
+
+
+def distancias_em_blocos(lats_a, lons_a, lats_b, lons_b, max_elementos: int = MAX_ELEMENTOS_BLOCO):
+    """
+    Distâncias de muitos pontos (A) contra muitos (B), em blocos de linhas.
+
+    Gera tuplas (inicio, matriz) onde `matriz[i, j]` é a distância entre
+    A[inicio + i] e B[j]; cada bloco tem no máximo `max_elementos` elementos.
+    """
+    lats_a = np.asarray(lats_a, dtype=float)
+    lons_a = np.asarray(lons_a, dtype=float)
+    lats_b = np.asarray(lats_b, dtype=float)
+    lons_b = np.asarray(lons_b, dtype=float)
+    linhas_por_bloco = max(1, max_elementos // max(len(lats_b), 1))
+    for inicio in range(0, len(lats_a), linhas_por_bloco):
+        fim = inicio + linhas_por_bloco
+        yield inicio, haversine_metros(
+            lats_a[inicio:fim, None], lons_a[inicio:fim, None], lats_b[None, :], lons_b[None, :]
+        )
+
+
+def mascara_no_raio(lats_a, lons_a, lats_b, lons_b, raio: float,
+                    max_elementos: int = MAX_ELEMENTOS_BLOCO) -> np.ndarray:
+    """Para cada ponto de A, indica se existe algum ponto de B a até `raio` metros"""
+    mascara = np.zeros(len(lats_a), dtype=bool)
+    if len(lats_a) == 0 or len(lats_b) == 0:
+        return mascara
+    for inicio, bloco in distancias_em_blocos(lats_a, lons_a, lats_b, lons_b, max_elementos):
+        mascara[inicio:inicio + len(bloco)] = (bloco <= raio).any(axis=1)
+    return mascara
+
+
+def pares_no_raio(lats_a, lons_a, lats_b, lons_b, raio: float, filtro=None,
+                  max_pontos_bloco: int = 20_000) -> tuple:
+    """
+    Todos os pares (i, j) com A[i] e B[j] a até `raio` metros (inclusive).
+
+    Versão vetorizada da consulta do `IndiceEspacial`: os pontos de B são
+    agrupados em células de `raio` metros e cada ponto de A só é comparado
+    com as 9 células vizinhas. A é processado em blocos de
+    `max_pontos_bloco` pontos para limitar a memória temporária; `filtro`
+    (opcional) recebe `(ia, jb)` e devolve a máscara dos pares a manter.
+    Devolve `(ia, jb)` ordenados por `ia` e depois `jb`.
+    """
+    lats_a = np.asarray(lats_a, dtype=float)
+    lons_a = np.asarray(lons_a, dtype=float)
+    lats_b = np.asarray(lats_b, dtype=float)
+    lons_b = np.asarray(lons_b, dtype=float)
+    vazio = np.empty(0, dtype=np.int64)
+    if len(lats_a) == 0 or len(lats_b) == 0:
+        return vazio, vazio
+
+    tamanho = max(float(raio), 1.0) * IndiceEspacial.MARGEM
+    ref_lat, ref_lon = lats_b[0], lons_b[0]
+    cos_ref = math.cos(math.radians(ref_lat))
+
+    def celulas(lats, lons):
+        x = np.radians(lons - ref_lon) * IndiceEspacial.R * cos_ref
+        y = np.radians(lats - ref_lat) * IndiceEspacial.R
+        return np.floor(x / tamanho).astype(np.int64), np.floor(y / tamanho).astype(np.int64)
+
+    cx_b, cy_b = celulas(lats_b, lons_b)
+    cx_a, cy_a = celulas(lats_a, lons_a)
+    deslocamento = int(max(np.abs(cy_b).max(), np.abs(cy_a).max())) + 2
+    largura = 2 * deslocamento + 1
+    chaves_b = cx_b * largura + (cy_b + deslocamento)
+    ordem_b = np.argsort(chaves_b, kind='stable')
+    chaves_ordenadas = chaves_b[ordem_b]
+
+    pares_a, pares_b = [], []
+    for inicio_bloco in range(0, len(lats_a), max_pontos_bloco):
+        bloco = slice(inicio_bloco, inicio_bloco + max_pontos_bloco)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                chaves_a = (cx_a[bloco] + dx) * largura + (cy_a[bloco] + dy + deslocamento)
+                inicio = np.searchsorted(chaves_ordenadas, chaves_a, side='left')
+                fim = np.searchsorted(chaves_ordenadas, chaves_a, side='right')
+                qtd = fim - inicio
+                total = int(qtd.sum())
+                if total == 0:
+                    continue
+                ia = np.repeat(np.arange(inicio_bloco, inicio_bloco + len(chaves_a)), qtd)
+                posicoes = np.arange(total) - np.repeat(np.cumsum(qtd) - qtd, qtd) + np.repeat(inicio, qtd)
+                jb = ordem_b[posicoes]
+                manter = haversine_metros(lats_a[ia], lons_a[ia], lats_b[jb], lons_b[jb]) <= raio
+                if filtro is not None:
+                    manter[manter] = filtro(ia[manter], jb[manter])
+                pares_a.append(ia[manter])
+                pares_b.append(jb[manter])
+
+    if not pares_a:
+        return vazio, vazio
+    ia, jb = np.concatenate(pares_a), np.concatenate(pares_b)
+    ordem = np.lexsort((jb, ia))
+    return ia[ordem], jb[ordem]
+
+
+def pares_mais_perto_que(lats_a, lons_a, lats_b, lons_b, dist: float, so_i_menor_j: bool = False) -> tuple:
+    """Pares (i, j) a menos de `dist` metros (estrito, como na restrição de distância mínima)"""
+    lats_a, lons_a = np.asarray(lats_a, dtype=float), np.asarray(lons_a, dtype=float)
+    lats_b, lons_b = np.asarray(lats_b, dtype=float), np.asarray(lons_b, dtype=float)
+
+    def estrito(ia, jb):
+        manter = haversine_metros(lats_a[ia], lons_a[ia], lats_b[jb], lons_b[jb]) < dist
+        return manter & (ia < jb) if so_i_menor_j else manter
+
+    return pares_no_raio(lats_a, lons_a, lats_b, lons_b, dist, filtro=estrito)
+
+
+class IndiceEspacial:
+    """
+    Grade métrica uniforme para consultas de raio sobre pontos lat/lon.
+
+    As coordenadas são projetadas localmente (equiretangular em torno do primeiro
+    ponto inserido) apenas para escolher as células candidatas; a decisão final
+    continua usando a distância de Haversine, então o resultado é idêntico à varredura
+    completa.
+    """
+
+    R = 6371000
+    MARGEM = 1.05  # folga para o erro da projeção local
+
+    def __init__(self, tamanho_celula: float):
+        self.tamanho_celula = max(float(tamanho_celula), 1.0)
+        self.celulas = {}
+        self.ref_lat = None
+        self.ref_lon = None
+        self.cos_ref = 1.0
+
+    def _projetar(self, lat: float, lon: float) -> tuple:
+        if self.ref_lat is None:
+            self.ref_lat, self.ref_lon = lat, lon
+            self.cos_ref = math.cos(math.radians(lat))
+        x = math.radians(lon - self.ref_lon) * self.R * self.cos_ref
+        y = math.radians(lat - self.ref_lat) * self.R
+        return x, y
+
+    def _celula(self, lat: float, lon: float) -> tuple:
+        x, y = self._projetar(lat, lon)
+        return int(math.floor(x / self.tamanho_celula)), int(math.floor(y / self.tamanho_celula))
+
+    def inserir(self, chave, lat: float, lon: float):
+        self.celulas.setdefault(self._celula(lat, lon), []).append((chave, lat, lon))
+
+    def _candidatos(self, lat: float, lon: float, raio: float):
+        if not self.celulas:
+            return
+        cx, cy = self._celula(lat, lon)
+        alcance = int(math.ceil(raio * self.MARGEM / self.tamanho_celula))
+        for dx in range(-alcance, alcance + 1):
+            for dy in range(-alcance, alcance + 1):
+                yield from self.celulas.get((cx + dx, cy + dy), ())
+
+    def _distancias_candidatos(self, lat: float, lon: float, raio: float) -> tuple:
+        candidatos = list(self._candidatos(lat, lon, raio))
+        if not candidatos:
+            return [], np.empty(0)
+        chaves, lats, lons = zip(*candidatos)
+        return chaves, haversine_metros(lat, lon, np.array(lats), np.array(lons))
+
+    def chaves_no_raio(self, lat: float, lon: float, raio: float) -> list:
+        """Retorna as chaves dos pontos a até `raio` metros (inclusive)"""
+        chaves, dist = self._distancias_candidatos(lat, lon, raio)
+        return [chave for chave, d in zip(chaves, dist) if d <= raio]
+
+    def existe_mais_perto_que(self, lat: float, lon: float, dist: float) -> bool:
+        """Indica se há algum ponto a menos de `dist` metros (estrito)"""
+        _, distancias = self._distancias_candidatos(lat, lon, dist)
+        return bool((distancias < dist).any())
@@ -0,0 +1,97 @@
+"""
+Modelo de IPE (Índice de Prioridade) dos cruzamentos em forma matricial.
+
+Os eixos (seg/lct/com/mob) de cada lado de cada cruzamento são organizados
+uma única vez por base de dados em matrizes N×4; uma nova combinação de pesos
+custa apenas um produto matriz–vetor e uma ordenação.
+"""
+
+import numpy as np
+import pandas as pd
+
+EIXOS = ('seg', 'lct', 'com', 'mob')
+COLUNAS_CRUZAMENTO = ['id', 'cod_log1', 'log1', 'cod_log2', 'log2', 'lat', 'lon']
+
+
+def ordem_por_ipe(ipe_cruz: np.ndarray) -> np.ndarray:
+    """Ordem decrescente de IPE, com os mesmos empates de sort_values('ipe_cruz', ascending=False)"""
+    n = len(ipe_cruz)
+    return (n - 1 - np.argsort(ipe_cruz[::-1], kind='quicksort'))[::-1]
+
+
+class ModeloIPE:
+    """Pré-computa as matrizes de eixos dos cruzamentos para recálculo rápido do IPE"""
+
+    def __init__(self, logs: pd.DataFrame, cruzamentos: pd.DataFrame):
+        self.vazio = logs.empty or cruzamentos.empty
+        if self.vazio:
+            self.cruzamentos = pd.DataFrame(columns=COLUNAS_CRUZAMENTO)
+            self.eixos_log1 = np.empty((0, len(EIXOS)))
+            self.eixos_log2 = np.empty((0, len(EIXOS)))
+            self.eixos_tot = np.empty((0, len(EIXOS)))
+            return
+
+        logs_unicos = logs.drop_duplicates(subset='cod_log', keep='last')
+        indice_logs = pd.Index(logs_unicos['cod_log'].astype('float64'))
+        pos1 = indice_logs.get_indexer(cruzamentos['cod_log1'].astype('float64'))
+        pos2 = indice_logs.get_indexer(cruzamentos['cod_log2'].astype('float64'))
+
+        # Cruzamentos cujos logradouros não estão no ranking são descartados
+        validos = (pos1 >= 0) & (pos2 >= 0)
+        self.vazio = not validos.any()
+
+        matriz_logs = logs_unicos[list(EIXOS)].to_numpy(dtype=float)
+        self.cruzamentos = cruzamentos.loc[validos, COLUNAS_CRUZAMENTO].reset_index(drop=True)
+        self.eixos_log1 = matriz_logs[pos1[validos]]
+        self.eixos_log2 = matriz_logs[pos2[validos]]
+        self.eixos_tot = self.eixos_log1 + self.eixos_log2
+
+    def __len__(self) -> int:
+        return len(self.cruzamentos)
+
+    def ipe_em_lote(self, pesos: np.ndarray) -> np.ndarray:
+        """
+        IPE de todos os cruzamentos para K vetores de pesos (matriz K×4) em um
+        único produto matricial; a coluna k corresponde a `pesos[k]`, na ordem
+        de `self.cruzamentos`.
+        """
+        return self.eixos_tot @ np.asarray(pesos, dtype=float).T
+
+    def calcular(self, w_seg: float, w_lct: float, w_com: float, w_mob: float) -> pd.DataFrame:
+        """Calcula o IPE de todos os cruzamentos para os pesos informados"""
+        if self.vazio:
+            return pd.DataFrame()
+
+        pesos = np.array([w_seg, w_lct, w_com, w_mob], dtype=float)
+        ipe_log1 = self.eixos_log1 @ pesos
+        ipe_log2 = self.eixos_log2 @ pesos
+        ipe_cruz = ipe_log1 + ipe_log2
+
+        ordem = ordem_por_ipe(ipe_cruz)
+
+        df = self.cruzamentos.take(ordem).reset_index(drop=True)
+        df['ipe_log1'] = ipe_log1[ordem]
+        df['ipe_log2'] = ipe_log2[ordem]
+        df['ipe_cruz'] = ipe_cruz[ordem]
+
+        eixos_tot = self.eixos_tot[ordem]
+        for j, eixo in enumerate(EIXOS):
+            df[f'{eixo}_tot'] = eixos_tot[:, j]
+        for j, eixo in enumerate(EIXOS):
+            df[f'ipe_cruz_{eixo}'] = pesos[j] * eixos_tot[:, j]
+
+        total_ipe = df['ipe_cruz'].sum()
+        if total_ipe > 0:
+            df['perc_ipe'] = df['ipe_cruz'] / total_ipe
+            df['cobertura_acum'] = df['ipe_cruz'].cumsum() / total_ipe
+        else:
+            df['perc_ipe'] = 0
+            df['cobertura_acum'] = 0
+
+        return df
+
+
+def calcular_ipe_cruzamentos(logs: pd.DataFrame, cruzamentos: pd.DataFrame, 
+                              w_seg: float, w_lct: float, w_com: float, w_mob: float) -> pd.DataFrame:
+    """Calcula IPE para todos os cruzamentos"""
+    return ModeloIPE(logs, cruzamentos).calcular(w_seg, w_lct, w_com, w_mob)
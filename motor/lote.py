@@ -0,0 +1,256 @@
+"""
+Execução em lote de grades de cenários.
+
+Lê um arquivo JSON com a grade de parâmetros, expande o produto cartesiano e
+executa cada cenário de `filtrar_por_cobertura_e_distancia` em um pool de
+processos. Cada processo carrega a base uma única vez (do cache Parquet) e
+reaproveita o IPE calculado para cada conjunto de pesos. O resultado é uma
+tabela consolidada (CSV ou Parquet) com cobertura, câmeras, custo e cobertura
+por eixo de cada cenário.
+
+Exemplo de grade:
+
+    {
+        "dist_min": [200, 300, 400, 500],
+        "max_cameras": {"inicio": 250, "fim": 4032, "passo": 250},
+        "cobertura": [80],
+        "incluir_red": [false, true],
+        "criterio": ["ipe", "ganho_marginal"],
+        "pesos": {"padrao": [15, 30, 15, 40], "seguranca": [40, 20, 20, 20]}
+    }
+
+`max_cameras` gera cenários no modo "Quantidade de Câmeras" (câmeras além das
+RED, como na interface) e `cobertura` no modo "Cobertura Alvo (%)". Pesos são
+informados como nos sliders e normalizados pela soma. `criterio` escolhe o
+modo do otimizador (padrão: "ipe").
+
+Uso:
+    python -m motor.lote grade.json -o resultados.csv --processos 8
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from motor.cache_resultados import CacheResultados, chave_cenario
+from motor.cobertura import RAIO_COBERTURA_PADRAO
+from motor.curva import CAMERAS_MAXIMO, calcular_curva_orcamento
+from motor.dados import DadosReferencia, carregar_dados
+from motor.metricas import CUSTO_UNITARIO_CAMERA, calcular_cobertura_por_logradouro_ajustada
+from motor.otimizador import MODO_IPE, filtrar_por_cobertura_e_distancia
+from motor.rede import DISTANCIA_LINHA_RETA
+
+RAIO_COBERTURA = RAIO_COBERTURA_PADRAO
+PESOS_PADRAO = {'padrao': [15, 30, 15, 40]}
+
+# Estado de cada processo do pool (preenchido por `_iniciar_processo`)
+_dados: DadosReferencia = None
+_cache: CacheResultados = None
+_ipe_por_pesos = {}
+
+
+def _expandir_valores(valor) -> list:
+    """Aceita lista, escalar ou faixa {"inicio", "fim", "passo"} (fim incluído)"""
+    if isinstance(valor, dict):
+        if valor['passo'] <= 0 or valor['inicio'] > valor['fim']:
+            raise ValueError(f"Faixa inválida {valor}: use passo > 0 e inicio ≤ fim")
+        valores = list(range(valor['inicio'], valor['fim'] + 1, valor['passo']))
+        if valores[-1] != valor['fim']:
+            valores.append(valor['fim'])
+        return valores
+    if isinstance(valor, list):
+        return valor
+    return [valor]
+
+
+def expandir_grade(grade: dict) -> list:
+    """Lista de cenários (dicts) a partir da especificação da grade"""
+    pesos = grade.get('pesos', PESOS_PADRAO)
+    if isinstance(pesos, list):
+        pesos = {'pesos': pesos}
+
+    limites = [('cameras', v) for v in _expandir_valores(grade.get('max_cameras', []))]
+    limites += [('cobertura', v) for v in _expandir_valores(grade.get('cobertura', []))]
+    if not limites:
+        limites = [('cameras', 500)]
+
+    cenarios = []
+    for (nome_pesos, valores), (modo, limite), dist_min, incluir_red, criterio in itertools.product(
+        pesos.items(), limites, _expandir_valores(grade.get('dist_min', 300)),
+        _expandir_valores(grade.get('incluir_red', False)), _expandir_valores(grade.get('criterio', MODO_IPE))
+    ):
+        cenarios.append({
+            'cenario': len(cenarios) + 1,
+            'pesos': nome_pesos,
+            'valores_pesos': [float(p) for p in valores],
+            'modo': modo,
+            'cobertura_alvo': float(limite) if modo == 'cobertura' else 100.0,
+            'max_cameras': int(limite) if modo == 'cameras' else None,
+            'dist_min': dist_min,
+            'incluir_red': bool(incluir_red),
+            'criterio': criterio,
+        })
+    return cenarios
+
+
+def _iniciar_processo(data_dir: Path, dir_cache: Path, caminho_cache_resultados: Path = None):
+    """Carrega a base uma única vez por processo do pool"""
+    global _dados, _cache, _ipe_por_pesos
+    _dados = carregar_dados(data_dir, dir_cache)
+    _cache = CacheResultados(max_itens=8, caminho_sqlite=caminho_cache_resultados)
+    _ipe_por_pesos = {}
+
+
+def _pesos_normalizados(valores: list) -> tuple:
+    soma = sum(valores) or 1
+    return tuple(v / soma for v in valores)
+
+
+def executar_cenario(cenario: dict) -> dict:
+    """Executa um cenário no processo atual e devolve a linha da tabela consolidada"""
+    inicio = time.perf_counter()
+    pesos = _pesos_normalizados(cenario['valores_pesos'])
+    if pesos not in _ipe_por_pesos:
+        _ipe_por_pesos[pesos] = _dados.modelo_ipe.calcular(*pesos)
+    df_ipe = _ipe_por_pesos[pesos]
+
+    pontos_minimos = _dados.pontos_minimos(cenario['incluir_red'])
+    cameras_red_base = 0
+    if not pontos_minimos.empty and 'is_red' in pontos_minimos.columns:
+        cameras_red_base = int(pontos_minimos.loc[pontos_minimos['is_red'] == True, 'cameras'].sum())
+
+    # Como na interface: o limite informado é de câmeras além das RED
+    max_cameras = cenario['max_cameras']
+    if max_cameras is not None and cenario['incluir_red']:
+        max_cameras += cameras_red_base
+
+    # Mesmas chaves e mesmo caminho da interface (curva de orçamento, com otimização completa só
+    # fora dela): uma grade executada em lote aquece o cache do app
+    chave_curva = chave_cenario(
+        _dados.impressao_digital, curva=True,
+        pesos=list(pesos), dist_min=cenario['dist_min'], distancia=DISTANCIA_LINHA_RETA,
+        raio_cobertura=RAIO_COBERTURA, incluir_red=cenario['incluir_red'],
+        teto_cameras=CAMERAS_MAXIMO, modo=cenario['criterio']
+    )
+    curva = _cache.obter_ou_calcular(chave_curva, lambda: calcular_curva_orcamento(
+        df_ipe, cenario['dist_min'], RAIO_COBERTURA, pontos_minimos if not pontos_minimos.empty else None,
+        _dados.logs, CAMERAS_MAXIMO, modo=cenario['criterio'],
+        matriz_cobertura=_dados.matriz_cobertura(RAIO_COBERTURA)
+    ))
+    resultado = curva.consultar(max_cameras, cenario['cobertura_alvo'] / 100)
+    if resultado is None:
+        chave = chave_cenario(
+            _dados.impressao_digital,
+            pesos=list(pesos), cobertura_frac=cenario['cobertura_alvo'] / 100, dist_min=cenario['dist_min'],
+            distancia=DISTANCIA_LINHA_RETA, max_cruzamentos=None, raio_cobertura=RAIO_COBERTURA,
+            limite_cob_log=None, incluir_red=cenario['incluir_red'], max_cameras=max_cameras,
+            modo=cenario['criterio']
+        )
+        resultado = _cache.obter_ou_calcular(chave, lambda: filtrar_por_cobertura_e_distancia(
+            df_ipe, cenario['cobertura_alvo'] / 100, cenario['dist_min'], None, RAIO_COBERTURA, None,
+            pontos_minimos if not pontos_minimos.empty else None, max_cameras, _dados.logs,
+            modo=cenario['criterio'], matriz_cobertura=_dados.matriz_cobertura(RAIO_COBERTURA)
+        ))
+    df_sel, _, alvo_atingido, motivo_limite, ids_cobertos, df_minimos, total_cameras = resultado
+
+    cobertura_total, eixos = 0.0, {'seg': 0.0, 'lct': 0.0, 'com': 0.0, 'mob': 0.0}
+    if ids_cobertos:
+        cobertura_total, eixos, _ = calcular_cobertura_por_logradouro_ajustada(df_ipe, ids_cobertos, _dados.logs)
+
+    cameras_red = 0
+    if not df_minimos.empty and 'is_red' in df_minimos.columns:
+        cameras_red = int(df_minimos.loc[df_minimos['is_red'] == True, 'cameras'].sum())
+    cameras_com_custo = int(total_cameras) - cameras_red
+
+    return {
+        'cenario': cenario['cenario'],
+        'pesos': cenario['pesos'],
+        'w_seg': pesos[0], 'w_lct': pesos[1], 'w_com': pesos[2], 'w_mob': pesos[3],
+        'modo': cenario['modo'],
+        'cobertura_alvo': cenario['cobertura_alvo'],
+        'max_cameras': cenario['max_cameras'],
+        'dist_min': cenario['dist_min'],
+        'incluir_red': cenario['incluir_red'],
+        'criterio': cenario['criterio'],
+        'pontos': len(df_sel) + len(df_minimos),
+        'cameras': int(total_cameras),
+        'cameras_red': cameras_red,
+        'custo': cameras_com_custo * CUSTO_UNITARIO_CAMERA,
+        'cobertura': cobertura_total,
+        'cobertura_seg': eixos['seg'],
+        'cobertura_lct': eixos['lct'],
+        'cobertura_com': eixos['com'],
+        'cobertura_mob': eixos['mob'],
+        'alvo_atingido': alvo_atingido,
+        'motivo_limite': motivo_limite,
+        'segundos': time.perf_counter() - inicio,
+    }
+
+
+def executar_grade(cenarios: list, data_dir: Path, dir_cache: Path = None, processos: int = None,
+                   caminho_cache_resultados: Path = None) -> pd.DataFrame:
+    """
+    Executa os cenários em `processos` processos (padrão: todos os núcleos)
+    e devolve a tabela consolidada na ordem da grade.
+    """
+    data_dir = Path(data_dir)
+    dir_cache = Path(dir_cache) if dir_cache is not None else data_dir / ".cache"
+    processos = processos or os.cpu_count() or 1
+
+    # Carga no processo principal grava o cache Parquet antes de o pool subir
+    _iniciar_processo(data_dir, dir_cache, caminho_cache_resultados)
+    if _dados.modelo_ipe is None:
+        raise FileNotFoundError(f"Base de cruzamentos não encontrada em {data_dir}")
+
+    if processos == 1 or len(cenarios) <= 1:
+        linhas = [executar_cenario(c) for c in cenarios]
+    else:
+        # Cenários com os mesmos pesos ficam no mesmo lote e reaproveitam o IPE do processo
+        lote = max(1, len(cenarios) // (processos * 4))
+        with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo,
+                                 initargs=(data_dir, dir_cache, caminho_cache_resultados)) as pool:
+            linhas = list(pool.map(executar_cenario, cenarios, chunksize=lote))
+
+    resultado = pd.DataFrame(linhas)
+    resultado['max_cameras'] = resultado['max_cameras'].astype('Int64')
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('grade', type=Path, help="Arquivo JSON com a grade de cenários")
+    parser.add_argument('-o', '--saida', type=Path, default=Path('resultados_lote.csv'),
+                        help="Tabela consolidada (.csv ou .parquet)")
+    parser.add_argument('--dados', type=Path, default=Path(__file__).resolve().parent.parent / "data")
+    parser.add_argument('--processos', type=int, default=None, help="Padrão: número de núcleos")
+    parser.add_argument('--sem-cache', action='store_true',
+                        help="Não lê nem grava o cache de cenários em data/.cache/resultados.sqlite")
+    args = parser.parse_args()
+
+    with open(args.grade, 'r', encoding='utf-8') as f:
+        cenarios = expandir_grade(json.load(f))
+
+    dir_cache = args.dados / ".cache"
+    caminho_cache_resultados = None if args.sem_cache else dir_cache / "resultados.sqlite"
+
+    inicio = time.perf_counter()
+    resultado = executar_grade(cenarios, args.dados, dir_cache, args.processos, caminho_cache_resultados)
+    total = time.perf_counter() - inicio
+
+    if args.saida.suffix == '.parquet':
+        resultado.to_parquet(args.saida, index=False)
+    else:
+        resultado.to_csv(args.saida, index=False, encoding='utf-8-sig')
+
+    print(f"{len(cenarios)} cenários em {total:.1f}s "
+          f"(soma dos cenários: {resultado['segundos'].sum():.1f}s) → {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
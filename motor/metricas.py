@@ -0,0 +1,339 @@
+"""
+Métricas de cobertura dos cenários: regra de 15% por logradouro, alvos
+estratégicos (alagamentos, sinistros, CVP, vias prioritárias) e equipamentos
+públicos próximos às câmeras.
+
+Sinistros, CVP e vias prioritárias são contados por nome de logradouro. O
+`IndiceLogradouros` normaliza os nomes dos cruzamentos e das três tabelas uma
+única vez (no carregamento) em códigos categóricos; cada consulta passa a ser
+uma filtragem de arrays pelos códigos dos cruzamentos cobertos.
+"""
+
+import numpy as np
+import pandas as pd
+
+from motor.geo import mascara_no_raio
+
+# Custo (R$) de cada câmera instalada; câmeras dos relógios digitais (RED) não têm custo
+CUSTO_UNITARIO_CAMERA = 1610
+
+# Alvos contados por logradouro: tabela → coluna do valor e valor padrão
+ALVOS_LOGRADOURO = {
+    'sinistros': ('qtd', 1),
+    'cvp': ('cvp', 0),
+    'vias_prioritarias': ('prioridade', 5),
+}
+
+
+def normalizar_logradouros(nomes: pd.Series) -> pd.Series:
+    """Nomes de logradouro sem espaços nas pontas e em maiúsculas"""
+    return nomes.astype(str).str.strip().str.upper()
+
+
+class IndiceLogradouros:
+    """
+    Logradouros normalizados dos cruzamentos e das tabelas de alvos, em
+    códigos densos `0..m-1` (`nomes[k]` é o nome do código `k`).
+
+    `lados[i]` são os códigos de `log1` e `log2` do cruzamento `ids[i]`.
+    Para cada alvo de `ALVOS_LOGRADOURO`, `valores[alvo][k]` é o valor do
+    logradouro `k` na tabela (a última linha vence, se repetido) e
+    `presente[alvo][k]` indica se ele está na tabela.
+    """
+
+    def __init__(self, cruzamentos: pd.DataFrame, **tabelas: pd.DataFrame):
+        vazio = pd.Series('', index=cruzamentos.index)
+        log1 = normalizar_logradouros(cruzamentos['log1'] if 'log1' in cruzamentos.columns else vazio)
+        log2 = normalizar_logradouros(cruzamentos['log2'] if 'log2' in cruzamentos.columns else vazio)
+
+        normalizadas = {}
+        for alvo, (coluna, padrao) in ALVOS_LOGRADOURO.items():
+            tabela = tabelas.get(alvo)
+            if tabela is None or tabela.empty:
+                continue
+            valores = tabela[coluna] if coluna in tabela.columns else pd.Series(padrao, index=tabela.index)
+            normalizadas[alvo] = (normalizar_logradouros(tabela['logradouro']), valores.astype(int).to_numpy())
+
+        todos = pd.concat([log1, log2] + [nomes for nomes, _ in normalizadas.values()], ignore_index=True)
+        codigos, self.nomes = pd.factorize(todos, sort=False)
+        m = len(self.nomes)
+        n = len(cruzamentos)
+        self.ids = pd.Index(cruzamentos['id']) if 'id' in cruzamentos.columns else pd.RangeIndex(n)
+        self.lados = np.column_stack([codigos[:n], codigos[n:2 * n]]).astype(np.int32)
+
+        self.valores, self.presente = {}, {}
+        inicio = 2 * n
+        for alvo, (nomes, valores) in normalizadas.items():
+            codigos_alvo = codigos[inicio:inicio + len(nomes)]
+            inicio += len(nomes)
+            # Logradouro repetido na tabela: vale a última linha
+            ultima = ~pd.Index(codigos_alvo).duplicated(keep='last')
+            self.valores[alvo] = np.zeros(m, dtype=np.int64)
+            self.valores[alvo][codigos_alvo[ultima]] = valores[ultima]
+            self.presente[alvo] = np.zeros(m, dtype=bool)
+            self.presente[alvo][codigos_alvo] = True
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def valores_de(self, alvo: str, nomes) -> list:
+        """Valor de `alvo` (ex.: sinistros) para cada nome já normalizado (0 se ausente)"""
+        if alvo not in self.valores:
+            return [0] * len(nomes)
+        codigos = self.nomes.get_indexer(list(nomes))
+        return np.where(codigos >= 0, self.valores[alvo][codigos], 0).tolist()
+
+    def verificar(self, ids_cobertos=None) -> dict:
+        """
+        Sinistros, CVP e vias prioritárias cobertos pelos cruzamentos
+        `ids_cobertos` (padrão: todos), na ordem em que aparecem.
+
+        Devolve um dict alvo → tupla, iguais às de
+        `verificar_sinistros_por_logradouro`, `verificar_cvp_por_logradouro`
+        e `verificar_vias_prioritarias_por_logradouro`.
+        """
+        if ids_cobertos is None:
+            lados = self.lados
+        else:
+            posicoes = self.ids.get_indexer(np.asarray(list(ids_cobertos)))
+            lados = self.lados[posicoes[posicoes >= 0]]
+        lados = lados.ravel()  # log1 e log2 de cada cruzamento, em sequência
+
+        resultado = {}
+        for alvo in ALVOS_LOGRADOURO:
+            if alvo not in self.valores or not len(lados):
+                resultado[alvo] = (0, 0, [])
+                continue
+            valores, presente = self.valores[alvo], self.presente[alvo]
+            cobertos = pd.unique(lados[presente[lados]])
+            nomes = self.nomes[cobertos].tolist()
+            if alvo == 'vias_prioritarias':
+                # Menor número = maior prioridade; empates na ordem de aparição
+                prioridades = valores[cobertos]
+                ordem = np.argsort(prioridades, kind='stable')
+                resultado[alvo] = (len(cobertos), int(presente.sum()),
+                                   [(nomes[k], int(prioridades[k])) for k in ordem])
+            else:
+                resultado[alvo] = (int(valores[cobertos].sum()), int(valores[presente].sum()), nomes)
+        return resultado
+
+
+def verificar_alagamentos_por_raio(df_cameras: pd.DataFrame, df_alagamentos: pd.DataFrame, 
+                                    raio_camera: float = 50, raio_ponto: float = 100) -> list:
+
+    if df_cameras.empty or df_alagamentos.empty:
+        return []
+    
+    raio_total = raio_camera + raio_ponto  # 150m no caso padrão
+    
+    cobertos = mascara_no_raio(
+        df_alagamentos['lat'].to_numpy(dtype=float), df_alagamentos['lon'].to_numpy(dtype=float),
+        df_cameras['lat'].to_numpy(dtype=float), df_cameras['lon'].to_numpy(dtype=float),
+        raio_total
+    )
+    
+    if 'nome' in df_alagamentos.columns:
+        nomes = df_alagamentos['nome']
+    else:
+        ids = df_alagamentos['id'] if 'id' in df_alagamentos.columns else pd.Series('', index=df_alagamentos.index)
+        nomes = "Alagamento " + ids.astype(str)
+    
+    return nomes[cobertos].tolist()
+
+
+def verificar_sinistros_por_logradouro(df_cruzamentos_selecionados: pd.DataFrame, df_sinistros: pd.DataFrame) -> tuple:
+    """Verifica quais logradouros com sinistros têm cobertura de câmeras"""
+    if df_cruzamentos_selecionados.empty or df_sinistros.empty:
+        return 0, 0, []
+    indice = IndiceLogradouros(df_cruzamentos_selecionados, sinistros=df_sinistros)
+    return indice.verificar()['sinistros']
+
+def calcular_cobertura_por_logradouro_ajustada(df_calculados: pd.DataFrame, ids_cobertos: set, logs: pd.DataFrame) -> tuple:
+    """
+    Calcula cobertura por logradouro com regra de 50%:
+    - Se logradouro tem >= 50% de cobertura efetiva, considera 100%
+    - Se < 50%, mantém a cobertura atual
+    
+    Retorna: (cobertura_ajustada_total, dict_por_eixo, detalhes_logradouros)
+    """
+    if df_calculados.empty or logs.empty:
+        return 0.0, {'seg': 0.0, 'lct': 0.0, 'com': 0.0, 'mob': 0.0, 'qtd_100': 0, 'total_logs': 0}, []
+    
+    logs_dict = {}
+    for _, log in logs.iterrows():
+        cod_log = int(log['cod_log'])
+        logs_dict[cod_log] = {
+            'nome': log['nome'],
+            'seg': log['seg'],
+            'lct': log['lct'],
+            'com': log['com'],
+            'mob': log['mob']
+        }
+    
+    ipe_total_por_log = {}
+    for _, cruz in df_calculados.iterrows():
+        cod1, cod2 = cruz['cod_log1'], cruz['cod_log2']
+        ipe = cruz['ipe_cruz']
+        
+        if cod1 not in ipe_total_por_log:
+            ipe_total_por_log[cod1] = {'total': 0, 'seg': 0, 'lct': 0, 'com': 0, 'mob': 0}
+        if cod2 not in ipe_total_por_log:
+            ipe_total_por_log[cod2] = {'total': 0, 'seg': 0, 'lct': 0, 'com': 0, 'mob': 0}
+        
+        ipe_total_por_log[cod1]['total'] += ipe
+        ipe_total_por_log[cod2]['total'] += ipe
+        
+        ipe_total_por_log[cod1]['seg'] += cruz['ipe_cruz_seg']
+        ipe_total_por_log[cod1]['lct'] += cruz['ipe_cruz_lct']
+        ipe_total_por_log[cod1]['com'] += cruz['ipe_cruz_com']
+        ipe_total_por_log[cod1]['mob'] += cruz['ipe_cruz_mob']
+        
+        ipe_total_por_log[cod2]['seg'] += cruz['ipe_cruz_seg']
+        ipe_total_por_log[cod2]['lct'] += cruz['ipe_cruz_lct']
+        ipe_total_por_log[cod2]['com'] += cruz['ipe_cruz_com']
+        ipe_total_por_log[cod2]['mob'] += cruz['ipe_cruz_mob']
+    
+    ipe_coberto_por_log = {}
+    df_cobertos = df_calculados[df_calculados['id'].isin(ids_cobertos)]
+    
+    for _, cruz in df_cobertos.iterrows():
+        cod1, cod2 = cruz['cod_log1'], cruz['cod_log2']
+        ipe = cruz['ipe_cruz']
+        
+        if cod1 not in ipe_coberto_por_log:
+            ipe_coberto_por_log[cod1] = {'total': 0, 'seg': 0, 'lct': 0, 'com': 0, 'mob': 0}
+        if cod2 not in ipe_coberto_por_log:
+            ipe_coberto_por_log[cod2] = {'total': 0, 'seg': 0, 'lct': 0, 'com': 0, 'mob': 0}
+        
+        ipe_coberto_por_log[cod1]['total'] += ipe
+        ipe_coberto_por_log[cod2]['total'] += ipe
+        
+        ipe_coberto_por_log[cod1]['seg'] += cruz['ipe_cruz_seg']
+        ipe_coberto_por_log[cod1]['lct'] += cruz['ipe_cruz_lct']
+        ipe_coberto_por_log[cod1]['com'] += cruz['ipe_cruz_com']
+        ipe_coberto_por_log[cod1]['mob'] += cruz['ipe_cruz_mob']
+        
+        ipe_coberto_por_log[cod2]['seg'] += cruz['ipe_cruz_seg']
+        ipe_coberto_por_log[cod2]['lct'] += cruz['ipe_cruz_lct']
+        ipe_coberto_por_log[cod2]['com'] += cruz['ipe_cruz_com']
+        ipe_coberto_por_log[cod2]['mob'] += cruz['ipe_cruz_mob']
+    
+    ipe_ajustado_total = 0
+    ipe_ajustado_seg = 0
+    ipe_ajustado_lct = 0
+    ipe_ajustado_com = 0
+    ipe_ajustado_mob = 0
+    
+    ipe_total_geral = sum(v['total'] for v in ipe_total_por_log.values())
+    ipe_total_seg = sum(v['seg'] for v in ipe_total_por_log.values())
+    ipe_total_lct = sum(v['lct'] for v in ipe_total_por_log.values())
+    ipe_total_com = sum(v['com'] for v in ipe_total_por_log.values())
+    ipe_total_mob = sum(v['mob'] for v in ipe_total_por_log.values())
+    
+    detalhes = []
+    logradouros_100 = 0
+    
+    for cod_log, ipe_total_dict in ipe_total_por_log.items():
+        ipe_total = ipe_total_dict['total']
+        ipe_coberto = ipe_coberto_por_log.get(cod_log, {'total': 0})['total']
+        
+        if ipe_total > 0:
+            cobertura_efetiva = ipe_coberto / ipe_total
+            
+            if cobertura_efetiva >= 0.15:
+                ipe_ajustado_total += ipe_total_dict['total']
+                ipe_ajustado_seg += ipe_total_dict['seg']
+                ipe_ajustado_lct += ipe_total_dict['lct']
+                ipe_ajustado_com += ipe_total_dict['com']
+                ipe_ajustado_mob += ipe_total_dict['mob']
+                cobertura_final = 1.0
+                logradouros_100 += 1
+            else:
+                ipe_ajustado_total += ipe_coberto
+                ipe_ajustado_seg += ipe_coberto_por_log.get(cod_log, {}).get('seg', 0)
+                ipe_ajustado_lct += ipe_coberto_por_log.get(cod_log, {}).get('lct', 0)
+                ipe_ajustado_com += ipe_coberto_por_log.get(cod_log, {}).get('com', 0)
+                ipe_ajustado_mob += ipe_coberto_por_log.get(cod_log, {}).get('mob', 0)
+                cobertura_final = cobertura_efetiva
+            
+            nome_log = logs_dict.get(cod_log, {}).get('nome', f'Log {cod_log}')
+            detalhes.append({
+                'cod_log': cod_log,
+                'nome': nome_log,
+                'cobertura_efetiva': cobertura_efetiva,
+                'cobertura_ajustada': cobertura_final,
+                'ipe_total': ipe_total
+            })
+    
+    cobertura_ajustada_total = (ipe_ajustado_total / ipe_total_geral * 100) if ipe_total_geral > 0 else 0
+    cobertura_ajustada_seg = (ipe_ajustado_seg / ipe_total_seg * 100) if ipe_total_seg > 0 else 0
+    cobertura_ajustada_lct = (ipe_ajustado_lct / ipe_total_lct * 100) if ipe_total_lct > 0 else 0
+    cobertura_ajustada_com = (ipe_ajustado_com / ipe_total_com * 100) if ipe_total_com > 0 else 0
+    cobertura_ajustada_mob = (ipe_ajustado_mob / ipe_total_mob * 100) if ipe_total_mob > 0 else 0
+    
+    dict_por_eixo = {
+        'seg': cobertura_ajustada_seg,
+        'lct': cobertura_ajustada_lct,
+        'com': cobertura_ajustada_com,
+        'mob': cobertura_ajustada_mob,
+        'qtd_100': logradouros_100,
+        'total_logs': len(ipe_total_por_log)
+    }
+    
+    detalhes.sort(key=lambda x: x['cobertura_efetiva'], reverse=True)
+    
+    return cobertura_ajustada_total, dict_por_eixo, detalhes
+
+def verificar_vias_prioritarias_por_logradouro(df_cruzamentos_selecionados: pd.DataFrame, 
+                                                 df_vias_prioritarias: pd.DataFrame) -> tuple:
+    """Verifica quais vias prioritárias têm cobertura de câmeras (ordenadas por prioridade)"""
+    if df_cruzamentos_selecionados.empty or df_vias_prioritarias.empty:
+        return 0, 0, []
+    indice = IndiceLogradouros(df_cruzamentos_selecionados, vias_prioritarias=df_vias_prioritarias)
+    return indice.verificar()['vias_prioritarias']
+
+def verificar_cvp_por_logradouro(df_cruzamentos_selecionados: pd.DataFrame, df_cvp: pd.DataFrame) -> tuple:
+    """Verifica quais logradouros com CVP têm cobertura de câmeras"""
+    if df_cruzamentos_selecionados.empty or df_cvp.empty:
+        return 0, 0, []
+    indice = IndiceLogradouros(df_cruzamentos_selecionados, cvp=df_cvp)
+    return indice.verificar()['cvp']
+
+def verificar_equipamentos_proximos(df_selecionados: pd.DataFrame, df_equipamentos: pd.DataFrame, 
+                                     raio_camera: float = 50, nota_min: int = 4, eixos: list = None,
+                                     raio_equipamento: float = 100) -> list:
+    
+    if df_selecionados.empty or df_equipamentos.empty:
+        return []
+    
+    df_full = df_equipamentos.copy()
+    df_full['eixo_norm'] = df_full['eixo'].astype(str).str.strip().str.upper()
+    
+    if eixos:
+        df_equip = df_full[
+            (df_full['eixo_norm'].isin(eixos)) & 
+            (df_full['peso'] >= nota_min)
+        ].copy()
+    else:
+        df_equip = df_full[df_full['peso'] >= nota_min].copy()
+    
+    if df_equip.empty:
+        return []
+    
+    raio_total = raio_camera + raio_equipamento  # 150m no caso padrão
+    
+    proximos = mascara_no_raio(
+        df_equip['lat'].to_numpy(dtype=float), df_equip['lon'].to_numpy(dtype=float),
+        df_selecionados['lat'].to_numpy(dtype=float), df_selecionados['lon'].to_numpy(dtype=float),
+        raio_total
+    )
+    
+    tipos = df_equip.loc[proximos, 'tipo'].astype(str).str.strip()
+    tipos = tipos.mask((tipos == '') | (tipos.str.lower() == 'nan'), 'Equipamento Não Identificado')
+    
+    equipamentos_proximos = sorted(
+        ((tipo, int(qtd)) for tipo, qtd in tipos.value_counts().items()),
+        key=lambda x: (-x[1], x[0])
+    )
+    
+    return equipamentos_proximos
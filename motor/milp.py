@@ -0,0 +1,344 @@
+"""
+Cobertura máxima com orçamento por programação inteira (MILP, HiGHS).
+
+O guloso não dá garantia de otimalidade; este módulo formula o mesmo
+problema de `filtrar_por_cobertura_e_distancia` como MILP e o resolve com o
+HiGHS (`pip install highspy`, dependência opcional), partindo da solução
+gulosa. O resultado traz a melhor solução encontrada, o limitante superior
+da cobertura e o gap relativo dentro do tempo limite.
+
+Formulação (posições de `df`; L = logradouros com código denso):
+
+- `x_i` ∈ {0,1}: câmera no cruzamento i; `y_j` ∈ [0,1]: cruzamento j coberto,
+  com `y_j ≤ Σ x_i` sobre as câmeras que cobrem j (matriz de cobertura) e
+  `y_j = 1` para os cobertos pelos pontos mínimos;
+- distância mínima: `x_i + x_k ≤ 1` para pares a menos de `min_dist` metros
+  (em linha reta ou pela rede, com `distancias_rede`), e `x_i = 0` perto dos
+  pontos mínimos;
+- orçamento: as câmeras por ponto dependem só da posição na seleção, então
+  `max_cameras` vira um número máximo de pontos `Σ x_i ≤ K`;
+- regra de 15%: `C_L = Σ ipe_j y_j` (cruzamentos do logradouro), `z_L` ∈ {0,1}
+  com `C_L ≥ 0,15 T_L z_L` e a contribuição `a_L ≤ C_L + T_L z_L`, `a_L ≤ T_L`.
+
+Com orçamento (câmeras ou cruzamentos) maximiza `Σ a_L / Σ T_L`; sem
+orçamento, minimiza o número de pontos que atinge `cobertura_frac`.
+"""
+
+import importlib.util
+import time
+
+import numpy as np
+import pandas as pd
+
+from motor.cobertura import MatrizCobertura
+from motor.geo import pares_mais_perto_que
+from motor.otimizador import calcular_cameras_por_ponto, filtrar_por_cobertura_e_distancia
+from motor.rede import DistanciasRede, pares_cruzamentos_mais_perto_que
+from motor.tabela_cruzamentos import TabelaCruzamentos
+
+LIMIAR_LOGRADOURO = 0.15
+
+
+def milp_disponivel() -> bool:
+    """Indica se o solver HiGHS (`highspy`) está instalado"""
+    return importlib.util.find_spec('highspy') is not None
+
+
+def otimizar_milp(df: pd.DataFrame, cobertura_frac: float, min_dist: float,
+                  max_cruzamentos: int = None, raio_cobertura: float = 50,
+                  limite_cobertura_logradouro: float = None,
+                  pontos_minimos: pd.DataFrame = None,
+                  max_cameras: int = None,
+                  logs: pd.DataFrame = None,
+                  matriz_cobertura: MatrizCobertura = None,
+                  distancias_rede: DistanciasRede = None,
+                  tempo_limite: float = 60.0, gap_relativo: float = 1e-4) -> tuple:
+    """
+    Resolve o posicionamento como MILP com as mesmas entradas do guloso.
+
+    Devolve `(resultado, info)`: `resultado` é a mesma tupla de
+    `filtrar_por_cobertura_e_distancia` para a melhor solução encontrada e
+    `info` traz status do solver, cobertura gulosa e do MILP, limitante
+    (`limite_superior` de cobertura com orçamento, `limite_inferior` de
+    pontos sem orçamento), `gap` (fração que a solução pode estar distante do
+    limitante), tamanho do modelo e tempos.
+    """
+    import highspy
+
+    inicio = time.perf_counter()
+    usar_cobertura_ajustada = logs is not None and not logs.empty
+    com_orcamento = max_cameras is not None or max_cruzamentos is not None
+
+    # Solução gulosa: ponto de partida do solver e referência do gap
+    guloso = filtrar_por_cobertura_e_distancia(
+        df, cobertura_frac, min_dist, max_cruzamentos, raio_cobertura, limite_cobertura_logradouro,
+        pontos_minimos, max_cameras, logs, matriz_cobertura=matriz_cobertura, distancias_rede=distancias_rede
+    )
+    segundos_guloso = time.perf_counter() - inicio
+    df_guloso, cobertura_gulosa, _, _, ids_gulosos, df_minimos, _ = guloso
+    info = {
+        'status': 'sem cruzamentos', 'cobertura_gulosa': float(cobertura_gulosa), 'pontos_gulosos': len(df_guloso),
+        'cobertura': float(cobertura_gulosa), 'pontos': len(df_guloso), 'limite_superior': None,
+        'limite_inferior': None, 'gap': None, 'variaveis': 0, 'restricoes': 0,
+        'segundos_guloso': segundos_guloso, 'segundos_milp': 0.0,
+    }
+    if df.empty or df['ipe_cruz'].sum() <= 0:
+        return guloso, info
+
+    tabela = TabelaCruzamentos(df)
+    n, m = len(tabela), tabela.qtd_logradouros
+    if matriz_cobertura is None or not matriz_cobertura.compativel(tabela.ids, raio_cobertura, distancias_rede):
+        matriz_cobertura = MatrizCobertura.construir(df, raio_cobertura, distancias_rede)
+    posicao_na_matriz = matriz_cobertura.posicoes(tabela.ids)
+    posicao_em_df = np.empty(n, dtype=np.int64)
+    posicao_em_df[posicao_na_matriz] = np.arange(n)
+
+    # Pontos mínimos usados pelo guloso (já truncados pelo orçamento)
+    minimos_cameras = int(df_minimos['cameras'].sum()) if not df_minimos.empty else 0
+    minimos_pontos = len(df_minimos)
+    coberto_minimos = np.zeros(n, dtype=bool)
+    candidato = np.ones(n, dtype=bool)
+    if minimos_pontos:
+        lat_min = df_minimos['lat'].to_numpy(dtype=float)
+        lon_min = df_minimos['lon'].to_numpy(dtype=float)
+        _, cobertos = matriz_cobertura.cobertos_por_pontos(lat_min, lon_min)
+        coberto_minimos[posicao_em_df[cobertos]] = True
+        if min_dist > 0:
+            _, perto = pares_mais_perto_que(lat_min, lon_min, tabela.lat, tabela.lon, min_dist)
+            candidato[perto] = False
+
+    # Colunas: x (n), y (n) e, com a regra de 15%, z (m) e a (m)
+    col_x, col_y, col_z, col_a = 0, n, 2 * n, 2 * n + m
+    num_col = 2 * n + (2 * m if usar_cobertura_ajustada else 0)
+    inf = highspy.kHighsInf
+    col_lower = np.zeros(num_col)
+    col_upper = np.ones(num_col)
+    col_upper[col_x:col_x + n] = candidato
+    col_lower[col_y:col_y + n] = coberto_minimos
+    integrality = np.zeros(num_col, dtype=np.int32)
+    integrality[col_x:col_x + n] = 1
+    if usar_cobertura_ajustada:
+        integrality[col_z:col_z + m] = 1
+        col_upper[col_a:col_a + m] = tabela.ipe_por_log
+
+    linhas, colunas, valores, row_lower, row_upper = [], [], [], [], []
+
+    def adicionar_linhas(linha_local, coluna, valor, inferior, superior):
+        base = sum(len(r) for r in row_lower)
+        linhas.append(np.asarray(linha_local, dtype=np.int64) + base)
+        colunas.append(np.asarray(coluna, dtype=np.int64))
+        valores.append(np.asarray(valor, dtype=float))
+        row_lower.append(np.asarray(inferior, dtype=float))
+        row_upper.append(np.asarray(superior, dtype=float))
+
+    # Cobertura: y_j - Σ x_i ≤ 0 sobre as câmeras i que cobrem j
+    cam = posicao_em_df[np.repeat(np.arange(n), np.diff(matriz_cobertura.indptr))]
+    cob = posicao_em_df[matriz_cobertura.indices]
+    livres = np.flatnonzero(~coberto_minimos)
+    linha_de = np.full(n, -1)
+    linha_de[livres] = np.arange(len(livres))
+    manter = ~coberto_minimos[cob] & candidato[cam]
+    adicionar_linhas(
+        np.concatenate([np.arange(len(livres)), linha_de[cob[manter]]]),
+        np.concatenate([col_y + livres, col_x + cam[manter]]),
+        np.concatenate([np.ones(len(livres)), -np.ones(int(manter.sum()))]),
+        np.full(len(livres), -inf), np.zeros(len(livres))
+    )
+    if limite_cobertura_logradouro is not None:
+        # Com limite por logradouro a cobertura precisa ser exata: y_j ≥ x_i
+        qtd = int(manter.sum())
+        adicionar_linhas(
+            np.repeat(np.arange(qtd), 2),
+            np.column_stack([col_y + cob[manter], col_x + cam[manter]]).ravel(),
+            np.tile([1.0, -1.0], qtd), np.zeros(qtd), np.full(qtd, inf)
+        )
+
+    # Distância mínima entre câmeras
+    if min_dist > 0:
+        ia, jb = pares_cruzamentos_mais_perto_que(tabela.ids, tabela.lat, tabela.lon, min_dist, distancias_rede,
+                                                  so_i_menor_j=True)
+        par = candidato[ia] & candidato[jb]
+        ia, jb = ia[par], jb[par]
+        adicionar_linhas(
+            np.repeat(np.arange(len(ia)), 2), np.column_stack([col_x + ia, col_x + jb]).ravel(),
+            np.ones(2 * len(ia)), np.full(len(ia), -inf), np.ones(len(ia))
+        )
+        # Cliques: cruzamentos a menos de min_dist/2 de um mesmo cruzamento distam menos de min_dist
+        # entre si, então no máximo um deles recebe câmera (reforça a relaxação linear)
+        ic, kc = pares_cruzamentos_mais_perto_que(tabela.ids, tabela.lat, tabela.lon, min_dist / 2, distancias_rede)
+        clique = candidato[kc]
+        ic, kc = ic[clique], kc[clique]
+        tamanho = np.bincount(ic, minlength=n)
+        centros = np.flatnonzero(tamanho > 2)
+        linha_centro = np.full(n, -1)
+        linha_centro[centros] = np.arange(len(centros))
+        no_clique = tamanho[ic] > 2
+        adicionar_linhas(
+            linha_centro[ic[no_clique]], col_x + kc[no_clique], np.ones(int(no_clique.sum())),
+            np.full(len(centros), -inf), np.ones(len(centros))
+        )
+
+    # Orçamento em pontos: câmeras por ponto seguem a posição na seleção
+    max_pontos = n
+    if max_cameras is not None:
+        cameras_acumuladas = minimos_cameras + np.cumsum(
+            [calcular_cameras_por_ponto(minimos_pontos + t) for t in range(n)]
+        )
+        max_pontos = int(np.searchsorted(cameras_acumuladas, max_cameras, side='right'))
+    if max_cruzamentos is not None:
+        max_pontos = min(max_pontos, int(max_cruzamentos))
+    if com_orcamento:
+        adicionar_linhas(np.zeros(n), col_x + np.arange(n), np.ones(n), [-inf], [max_pontos])
+
+    # IPE coberto por logradouro: C_L = Σ ipe_j y_j (cruzamento conta em log1 e log2)
+    lados = np.column_stack([tabela.log1, tabela.log2]).ravel()
+    pos_lados = np.repeat(np.arange(n), 2)
+    ipe_lados = np.repeat(tabela.ipe, 2)
+    total_log = tabela.ipe_por_log
+    if usar_cobertura_ajustada:
+        logs_ativos = np.flatnonzero(total_log > 0)
+        col_upper[col_z + np.flatnonzero(total_log <= 0)] = 0
+        col_upper[col_a + np.flatnonzero(total_log <= 0)] = 0
+        # a_L - C_L - T_L z_L ≤ 0
+        adicionar_linhas(
+            np.concatenate([lados, np.arange(m), np.arange(m)]),
+            np.concatenate([col_y + pos_lados, col_a + np.arange(m), col_z + np.arange(m)]),
+            np.concatenate([-ipe_lados, np.ones(m), -total_log]),
+            np.full(m, -inf), np.zeros(m)
+        )
+        # a_L ≤ C_L / 0,15: vale nos dois casos e reforça a relaxação linear
+        adicionar_linhas(
+            np.concatenate([lados, np.arange(m)]),
+            np.concatenate([col_y + pos_lados, col_a + np.arange(m)]),
+            np.concatenate([-ipe_lados / LIMIAR_LOGRADOURO, np.ones(m)]),
+            np.full(m, -inf), np.zeros(m)
+        )
+        # C_L - 0,15 T_L z_L ≥ 0
+        adicionar_linhas(
+            np.concatenate([lados, np.arange(m)]),
+            np.concatenate([col_y + pos_lados, col_z + np.arange(m)]),
+            np.concatenate([ipe_lados, -LIMIAR_LOGRADOURO * total_log]),
+            np.zeros(m), np.full(m, inf)
+        )
+        total_objetivo = total_log.sum()
+        custo_cobertura = np.zeros(num_col)
+        custo_cobertura[col_a + logs_ativos] = 1.0 / total_objetivo
+    else:
+        custo_cobertura = np.zeros(num_col)
+        custo_cobertura[col_y:col_y + n] = tabela.ipe / tabela.ipe.sum()
+    if limite_cobertura_logradouro is not None:
+        ativos = total_log > 0
+        adicionar_linhas(
+            lados[ativos[lados]], col_y + pos_lados[ativos[lados]], ipe_lados[ativos[lados]],
+            np.full(m, -inf), np.where(ativos, limite_cobertura_logradouro * total_log, inf)
+        )
+
+    if com_orcamento:
+        col_cost = custo_cobertura
+        sentido = highspy.ObjSense.kMaximize
+    else:
+        # Menor número de pontos que atinge a cobertura alvo
+        adicionar_linhas(
+            np.zeros(int((custo_cobertura != 0).sum())), np.flatnonzero(custo_cobertura),
+            custo_cobertura[custo_cobertura != 0], [cobertura_frac], [inf]
+        )
+        col_cost = np.zeros(num_col)
+        col_cost[col_x:col_x + n] = 1.0
+        sentido = highspy.ObjSense.kMinimize
+
+    # Matriz por linhas (CSR)
+    linhas, colunas, valores = np.concatenate(linhas), np.concatenate(colunas), np.concatenate(valores)
+    row_lower, row_upper = np.concatenate(row_lower), np.concatenate(row_upper)
+    ordem = np.argsort(linhas, kind='stable')
+    inicio_linha = np.zeros(len(row_lower) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(linhas, minlength=len(row_lower)), out=inicio_linha[1:])
+
+    lp = highspy.HighsLp()
+    lp.num_col_, lp.num_row_ = num_col, len(row_lower)
+    lp.col_cost_, lp.col_lower_, lp.col_upper_ = col_cost, col_lower, col_upper
+    lp.row_lower_, lp.row_upper_ = row_lower, row_upper
+    lp.sense_ = sentido
+    lp.integrality_ = [highspy.HighsVarType(int(v)) for v in integrality]
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+    lp.a_matrix_.start_ = inicio_linha
+    lp.a_matrix_.index_ = colunas[ordem]
+    lp.a_matrix_.value_ = valores[ordem]
+
+    h = highspy.Highs()
+    h.setOptionValue('output_flag', False)
+    h.setOptionValue('time_limit', float(tempo_limite))
+    h.setOptionValue('mip_rel_gap', float(gap_relativo))
+    h.passModel(lp)
+
+    # Partida a quente: solução gulosa completada com y, z e a coerentes
+    posicao = pd.Index(tabela.ids)
+    x0 = np.zeros(n)
+    if not df_guloso.empty:
+        x0[posicao.get_indexer(df_guloso['id'])] = 1
+    y0 = np.zeros(n)
+    y0[posicao.get_indexer(list(ids_gulosos))] = 1
+    y0 = np.maximum(y0, coberto_minimos)
+    inicial = np.zeros(num_col)
+    inicial[col_x:col_x + n], inicial[col_y:col_y + n] = x0, y0
+    if usar_cobertura_ajustada:
+        coberto_log = np.bincount(lados, weights=ipe_lados * y0[pos_lados], minlength=m)
+        z0 = (total_log > 0) & (coberto_log >= LIMIAR_LOGRADOURO * total_log)
+        inicial[col_z:col_z + m] = z0
+        inicial[col_a:col_a + m] = np.where(z0, total_log, np.minimum(coberto_log, total_log))
+    solucao_inicial = highspy.HighsSolution()
+    solucao_inicial.col_value = inicial.tolist()
+    h.setSolution(solucao_inicial)
+
+    inicio_milp = time.perf_counter()
+    h.run()
+    info['segundos_milp'] = time.perf_counter() - inicio_milp
+    info['status'] = h.modelStatusToString(h.getModelStatus())
+    info['variaveis'], info['restricoes'] = num_col, len(row_lower)
+
+    solucao = h.getSolution()
+    if not solucao.value_valid:
+        return guloso, info
+
+    valores_col = np.asarray(solucao.col_value)
+    selecionados = np.flatnonzero(valores_col[col_x:col_x + n] > 0.5)
+    coberto = coberto_minimos.copy()
+    escolhido = np.zeros(n, dtype=bool)
+    escolhido[selecionados] = True
+    coberto[cob[escolhido[cam]]] = True
+
+    if usar_cobertura_ajustada:
+        cobertura = tabela.cobertura_ajustada(coberto, LIMIAR_LOGRADOURO)
+    else:
+        cobertura = float(tabela.ipe[coberto].sum() / tabela.ipe.sum())
+    limitante = float(h.getInfo().mip_dual_bound)
+
+    # Mantém a solução gulosa se o solver não a superou no tempo limite
+    melhorou = (cobertura > cobertura_gulosa + 1e-12 if com_orcamento
+                else len(selecionados) < len(df_guloso) and cobertura >= cobertura_frac)
+    final_cobertura = cobertura if melhorou else info['cobertura']
+    final_pontos = len(selecionados) if melhorou else info['pontos']
+    # Gap: quanto a solução pode estar abaixo do ótimo (cobertura) ou acima dele (pontos)
+    if com_orcamento:
+        limitante = min(limitante, 1.0)
+        info['limite_superior'] = limitante
+        info['gap'] = (limitante - final_cobertura) / limitante if limitante > 0 else 0.0
+    else:
+        limitante = float(np.ceil(limitante - 1e-6))
+        info['limite_inferior'] = limitante
+        info['gap'] = (final_pontos - limitante) / final_pontos if final_pontos > 0 else 0.0
+    info['gap'] = max(info['gap'], 0.0)
+    if not melhorou:
+        return guloso, info
+
+    info['cobertura'], info['pontos'] = cobertura, len(selecionados)
+    df_result = df.iloc[selecionados].reset_index(drop=True)
+    df_result['cameras'] = [calcular_cameras_por_ponto(minimos_pontos + t) for t in range(len(selecionados))]
+    df_result['cobertura_acum'] = df_result['ipe_cruz'].cumsum() / df['ipe_cruz'].sum()
+    total_cameras = minimos_cameras + int(df_result['cameras'].sum())
+
+    alvo_atingido = cobertura >= cobertura_frac * 0.99
+    motivo_limite = None
+    if not alvo_atingido:
+        motivo_limite = 'cameras' if max_cameras is not None else 'quantidade' if max_cruzamentos is not None else 'restricoes'
+    ids_cobertos = set(tabela.ids[coberto].tolist())
+    return (df_result, cobertura, alvo_atingido, motivo_limite, ids_cobertos, df_minimos, total_cameras), info
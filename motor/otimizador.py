@@ -0,0 +1,419 @@
+"""
+Otimizador de posicionamento de câmeras: seleção gulosa por IPE com
+restrições de distância mínima, pontos mínimos obrigatórios e cobertura
+ajustada pela regra de 15% por logradouro.
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from motor.cobertura import MatrizCobertura
+from motor.geo import IndiceEspacial, haversine_metros
+from motor.rede import DistanciasRede
+from motor.tabela_cruzamentos import TabelaCruzamentos
+
+# Critérios de seleção do otimizador
+MODO_IPE = 'ipe'                        # percorre os cruzamentos em ordem de ipe_cruz
+MODO_GANHO_MARGINAL = 'ganho_marginal'  # maior ganho de cobertura ajustada a cada passo (CELF)
+MODOS_OTIMIZADOR = (MODO_IPE, MODO_GANHO_MARGINAL)
+
+
+class AcumuladorCoberturaAjustada:
+    """
+    Mantém a cobertura ajustada (regra de 15%) de forma incremental.
+
+    Cada cruzamento coberto atualiza apenas os seus dois logradouros, em vez de
+    recalcular o IPE coberto de todos os logradouros a cada iteração. Os
+    logradouros são códigos densos `0..m-1` (ver `TabelaCruzamentos`) e
+    `ipe_total_por_log[k]` é o IPE total do logradouro `k`.
+    """
+
+    def __init__(self, ipe_total_por_log, limiar: float = 0.15):
+        self.ipe_total_por_log = np.asarray(ipe_total_por_log, dtype=float).tolist()
+        self.ipe_total_geral = sum(self.ipe_total_por_log)
+        self.limiar = limiar
+        self.ipe_coberto_por_log = [0.0] * len(self.ipe_total_por_log)
+        self.ipe_ajustado_total = 0.0
+
+    def _contribuicao(self, cod_log: int, ipe_coberto: float) -> float:
+        ipe_total_log = self.ipe_total_por_log[cod_log]
+        if ipe_total_log <= 0:
+            return 0
+        if ipe_coberto / ipe_total_log >= self.limiar:
+            # Logradouro com ≥15% → conta como 100%
+            return ipe_total_log
+        # Logradouro com <15% → mantém cobertura atual
+        return ipe_coberto
+
+    def adicionar(self, ipe: float, cod_log1, cod_log2):
+        """Registra um novo cruzamento coberto e atualiza o total ajustado"""
+        for cod_log in (cod_log1, cod_log2):
+            anterior = self.ipe_coberto_por_log[cod_log]
+            atual = anterior + ipe
+            self.ipe_coberto_por_log[cod_log] = atual
+            self.ipe_ajustado_total += self._contribuicao(cod_log, atual) - self._contribuicao(cod_log, anterior)
+
+    def ganho(self, itens) -> float:
+        """Aumento do total ajustado se os cruzamentos `itens` ((ipe, cod_log1, cod_log2)) fossem cobertos"""
+        adicional = {}
+        for ipe, cod_log1, cod_log2 in itens:
+            for cod_log in (cod_log1, cod_log2):
+                adicional[cod_log] = adicional.get(cod_log, 0) + ipe
+        ganho = 0.0
+        for cod_log, ipe in adicional.items():
+            anterior = self.ipe_coberto_por_log[cod_log]
+            ganho += self._contribuicao(cod_log, anterior + ipe) - self._contribuicao(cod_log, anterior)
+        return ganho
+
+    def cobertura(self) -> float:
+        return self.ipe_ajustado_total / self.ipe_total_geral if self.ipe_total_geral > 0 else 0
+
+
+def calcular_cameras_por_ponto(indice_ponto: int) -> int:
+    """Câmeras do ponto pela posição: 50% dos pontos com 3, 30% com 2, 20% com 1"""
+    posicao_percent = (indice_ponto % 100)
+    if posicao_percent < 50:
+        return 3
+    elif posicao_percent < 80:
+        return 2
+    else:
+        return 1
+
+
+def filtrar_por_cobertura_e_distancia(df: pd.DataFrame, cobertura_frac: float, min_dist: float, 
+                                       max_cruzamentos: int = None, raio_cobertura: float = 50,
+                                       limite_cobertura_logradouro: float = None,
+                                       pontos_minimos: pd.DataFrame = None,
+                                       max_cameras: int = None,
+                                       logs: pd.DataFrame = None,  # ← ADICIONAR logs como parâmetro
+                                       trajetoria: list = None, modo: str = MODO_IPE,
+                                       matriz_cobertura: MatrizCobertura = None,
+                                       distancias_rede: DistanciasRede = None) -> tuple:
+    """
+    Seleção gulosa de cruzamentos.
+
+    `modo=MODO_IPE` percorre os cruzamentos em ordem de `ipe_cruz`, aceitando
+    ou descartando cada um. `modo=MODO_GANHO_MARGINAL` escolhe a cada passo o
+    cruzamento viável com maior ganho de cobertura ajustada, com avaliação
+    preguiçosa (CELF). As restrições de distância mínima, pontos mínimos e
+    limites são as mesmas nos dois modos.
+
+    Se `trajetoria` for uma lista, recebe `(total_cameras, cobertura, ids_novos)`
+    após os pontos mínimos (passo 0) e após cada ponto aceito.
+
+    `matriz_cobertura` (ver `motor.cobertura`) é reaproveitada quando foi
+    calculada para o mesmo `raio_cobertura` e os mesmos cruzamentos de `df`;
+    caso contrário a matriz é calculada na chamada.
+
+    Com `distancias_rede` (ver `motor.rede`), a distância mínima entre
+    câmeras em cruzamentos e o raio de cobertura são medidos pela rede de
+    logradouros; pontos mínimos, que não estão na rede, continuam bloqueando
+    pela distância em linha reta.
+    """
+    if modo not in MODOS_OTIMIZADOR:
+        raise ValueError(f"Modo de otimização desconhecido: {modo!r}")
+    
+    
+    df_pontos_minimos_usados = pd.DataFrame()
+    
+    if df.empty:
+        return pd.DataFrame(), 0.0, True, None, set(), df_pontos_minimos_usados, 0
+    
+    ipe_total = df['ipe_cruz'].sum()
+    if ipe_total <= 0:
+        return pd.DataFrame(), 0.0, True, None, set(), df_pontos_minimos_usados, 0
+    
+    # ===== Cruzamentos em arrays: posição i = linha i de df =====
+    tabela = TabelaCruzamentos(df)
+    lats, lons, ipes = tabela.lat, tabela.lon, tabela.ipe
+    logs1, logs2 = tabela.log1, tabela.log2
+    
+    # Cobertura entre cruzamentos (CSR); pré-calculada se corresponder a df, senão calculada aqui
+    if matriz_cobertura is not None and matriz_cobertura.compativel(tabela.ids, raio_cobertura, distancias_rede):
+        posicao_na_matriz = matriz_cobertura.posicoes(tabela.ids)
+    else:
+        matriz_cobertura = MatrizCobertura.construir(df, raio_cobertura, distancias_rede)
+        posicao_na_matriz = np.arange(len(df))
+    posicao_em_df = np.empty(len(df), dtype=np.int64)
+    posicao_em_df[posicao_na_matriz] = np.arange(len(df))
+    
+    # IPE total por logradouro (código denso); sem logs, a cobertura é a simples
+    usar_cobertura_ajustada = logs is not None and not logs.empty
+    ipe_por_logradouro = tabela.ipe_por_log.tolist()
+    cobertura_por_logradouro = [0.0] * tabela.qtd_logradouros
+    
+    coberto = np.zeros(len(df), dtype=bool)
+    tem_camera = np.zeros(len(df), dtype=bool)
+    indice_cameras = IndiceEspacial(min_dist)
+    
+    # Pela rede: cruzamentos a menos de min_dist de cada cruzamento (CSR nas posições de df)
+    usar_rede = distancias_rede is not None and min_dist > 0
+    if usar_rede:
+        ia, jb = distancias_rede.pares_mais_perto_que(min_dist, tabela.ids)
+        perto_indptr = np.zeros(len(df) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ia, minlength=len(df)), out=perto_indptr[1:])
+        perto_indices = jb
+    
+    def camera_muito_perto_global(lat, lon):
+        if min_dist <= 0:
+            return False
+        return indice_cameras.existe_mais_perto_que(lat, lon, min_dist)
+    
+    def camera_muito_perto_no_logradouro(i):
+        if min_dist <= 0:
+            return False
+        if usar_rede:
+            return bool(tem_camera[perto_indices[perto_indptr[i]:perto_indptr[i + 1]]].any())
+        for log in (logs1[i], logs2[i]):
+            cameras = tabela.cruzamentos_do_logradouro(log)
+            cameras = cameras[tem_camera[cameras]]
+            if cameras.size and (haversine_metros(lats[i], lons[i], lats[cameras], lons[cameras]) < min_dist).any():
+                return True
+        return False
+    
+    def registrar_camera_global(lat, lon):
+        indice_cameras.inserir(None, lat, lon)
+    
+    def cruzamentos_cobertos(i):
+        """Posições cobertas por uma câmera no cruzamento i (inclui o próprio i), ordenadas"""
+        return np.sort(posicao_em_df[matriz_cobertura.cobertos(posicao_na_matriz[i])])
+    
+    def violaria_limite_logradouro(i, novos_cobertos):
+        if limite_cobertura_logradouro is None:
+            return False
+        
+        log1, log2 = int(logs1[i]), int(logs2[i])
+        ipe_adicional = {log1: 0, log2: 0}
+        ipe_adicional[log1] += ipes[i]
+        ipe_adicional[log2] += ipes[i]
+        
+        outros = novos_cobertos[novos_cobertos != i]
+        for cob_ipe, cob_log1, cob_log2 in zip(ipes[outros].tolist(), logs1[outros].tolist(), logs2[outros].tolist()):
+            if cob_log1 in ipe_adicional:
+                ipe_adicional[cob_log1] += cob_ipe
+            if cob_log2 in ipe_adicional:
+                ipe_adicional[cob_log2] += cob_ipe
+        
+        for log in (log1, log2):
+            ipe_total_log = ipe_por_logradouro[log]
+            if ipe_total_log <= 0:
+                continue
+            
+            ipe_novo = cobertura_por_logradouro[log] + ipe_adicional[log]
+            if ipe_novo / ipe_total_log > limite_cobertura_logradouro:
+                return True
+        
+        return False
+    
+    def atualizar_cobertura_logradouros(i, novos_cobertos):
+        if limite_cobertura_logradouro is None:
+            return
+        
+        cobertura_por_logradouro[logs1[i]] += ipes[i]
+        cobertura_por_logradouro[logs2[i]] += ipes[i]
+        outros = novos_cobertos[novos_cobertos != i]
+        for cob_ipe, cob_log1, cob_log2 in zip(ipes[outros].tolist(), logs1[outros].tolist(), logs2[outros].tolist()):
+            cobertura_por_logradouro[cob_log1] += cob_ipe
+            cobertura_por_logradouro[cob_log2] += cob_ipe
+    
+    # ===== CORRIGIDO: Função com regra de 15% =====
+    acumulador = AcumuladorCoberturaAjustada(tabela.ipe_por_log) if usar_cobertura_ajustada else None
+    
+    def calcular_cobertura_ajustada_atual():
+        if not usar_cobertura_ajustada:
+            # Fallback: cobertura simples
+            return ipe_coberto / ipe_total
+        return acumulador.cobertura()
+    
+    def registrar_cobertos(posicoes):
+        """Marca como cobertos os cruzamentos de `posicoes` ainda não cobertos; devolve os novos"""
+        nonlocal ipe_coberto
+        novos = posicoes[~coberto[posicoes]]
+        coberto[novos] = True
+        for ipe, log1, log2 in zip(ipes[novos].tolist(), logs1[novos].tolist(), logs2[novos].tolist()):
+            ipe_coberto += ipe
+            if acumulador is not None:
+                acumulador.adicionar(ipe, log1, log2)
+        return novos
+    # ===== FIM CORRIGIDO =====
+    
+    selecionados = []
+    cameras_selecionados = []
+    ipe_coberto = 0.0
+    motivo_limite = None
+    total_cameras = 0
+    total_pontos = 0
+    pontos_minimos_usados = []
+    
+    if pontos_minimos is not None and not pontos_minimos.empty:
+        inicio_minimo, cobertos_minimo = matriz_cobertura.cobertos_por_pontos(
+            pontos_minimos['lat'].to_numpy(dtype=float), pontos_minimos['lon'].to_numpy(dtype=float)
+        )
+        
+        for k, ponto in enumerate(pontos_minimos.to_dict('records')):
+            cameras_deste_ponto = int(ponto.get('cameras', 1))
+            
+            if max_cameras is not None and (total_cameras + cameras_deste_ponto) > max_cameras:
+                motivo_limite = 'cameras'
+                break
+            
+            lat, lon = ponto['lat'], ponto['lon']
+            
+            registrar_camera_global(lat, lon)
+            total_cameras += cameras_deste_ponto
+            total_pontos += 1
+            
+            # ===== NOVO: PRESERVAR FLAG is_red =====
+            is_red = ponto.get('is_red', False)
+            # ===== FIM NOVO =====
+            
+            pontos_minimos_usados.append({
+                'id_minimo': ponto.get('id_minimo', len(pontos_minimos_usados) + 1),
+                'tipo': ponto.get('tipo', 'PONTO_MINIMO'),
+                'logradouro': ponto.get('logradouro', ''),
+                'lat': lat,
+                'lon': lon,
+                'prioridade': ponto.get('prioridade', 5),
+                'cameras': cameras_deste_ponto,
+                'is_ponto_minimo': True,
+                'is_red': is_red  # ← ADICIONAR ESTA LINHA
+            })
+            
+            no_raio = cobertos_minimo[inicio_minimo[k]:inicio_minimo[k + 1]]
+            registrar_cobertos(np.sort(posicao_em_df[no_raio]))
+        
+        df_pontos_minimos_usados = pd.DataFrame(pontos_minimos_usados) if pontos_minimos_usados else pd.DataFrame()
+    
+    def ids_de(posicoes):
+        return set(tabela.ids[posicoes].tolist())
+    
+    if trajetoria is not None:
+        trajetoria.append((total_cameras, calcular_cobertura_ajustada_atual(), ids_de(coberto)))
+    
+    def aceitar(i, cameras_deste_ponto, novos_cobertos):
+        nonlocal total_cameras, total_pontos
+        selecionados.append(i)
+        cameras_selecionados.append(cameras_deste_ponto)
+        
+        if not usar_rede:
+            registrar_camera_global(lats[i], lons[i])
+        tem_camera[i] = True
+        atualizar_cobertura_logradouros(i, novos_cobertos)
+        total_cameras += cameras_deste_ponto
+        total_pontos += 1
+        
+        novos = registrar_cobertos(novos_cobertos)
+        
+        if trajetoria is not None:
+            trajetoria.append((total_cameras, calcular_cobertura_ajustada_atual(), ids_de(novos)))
+    
+    def selecionar_por_ganho_marginal():
+        """
+        Guloso por ganho marginal com fila de prioridade preguiçosa (CELF).
+        
+        O ganho de um cruzamento só diminui quando outros são cobertos (exceto
+        quando um logradouro cruza os 15%, caso em que a avaliação antiga é uma
+        estimativa), então o topo da fila só é reavaliado se estiver
+        desatualizado. Como as câmeras por ponto dependem só da posição na
+        seleção, o maior ganho por câmera é o maior ganho. Empates ficam com o
+        maior IPE.
+        """
+        def viavel(i):
+            return not (camera_muito_perto_global(lats[i], lons[i]) or camera_muito_perto_no_logradouro(i))
+        
+        def novos_cobertos(i):
+            vizinhos = cruzamentos_cobertos(i)
+            return vizinhos[~coberto[vizinhos]]
+        
+        def ganho(novos):
+            if acumulador is None:
+                return sum(ipes[novos].tolist())
+            return acumulador.ganho(zip(ipes[novos].tolist(), logs1[novos].tolist(), logs2[novos].tolist()))
+        
+        fila = [(-ganho(novos_cobertos(i)), i, 0) for i in range(len(df)) if viavel(i)]
+        heapq.heapify(fila)
+        
+        while fila:
+            if max_cruzamentos is not None and len(selecionados) >= max_cruzamentos:
+                return 'quantidade'
+            
+            if max_cruzamentos is None and max_cameras is None and calcular_cobertura_ajustada_atual() >= cobertura_frac:
+                return None
+            
+            ganho_negativo, i, passo_avaliado = heapq.heappop(fila)
+            if not viavel(i):
+                continue  # Restrições só ficam mais rígidas: descarta de vez
+            
+            novos = novos_cobertos(i)
+            if passo_avaliado != len(selecionados):
+                heapq.heappush(fila, (-ganho(novos), i, len(selecionados)))
+                continue
+            
+            if -ganho_negativo <= 0:
+                return None  # Nenhum cruzamento restante aumenta a cobertura
+            
+            if violaria_limite_logradouro(i, novos):
+                continue
+            
+            cameras_deste_ponto = calcular_cameras_por_ponto(total_pontos)
+            if max_cameras is not None and (total_cameras + cameras_deste_ponto) > max_cameras:
+                return 'cameras'
+            
+            aceitar(i, cameras_deste_ponto, novos)
+        return None
+    
+    if modo == MODO_GANHO_MARGINAL:
+        motivo_limite = selecionar_por_ganho_marginal() or motivo_limite
+    else:
+        for i in range(len(df)):
+            cameras_deste_ponto = calcular_cameras_por_ponto(total_pontos)
+        
+            if max_cameras is not None and (total_cameras + cameras_deste_ponto) > max_cameras:
+                motivo_limite = 'cameras'
+                break
+        
+            if max_cruzamentos is not None and len(selecionados) >= max_cruzamentos:
+                motivo_limite = 'quantidade'
+                break
+        
+            # Usar cobertura ajustada (regra de 15%)
+            cobertura_atual = calcular_cobertura_ajustada_atual()
+            if max_cruzamentos is None and max_cameras is None and cobertura_atual >= cobertura_frac:
+                break
+        
+            if camera_muito_perto_global(lats[i], lons[i]):
+                continue
+        
+            if camera_muito_perto_no_logradouro(i):
+                continue
+        
+            # Inclui o próprio cruzamento (está no próprio raio e compartilha os logradouros)
+            vizinhos = cruzamentos_cobertos(i)
+            novos_cobertos = vizinhos[~coberto[vizinhos]]
+        
+            if violaria_limite_logradouro(i, novos_cobertos):
+                continue
+        
+            aceitar(i, cameras_deste_ponto, novos_cobertos)
+    
+    if not selecionados and df_pontos_minimos_usados.empty:
+        return pd.DataFrame(), 0.0, False, None, set(), df_pontos_minimos_usados, 0
+    
+    df_result = pd.DataFrame()
+    if selecionados:
+        df_result = df.iloc[selecionados].reset_index(drop=True)
+        df_result['cameras'] = cameras_selecionados
+    
+    # Calcular cobertura real ajustada (regra de 15%)
+    cobertura_real = calcular_cobertura_ajustada_atual()
+    
+    if not df_result.empty:
+        df_result['cobertura_acum'] = df_result['ipe_cruz'].cumsum() / ipe_total
+    
+    alvo_atingido = cobertura_real >= cobertura_frac * 0.99
+    if not alvo_atingido and motivo_limite is None:
+        motivo_limite = 'restricoes'
+    
+    return df_result, cobertura_real, alvo_atingido, motivo_limite, ids_de(coberto), df_pontos_minimos_usados, total_cameras
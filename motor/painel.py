@@ -0,0 +1,155 @@
+"""
+Métricas do painel (equipamentos, alagamentos, sinistros, CVP e vias
+prioritárias) calculadas uma vez por resultado do otimizador.
+
+A coluna de estatísticas e os cards abaixo do mapa mostram os mesmos números;
+`calcular_metricas_painel` junta os pontos com câmera, filtra os
+equipamentos e consulta o índice de logradouros uma única vez e devolve um
+`MetricasPainel` somente leitura. `impressao_resultado` identifica o
+resultado (pontos e cruzamentos cobertos) para memorizar o objeto entre
+reruns.
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from motor.dados import DadosReferencia
+from motor.metricas import verificar_alagamentos_por_raio, verificar_equipamentos_proximos
+
+EIXOS_EQUIPAMENTOS = ('LCT', 'SEG')
+EIXOS_COMERCIAL = ('COM',)
+RAIO_ALVO_PADRAO = 100
+
+
+def _percentual(parte: float, total: float) -> float:
+    return (parte / total * 100) if total > 0 else 0
+
+
+def pontos_com_camera(selecionados: pd.DataFrame, pontos_minimos_usados: pd.DataFrame = None) -> pd.DataFrame:
+    """Coordenadas (lat, lon) dos pontos otimizados seguidos dos pontos mínimos usados"""
+    partes = [df[['lat', 'lon']] for df in (selecionados, pontos_minimos_usados)
+              if df is not None and not df.empty]
+    if not partes:
+        return pd.DataFrame(columns=['lat', 'lon'])
+    return pd.concat(partes, ignore_index=True)
+
+
+def _hash_valores(valores) -> bytes:
+    """Bytes que identificam o conjunto `valores`, independentemente da ordem"""
+    hashes = pd.util.hash_pandas_object(pd.Series(list(valores), dtype=object), index=False).to_numpy()
+    return np.sort(hashes).tobytes()
+
+
+def impressao_resultado(selecionados: pd.DataFrame, pontos_minimos_usados: pd.DataFrame, ids_cobertos) -> str:
+    """Hash dos pontos com câmera e dos cruzamentos cobertos de um resultado do otimizador"""
+    h = hashlib.sha256()
+    h.update(_hash_valores(selecionados['id'] if 'id' in selecionados.columns else []))
+    if pontos_minimos_usados is not None and not pontos_minimos_usados.empty:
+        h.update(pontos_minimos_usados[['lat', 'lon']].to_numpy(dtype=float).tobytes())
+    h.update(b'|')
+    h.update(_hash_valores(ids_cobertos))
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class MetricasPainel:
+    """
+    Cobertura dos alvos estratégicos por um resultado do otimizador.
+
+    `equipamentos_lct_seg` e `equipamentos_com` são pares (tipo, quantidade)
+    dos equipamentos próximos; `alagamentos` são os nomes dos pontos de
+    alagamento cobertos (com repetição). `sinistros`, `cvp` e
+    `vias_prioritarias` são as tuplas de `IndiceLogradouros.verificar`.
+    `segundos` é o tempo do cálculo.
+    """
+    equipamentos_lct_seg: list
+    total_equipamentos_lct_seg: int
+    equipamentos_com: list
+    total_equipamentos_com: int
+    alagamentos: list
+    total_alagamentos: int
+    sinistros: tuple
+    cvp: tuple
+    vias_prioritarias: tuple
+    segundos: float = 0.0
+
+    @property
+    def qtd_equipamentos_lct_seg(self) -> int:
+        return sum(qtd for _, qtd in self.equipamentos_lct_seg)
+
+    @property
+    def qtd_equipamentos_com(self) -> int:
+        return sum(qtd for _, qtd in self.equipamentos_com)
+
+    @property
+    def pct_equipamentos_lct_seg(self) -> float:
+        return _percentual(self.qtd_equipamentos_lct_seg, self.total_equipamentos_lct_seg)
+
+    @property
+    def pct_equipamentos_com(self) -> float:
+        return _percentual(self.qtd_equipamentos_com, self.total_equipamentos_com)
+
+    @property
+    def pct_alagamentos(self) -> float:
+        return _percentual(len(self.alagamentos), self.total_alagamentos)
+
+    @property
+    def pct_sinistros(self) -> float:
+        return _percentual(self.sinistros[0], self.sinistros[1])
+
+    @property
+    def pct_cvp(self) -> float:
+        return _percentual(self.cvp[0], self.cvp[1])
+
+    @property
+    def pct_vias_prioritarias(self) -> float:
+        return _percentual(self.vias_prioritarias[0], self.vias_prioritarias[1])
+
+
+def calcular_metricas_painel(dados: DadosReferencia, selecionados: pd.DataFrame,
+                             pontos_minimos_usados: pd.DataFrame, ids_cobertos,
+                             raio_cobertura: float = 50, nota_min_equip: int = 4,
+                             raio_alvo: float = RAIO_ALVO_PADRAO) -> MetricasPainel:
+    """
+    Métricas do painel para os pontos com câmera (`selecionados` e
+    `pontos_minimos_usados`) e os cruzamentos `ids_cobertos`.
+
+    A ordem de `ids_cobertos` define a ordem dos logradouros nas listas de
+    sinistros e CVP (o app passa os cobertos na ordem do IPE).
+    """
+    inicio = time.perf_counter()
+    pontos = pontos_com_camera(selecionados, pontos_minimos_usados)
+
+    equipamentos = dados.equipamentos
+    total_lct_seg = total_com = 0
+    if not equipamentos.empty:
+        eixo = equipamentos['eixo'].astype(str).str.strip().str.upper()
+        acima_da_nota = equipamentos['peso'] >= nota_min_equip
+        total_lct_seg = int((eixo.isin(EIXOS_EQUIPAMENTOS) & acima_da_nota).sum())
+        total_com = int((eixo.isin(EIXOS_COMERCIAL) & acima_da_nota).sum())
+
+    alvos = {'sinistros': (0, 0, []), 'cvp': (0, 0, []), 'vias_prioritarias': (0, 0, [])}
+    ids_cobertos = list(ids_cobertos)
+    if ids_cobertos and dados.indice_logradouros is not None:
+        alvos = dados.indice_logradouros.verificar(ids_cobertos)
+
+    return MetricasPainel(
+        equipamentos_lct_seg=verificar_equipamentos_proximos(
+            pontos, equipamentos, raio_cobertura, nota_min_equip, list(EIXOS_EQUIPAMENTOS), raio_alvo
+        ),
+        total_equipamentos_lct_seg=total_lct_seg,
+        equipamentos_com=verificar_equipamentos_proximos(
+            pontos, equipamentos, raio_cobertura, nota_min_equip, list(EIXOS_COMERCIAL), raio_alvo
+        ),
+        total_equipamentos_com=total_com,
+        alagamentos=verificar_alagamentos_por_raio(pontos, dados.alagamentos, raio_cobertura, raio_alvo),
+        total_alagamentos=len(dados.alagamentos),
+        sinistros=alvos['sinistros'],
+        cvp=alvos['cvp'],
+        vias_prioritarias=alvos['vias_prioritarias'],
+        segundos=time.perf_counter() - inicio,
+    )
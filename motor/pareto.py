@@ -0,0 +1,197 @@
+"""
+Fronteira de Pareto entre os quatro eixos do IPE para um orçamento fixo.
+
+Cada combinação de pesos leva a um plano diferente; avaliados com a mesma
+referência (os pesos atuais), os planos trocam cobertura de um eixo por
+cobertura de outro. A exploração parte de uma grade no simplex de pesos,
+executa as seleções em lote (IPE em um único produto matricial, seleções em
+um pool de processos), descarta os planos dominados e refina a grade, com
+passo pela metade, apenas em torno dos pesos que geraram planos da
+fronteira. Seleções já calculadas são reaproveitadas entre rodadas e entre
+execuções por meio de `cache_selecoes`.
+"""
+
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from motor.cobertura import MatrizCobertura
+from motor.curva import cobertura_eixos_por_passo
+from motor.ipe import EIXOS, ModeloIPE
+from motor.otimizador import MODO_IPE
+from motor.rede import DistanciasRede
+from motor.sensibilidade import selecionar_em_lote
+
+COLUNAS_PESOS = [f'w_{eixo}' for eixo in EIXOS]
+
+
+def grade_simplex(passo: float) -> np.ndarray:
+    """Vetores de pesos (K×4) com componentes múltiplos de `passo` e soma 1"""
+    divisoes = int(round(1 / passo))
+    pontos = [c for c in itertools.product(range(divisoes + 1), repeat=len(EIXOS) - 1) if sum(c) <= divisoes]
+    return np.array([list(c) + [divisoes - sum(c)] for c in pontos], dtype=float) / divisoes
+
+
+def vizinhos_na_grade(pesos: np.ndarray, passo: float) -> np.ndarray:
+    """Vetores obtidos movendo `passo` de um eixo para outro, a partir de cada linha de `pesos`"""
+    movimentos = []
+    for origem, destino in itertools.permutations(range(len(EIXOS)), 2):
+        delta = np.zeros(len(EIXOS))
+        delta[origem], delta[destino] = -passo, passo
+        movimentos.append(delta)
+    vizinhos = (pesos[:, None, :] + np.array(movimentos)[None]).reshape(-1, len(EIXOS))
+    return vizinhos[(vizinhos >= -1e-12).all(axis=1)].clip(0, 1)
+
+
+def nao_dominados(valores: np.ndarray) -> np.ndarray:
+    """
+    Máscara das linhas não dominadas (maximização em todas as colunas).
+
+    Entre linhas idênticas, só a primeira é mantida.
+    """
+    k = len(valores)
+    manter = np.ones(k, dtype=bool)
+    for i in range(k):
+        if not manter[i]:
+            continue
+        outros = valores[manter]
+        # Alguém ≥ em tudo e > em algo domina i
+        if ((outros >= valores[i]).all(axis=1) & (outros > valores[i]).any(axis=1)).any():
+            manter[i] = False
+            continue
+        # i domina (ou repete) as linhas seguintes ainda mantidas
+        posteriores = np.flatnonzero(manter)
+        posteriores = posteriores[posteriores > i]
+        manter[posteriores[(valores[posteriores] <= valores[i]).all(axis=1)]] = False
+    return manter
+
+
+def _chave_pesos(pesos: np.ndarray) -> tuple:
+    return tuple(np.round(pesos, 9).tolist())
+
+
+class FronteiraPareto:
+    """
+    Planos avaliados e fronteira.
+
+    `tabela` tem uma linha por combinação de pesos avaliada: pesos
+    (`w_seg`...`w_mob`), cobertura ajustada total e por eixo (%) com os
+    pesos de referência, câmeras, pontos, rodada em que foi avaliada e se
+    está na fronteira (`na_fronteira`). `selecionados[k]` são as posições
+    (ordem de `modelo_ipe.cruzamentos`) do plano da linha `k`.
+    """
+
+    def __init__(self, tabela: pd.DataFrame, selecionados: list, ids: np.ndarray, info: dict):
+        self.tabela = tabela
+        self.selecionados = selecionados
+        self.ids = ids
+        self.info = info
+
+    def fronteira(self) -> pd.DataFrame:
+        """Planos não dominados, do maior para o menor total"""
+        return self.tabela[self.tabela['na_fronteira']].sort_values('total', ascending=False)
+
+    def ids_selecionados(self, linha: int) -> list:
+        """Ids dos cruzamentos do plano da linha `linha` de `tabela`"""
+        return self.ids[self.selecionados[linha]].tolist()
+
+
+def explorar_fronteira(modelo_ipe: ModeloIPE, pesos_referencia, max_cameras: int, min_dist: float,
+                       raio_cobertura: float = 50,
+                       pontos_minimos: pd.DataFrame = None,
+                       logs: pd.DataFrame = None, modo: str = MODO_IPE,
+                       matriz_cobertura: MatrizCobertura = None,
+                       distancias_rede: DistanciasRede = None,
+                       passo: float = 0.25, rodadas: int = 2, max_por_rodada: int = 48,
+                       processos: int = None, cache_selecoes: dict = None) -> FronteiraPareto:
+    """
+    Fronteira de Pareto dos planos com `max_cameras` câmeras entre as
+    coberturas ajustadas dos quatro eixos, medidas com `pesos_referencia`.
+
+    A rodada 0 avalia `grade_simplex(passo)`; cada rodada seguinte avalia os
+    vizinhos (passo pela metade) dos pesos da fronteira atual, no máximo
+    `max_por_rodada`, a partir dos planos de maior cobertura total. `cache_selecoes`
+    (dict) guarda as seleções por vetor de pesos e deve ser reutilizado só
+    com os mesmos parâmetros de seleção (orçamento, distância, pontos
+    mínimos, modo, raio e medida de distância).
+    """
+    if modelo_ipe is None or modelo_ipe.vazio:
+        raise ValueError("Modelo de IPE vazio: não há cruzamentos para analisar")
+
+    inicio = time.perf_counter()
+    cache_selecoes = {} if cache_selecoes is None else cache_selecoes
+    referencia = np.asarray(pesos_referencia, dtype=float)
+    df_referencia = modelo_ipe.calcular(*(referencia / (referencia.sum() or 1)))
+    posicao_referencia = pd.Index(df_referencia['id']).get_indexer(modelo_ipe.cruzamentos['id'])
+    ids = modelo_ipe.cruzamentos['id'].to_numpy()
+
+    pesos_avaliados, planos, rodada_de = [], [], []
+    vistos = set()
+    info = {'selecoes': 0, 'reaproveitadas': 0, 'rodadas': 0, 'segundos_selecao': 0.0, 'processos': 1}
+    candidatos = grade_simplex(passo)
+    valores = np.zeros((0, len(EIXOS)))
+    totais = []
+    fronteira = np.zeros(0, dtype=bool)
+
+    for rodada in range(rodadas + 1):
+        novos = []
+        for pesos in candidatos:
+            chave = _chave_pesos(pesos)
+            if chave not in vistos:
+                vistos.add(chave)
+                novos.append(pesos)
+                if rodada > 0 and len(novos) >= max_por_rodada:
+                    break
+        if not novos:
+            break
+        info['rodadas'] = rodada + 1
+
+        faltantes = [p for p in novos if _chave_pesos(p) not in cache_selecoes]
+        info['reaproveitadas'] += len(novos) - len(faltantes)
+        if faltantes:
+            calculados, _, _, segundos, info['processos'] = selecionar_em_lote(
+                modelo_ipe, np.array(faltantes), 1.0, min_dist, None, raio_cobertura, None, pontos_minimos,
+                max_cameras, logs, modo, matriz_cobertura, distancias_rede, processos
+            )
+            info['selecoes'] += len(faltantes)
+            info['segundos_selecao'] += segundos
+            for pesos, plano in zip(faltantes, calculados):
+                cache_selecoes[_chave_pesos(pesos)] = plano
+
+        for pesos in novos:
+            pesos_avaliados.append(pesos)
+            planos.append(cache_selecoes[_chave_pesos(pesos)])
+            rodada_de.append(rodada)
+
+        # Cobertura por eixo de cada plano novo, com os pesos de referência
+        linhas = []
+        for _, cobertos, _, _ in planos[len(valores):]:
+            passo_cruzamento = np.ones(len(df_referencia), dtype=np.int64)
+            passo_cruzamento[posicao_referencia[cobertos]] = 0
+            percentual, _, _ = cobertura_eixos_por_passo(df_referencia, passo_cruzamento, 1)
+            totais.append(float(percentual[0, 0]))
+            linhas.append(percentual[0, 1:])
+        valores = np.vstack([valores] + linhas)
+
+        fronteira = nao_dominados(valores)
+        if rodada < rodadas:
+            passo /= 2
+            # Só os pesos da fronteira geram candidatos, começando pelos de maior total
+            origens = np.flatnonzero(fronteira)
+            origens = origens[np.argsort(-np.array(totais)[origens], kind='stable')]
+            candidatos = vizinhos_na_grade(np.array(pesos_avaliados)[origens], passo)
+
+    tabela = pd.DataFrame(np.array(pesos_avaliados), columns=COLUNAS_PESOS)
+    tabela['total'] = totais
+    for j, eixo in enumerate(EIXOS):
+        tabela[eixo] = valores[:, j]
+    tabela['cameras'] = [plano[3] for plano in planos]
+    tabela['pontos'] = [len(plano[0]) for plano in planos]
+    tabela['rodada'] = rodada_de
+    tabela['na_fronteira'] = fronteira
+    info['avaliados'] = len(tabela)
+    info['fronteira'] = int(fronteira.sum())
+    info['segundos'] = time.perf_counter() - inicio
+    return FronteiraPareto(tabela, [plano[0] for plano in planos], ids, info)
@@ -0,0 +1,295 @@
+"""
+Distância pela rede viária formada pelos logradouros.
+
+A regra de distância mínima vale para câmeras no mesmo logradouro, mas a
+distância de Haversine mede em linha reta, atravessando quadras. Os
+cruzamentos e seus `cod_log1`/`cod_log2` já descrevem o grafo das ruas: cada
+logradouro é uma sequência de cruzamentos, e dois cruzamentos consecutivos no
+mesmo logradouro são ligados por uma aresta com o comprimento do trecho
+(Haversine). Como a geometria das vias não está nos dados, a ordem dos
+cruzamentos ao longo de cada logradouro é a da projeção no eixo principal dos
+seus pontos.
+
+As menores distâncias até `alcance` metros (Dijkstra a partir de cada
+cruzamento, interrompido no alcance) são calculadas uma vez por base e
+gravadas junto ao cache Parquet em formato CSR; consultar a distância entre
+dois cruzamentos passa a ser uma busca binária em uma linha.
+"""
+
+import hashlib
+import heapq
+import math
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from motor.geo import haversine_metros, pares_mais_perto_que
+
+# Incrementar quando a construção do grafo mudar
+VERSAO_REDE = 1
+
+# Alcance das distâncias pré-calculadas (m): cobre o maior valor do slider de distância mínima
+ALCANCE_REDE_PADRAO = 500
+
+# Medidas de distância entre cruzamentos
+DISTANCIA_LINHA_RETA = 'linha_reta'
+DISTANCIA_REDE = 'rede'
+MEDIDAS_DISTANCIA = (DISTANCIA_LINHA_RETA, DISTANCIA_REDE)
+
+
+class GrafoLogradouros:
+    """
+    Grafo não direcionado dos cruzamentos (CSR).
+
+    Os vizinhos do nó `i` (cruzamento `ids[i]`) são
+    `vizinhos[indptr[i]:indptr[i + 1]]`, com os comprimentos em `pesos`.
+    """
+
+    def __init__(self, ids: np.ndarray, indptr: np.ndarray, vizinhos: np.ndarray, pesos: np.ndarray):
+        self.ids = ids
+        self.indptr = indptr
+        self.vizinhos = vizinhos
+        self.pesos = pesos
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def qtd_arestas(self) -> int:
+        return len(self.vizinhos) // 2
+
+    @classmethod
+    def construir(cls, cruzamentos: pd.DataFrame) -> 'GrafoLogradouros':
+        n = len(cruzamentos)
+        lats = cruzamentos['lat'].to_numpy(dtype=float)
+        lons = cruzamentos['lon'].to_numpy(dtype=float)
+
+        # Um lado (cruzamento, logradouro) por logradouro distinto do cruzamento
+        nos = np.repeat(np.arange(n), 2)
+        lados = np.column_stack([cruzamentos['cod_log1'].to_numpy(), cruzamentos['cod_log2'].to_numpy()]).ravel()
+        distintos = np.ones(2 * n, dtype=bool)
+        distintos[1::2] = lados[0::2] != lados[1::2]
+        nos = nos[distintos]
+        logs, _ = pd.factorize(lados[distintos])
+        m = int(logs.max()) + 1 if len(logs) else 0
+
+        # Coordenadas métricas locais e eixo principal de cada logradouro
+        cos_ref = math.cos(math.radians(float(np.mean(lats)))) if n else 1.0
+        x = np.radians(lons[nos]) * 6371000 * cos_ref
+        y = np.radians(lats[nos]) * 6371000
+        contagem = np.bincount(logs, minlength=m)
+        x = x - (np.bincount(logs, weights=x, minlength=m) / np.maximum(contagem, 1))[logs]
+        y = y - (np.bincount(logs, weights=y, minlength=m) / np.maximum(contagem, 1))[logs]
+        sxx = np.bincount(logs, weights=x * x, minlength=m)
+        syy = np.bincount(logs, weights=y * y, minlength=m)
+        sxy = np.bincount(logs, weights=x * y, minlength=m)
+        angulo = 0.5 * np.arctan2(2 * sxy, sxx - syy)
+        projecao = x * np.cos(angulo)[logs] + y * np.sin(angulo)[logs]
+
+        # Cruzamentos consecutivos ao longo de cada logradouro formam as arestas
+        ordem = np.lexsort((projecao, logs))
+        logs, nos = logs[ordem], nos[ordem]
+        consecutivos = logs[1:] == logs[:-1]
+        a, b = nos[:-1][consecutivos], nos[1:][consecutivos]
+        a, b = np.minimum(a, b), np.maximum(a, b)
+        pesos = haversine_metros(lats[a], lons[a], lats[b], lons[b])
+
+        # Trecho repetido (dois cruzamentos com os mesmos dois logradouros): fica o menor
+        origem = np.concatenate([a, b])
+        destino = np.concatenate([b, a])
+        pesos = np.concatenate([pesos, pesos])
+        manter = origem != destino
+        origem, destino, pesos = origem[manter], destino[manter], pesos[manter]
+        ordem = np.lexsort((pesos, destino, origem))
+        origem, destino, pesos = origem[ordem], destino[ordem], pesos[ordem]
+        primeiro = np.ones(len(origem), dtype=bool)
+        primeiro[1:] = (origem[1:] != origem[:-1]) | (destino[1:] != destino[:-1])
+        origem, destino, pesos = origem[primeiro], destino[primeiro], pesos[primeiro]
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origem, minlength=n), out=indptr[1:])
+        return cls(cruzamentos['id'].to_numpy(), indptr, destino.astype(np.int32), pesos)
+
+
+def _dijkstra_limitado(indptr: list, vizinhos: list, pesos: list, origem: int, alcance: float) -> dict:
+    """Menores distâncias de `origem` a todos os nós a até `alcance` metros"""
+    distancias = {origem: 0.0}
+    fila = [(0.0, origem)]
+    fechados = set()
+    while fila:
+        d, no = heapq.heappop(fila)
+        if no in fechados:
+            continue
+        fechados.add(no)
+        for k in range(indptr[no], indptr[no + 1]):
+            vizinho = vizinhos[k]
+            nova = d + pesos[k]
+            if nova <= alcance and nova < distancias.get(vizinho, math.inf):
+                distancias[vizinho] = nova
+                heapq.heappush(fila, (nova, vizinho))
+    return distancias
+
+
+class DistanciasRede:
+    """
+    Menores distâncias pela rede até `alcance` metros, em CSR.
+
+    A linha `i` (cruzamento `ids[i]`) lista, em ordem crescente de posição,
+    os cruzamentos `j` alcançáveis (incluindo o próprio `i`, a 0 m) e as
+    distâncias em `distancias`. Pares fora da lista distam mais que
+    `alcance` (ou não são conectados) e valem `inf` nas consultas.
+    """
+
+    def __init__(self, ids: np.ndarray, alcance: float, indptr: np.ndarray, indices: np.ndarray,
+                 distancias: np.ndarray, impressao: str, segundos: float = 0.0):
+        self.ids = ids
+        self.alcance = float(alcance)
+        self.indptr = indptr
+        self.indices = indices
+        self.distancias = distancias
+        self.impressao = impressao
+        self.segundos = segundos
+        self._posicao = pd.Index(ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def impressao_cruzamentos(cruzamentos: pd.DataFrame) -> str:
+        """Hash das colunas que definem o grafo (id, coordenadas e logradouros)"""
+        h = hashlib.sha256(f"rede-v{VERSAO_REDE}".encode('utf-8'))
+        for coluna in ('id', 'lat', 'lon', 'cod_log1', 'cod_log2'):
+            h.update(np.ascontiguousarray(cruzamentos[coluna].to_numpy(dtype=float)).tobytes())
+        return h.hexdigest()
+
+    @classmethod
+    def construir(cls, cruzamentos: pd.DataFrame, alcance: float = ALCANCE_REDE_PADRAO) -> 'DistanciasRede':
+        inicio = time.perf_counter()
+        grafo = GrafoLogradouros.construir(cruzamentos)
+        indptr_grafo, vizinhos, pesos = grafo.indptr.tolist(), grafo.vizinhos.tolist(), grafo.pesos.tolist()
+
+        linhas_indices, linhas_distancias = [], []
+        contagens = np.zeros(len(grafo), dtype=np.int64)
+        for origem in range(len(grafo)):
+            alcancados = _dijkstra_limitado(indptr_grafo, vizinhos, pesos, origem, alcance)
+            contagens[origem] = len(alcancados)
+            linhas_indices.append(np.fromiter(alcancados.keys(), dtype=np.int32, count=len(alcancados)))
+            linhas_distancias.append(np.fromiter(alcancados.values(), dtype=np.float64, count=len(alcancados)))
+
+        indptr = np.zeros(len(grafo) + 1, dtype=np.int64)
+        np.cumsum(contagens, out=indptr[1:])
+        indices = np.concatenate(linhas_indices) if linhas_indices else np.empty(0, dtype=np.int32)
+        distancias = np.concatenate(linhas_distancias) if linhas_distancias else np.empty(0)
+        # Colunas em ordem crescente dentro de cada linha (busca binária nas consultas)
+        ordem = np.lexsort((indices, np.repeat(np.arange(len(grafo)), contagens)))
+        return cls(grafo.ids, alcance, indptr, indices[ordem], distancias[ordem].astype(np.float32),
+                   cls.impressao_cruzamentos(cruzamentos), time.perf_counter() - inicio)
+
+    def posicoes(self, ids) -> np.ndarray:
+        """Linha de cada id (-1 se ausente)"""
+        return self._posicao.get_indexer(ids)
+
+    def alcancaveis(self, posicao: int) -> tuple:
+        """(posições, distâncias) alcançáveis a partir da linha `posicao`"""
+        fatia = slice(self.indptr[posicao], self.indptr[posicao + 1])
+        return self.indices[fatia], self.distancias[fatia]
+
+    def distancia(self, i: int, j: int) -> float:
+        """Distância pela rede entre as linhas `i` e `j` (`inf` além do alcance)"""
+        inicio, fim = self.indptr[i], self.indptr[i + 1]
+        k = inicio + np.searchsorted(self.indices[inicio:fim], j)
+        return float(self.distancias[k]) if k < fim and self.indices[k] == j else math.inf
+
+    def distancias_entre(self, i, j) -> np.ndarray:
+        """Distâncias pela rede entre os pares de linhas `(i[k], j[k])` (`inf` além do alcance)"""
+        i = np.asarray(i, dtype=np.int64)
+        j = np.asarray(j, dtype=np.int64)
+        resultado = np.full(len(i), np.inf)
+        if not len(i) or not len(self.indices):
+            return resultado
+        # Linha e coluna em uma só chave ordenada: uma busca binária para todos os pares
+        chaves = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.indptr)) * len(self) + self.indices
+        consulta = i * len(self) + j
+        k = np.minimum(np.searchsorted(chaves, consulta), len(chaves) - 1)
+        achou = chaves[k] == consulta
+        resultado[achou] = self.distancias[k[achou]]
+        return resultado
+
+    def pares_mais_perto_que(self, dist: float, ids=None, so_i_menor_j: bool = False) -> tuple:
+        """
+        Pares (i, j) a menos de `dist` metros pela rede (estrito), incluindo
+        `(i, i)`, como `motor.geo.pares_mais_perto_que`. Com `ids`, as
+        posições são as de `ids` (todos precisam estar na rede).
+        """
+        if dist > self.alcance:
+            raise ValueError(f"Distância {dist:g} m acima do alcance pré-calculado ({self.alcance:g} m)")
+        ia = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.indptr))
+        jb = self.indices.astype(np.int64)
+        manter = self.distancias < dist
+        ia, jb = ia[manter], jb[manter]
+        if ids is not None:
+            linhas = self.posicoes(ids)
+            nova_posicao = np.full(len(self), -1, dtype=np.int64)
+            nova_posicao[linhas] = np.arange(len(linhas))
+            ia, jb = nova_posicao[ia], nova_posicao[jb]
+            manter = (ia >= 0) & (jb >= 0)
+            ia, jb = ia[manter], jb[manter]
+        if so_i_menor_j:
+            manter = ia < jb
+            ia, jb = ia[manter], jb[manter]
+        ordem = np.lexsort((jb, ia))
+        return ia[ordem], jb[ordem]
+
+    def salvar(self, caminho: Path):
+        caminho = Path(caminho)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        tmp = caminho.with_name(caminho.name + '.tmp.npz')
+        np.savez(tmp, ids=self.ids, alcance=self.alcance, indptr=self.indptr, indices=self.indices,
+                 distancias=self.distancias, impressao=self.impressao, segundos=self.segundos)
+        os.replace(tmp, caminho)
+
+    @classmethod
+    def carregar(cls, caminho: Path) -> 'DistanciasRede':
+        with np.load(caminho, allow_pickle=False) as dados:
+            return cls(dados['ids'], float(dados['alcance']), dados['indptr'], dados['indices'],
+                       dados['distancias'], str(dados['impressao']), float(dados['segundos']))
+
+
+def obter_distancias_rede(cruzamentos: pd.DataFrame, alcance: float = ALCANCE_REDE_PADRAO,
+                          dir_cache: Path = None) -> DistanciasRede:
+    """
+    Distâncias pela rede até `alcance`, lidas de `dir_cache` se corresponderem
+    aos mesmos cruzamentos e cobrirem o alcance; senão são calculadas e gravadas.
+    """
+    impressao = DistanciasRede.impressao_cruzamentos(cruzamentos)
+    caminho = None
+    if dir_cache is not None:
+        caminho = Path(dir_cache) / f"rede-{float(alcance):g}m.npz"
+        try:
+            distancias = DistanciasRede.carregar(caminho)
+            if distancias.impressao == impressao and distancias.alcance >= float(alcance):
+                return distancias
+        except (OSError, ValueError, KeyError):
+            pass  # Ausente ou corrompida: recalcula
+
+    distancias = DistanciasRede.construir(cruzamentos, alcance)
+    if caminho is not None:
+        try:
+            distancias.salvar(caminho)
+        except OSError:
+            pass  # Sem permissão de escrita: segue só em memória
+    return distancias
+
+
+def pares_cruzamentos_mais_perto_que(ids, lats, lons, dist: float, distancias_rede: DistanciasRede = None,
+                                     so_i_menor_j: bool = False) -> tuple:
+    """
+    Pares (i, j) de cruzamentos a menos de `dist` metros, nas posições de
+    `ids`: pela rede se `distancias_rede` for dada, senão em linha reta.
+    """
+    if distancias_rede is not None:
+        return distancias_rede.pares_mais_perto_que(dist, ids, so_i_menor_j)
+    return pares_mais_perto_que(lats, lons, lats, lons, dist, so_i_menor_j=so_i_menor_j)
@@ -0,0 +1,243 @@
+"""
+Análise de sensibilidade aos pesos dos eixos do IPE.
+
+Amostra centenas de vetores de pesos em torno da combinação atual, calcula o
+IPE de todos eles em um único produto matricial (`ModeloIPE.ipe_em_lote`) e
+executa a seleção de cada amostra, em paralelo em um pool de processos. O
+resultado é um mapa de robustez: com que frequência cada cruzamento é
+selecionado e coberto entre as amostras, e como a cobertura varia.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from motor.cobertura import MatrizCobertura
+from motor.ipe import EIXOS, ModeloIPE, ordem_por_ipe
+from motor.otimizador import MODO_IPE, filtrar_por_cobertura_e_distancia
+from motor.rede import DistanciasRede
+from motor.tabela_cruzamentos import TabelaCruzamentos
+
+# Frequência de seleção a partir da qual um ponto é considerado estável
+FREQUENCIA_ESTAVEL = 0.9
+
+# Amostras por tarefa enviada ao pool
+AMOSTRAS_POR_TAREFA = 8
+
+# Contexto de cada processo do pool (preenchido por `_iniciar_processo`)
+_contexto = None
+
+
+def amostrar_pesos(pesos, quantidade: int, amplitude: float = 0.10, semente: int = None) -> np.ndarray:
+    """
+    Matriz `quantidade`×4 de pesos normalizados em torno de `pesos`.
+
+    A linha 0 é a combinação atual; as demais somam a cada peso (já
+    normalizado) um ruído uniforme em ±`amplitude`, cortam em zero e
+    renormalizam.
+    """
+    base = np.asarray(pesos, dtype=float)
+    base = base / (base.sum() or 1)
+    rng = np.random.default_rng(semente)
+    amostras = base + rng.uniform(-amplitude, amplitude, size=(quantidade, len(base)))
+    amostras[0] = base
+    np.clip(amostras, 0, None, out=amostras)
+    somas = amostras.sum(axis=1, keepdims=True)
+    amostras = np.where(somas > 0, amostras / np.where(somas > 0, somas, 1), base)
+    return amostras
+
+
+def _selecionar_amostras(contexto: dict, ipes: np.ndarray) -> list:
+    """Executa a seleção para cada coluna de `ipes`; devolve posições selecionadas e cobertas (ordem do modelo)"""
+    cruzamentos = contexto['cruzamentos']
+    indice_ids = pd.Index(cruzamentos['id'])
+    saida = []
+    for k in range(ipes.shape[1]):
+        ipe = ipes[:, k]
+        ordem = ordem_por_ipe(ipe)
+        df = cruzamentos.take(ordem).reset_index(drop=True)
+        df['ipe_cruz'] = ipe[ordem]
+        df_sel, cobertura, _, _, ids_cobertos, _, total_cameras = filtrar_por_cobertura_e_distancia(
+            df, contexto['cobertura_frac'], contexto['min_dist'], contexto['max_cruzamentos'],
+            contexto['raio_cobertura'], contexto['limite_cobertura_logradouro'], contexto['pontos_minimos'],
+            contexto['max_cameras'], contexto['logs'], modo=contexto['modo'],
+            matriz_cobertura=contexto['matriz_cobertura'], distancias_rede=contexto['distancias_rede']
+        )
+        selecionados = indice_ids.get_indexer(df_sel['id']) if not df_sel.empty else np.zeros(0, dtype=np.int64)
+        cobertos = indice_ids.get_indexer(list(ids_cobertos))
+        saida.append((selecionados.astype(np.int32), cobertos.astype(np.int32), float(cobertura), int(total_cameras)))
+    return saida
+
+
+def _iniciar_processo(contexto: dict):
+    """Recebe a base e os parâmetros da seleção uma única vez por processo do pool"""
+    global _contexto
+    _contexto = contexto
+
+
+def _selecionar_amostras_no_processo(ipes: np.ndarray) -> list:
+    return _selecionar_amostras(_contexto, ipes)
+
+
+class AnaliseSensibilidade:
+    """
+    Resultado da análise: uma linha por amostra de pesos e uma por cruzamento.
+
+    `pesos` (K×4), `cobertura` (cobertura de cada plano com os próprios
+    pesos), `cobertura_pesos_atuais` (o mesmo plano avaliado com os pesos da
+    amostra 0) e `cameras` são arrays por amostra. `frequencia` tem, por
+    cruzamento, a fração das amostras em que ele foi selecionado
+    (`freq_selecao`) e coberto (`freq_cobertura`), a variância da cobertura
+    (`var_cobertura`, Bernoulli) e se está no plano atual.
+    """
+
+    def __init__(self, pesos: np.ndarray, cobertura: np.ndarray, cobertura_pesos_atuais: np.ndarray,
+                 cameras: np.ndarray, frequencia: pd.DataFrame, segundos_ipe: float, segundos_selecao: float,
+                 processos: int):
+        self.pesos = pesos
+        self.cobertura = cobertura
+        self.cobertura_pesos_atuais = cobertura_pesos_atuais
+        self.cameras = cameras
+        self.frequencia = frequencia
+        self.segundos_ipe = segundos_ipe
+        self.segundos_selecao = segundos_selecao
+        self.processos = processos
+
+    def __len__(self) -> int:
+        return len(self.pesos)
+
+    def resumo(self) -> dict:
+        """Estatísticas da cobertura entre amostras e estabilidade dos pontos do plano atual"""
+        plano = self.frequencia.loc[self.frequencia['no_plano_atual'], 'freq_selecao']
+        return {
+            'amostras': len(self),
+            'cobertura_media': float(self.cobertura.mean()),
+            'cobertura_desvio': float(self.cobertura.std()),
+            'cobertura_min': float(self.cobertura.min()),
+            'cobertura_max': float(self.cobertura.max()),
+            'cobertura_pesos_atuais_media': float(self.cobertura_pesos_atuais.mean()),
+            'cobertura_pesos_atuais_desvio': float(self.cobertura_pesos_atuais.std()),
+            'pontos_plano_atual': int(len(plano)),
+            'pontos_estaveis': float((plano >= FREQUENCIA_ESTAVEL).mean()) if len(plano) else 0.0,
+            'frequencia_media_plano': float(plano.mean()) if len(plano) else 0.0,
+            'segundos_ipe': self.segundos_ipe,
+            'segundos_selecao': self.segundos_selecao,
+        }
+
+    def tabela_pesos(self) -> pd.DataFrame:
+        """Uma linha por amostra: pesos, cobertura e câmeras"""
+        tabela = pd.DataFrame(self.pesos, columns=[f'w_{eixo}' for eixo in EIXOS])
+        tabela['cobertura'] = self.cobertura
+        tabela['cobertura_pesos_atuais'] = self.cobertura_pesos_atuais
+        tabela['cameras'] = self.cameras
+        return tabela
+
+
+def selecionar_em_lote(modelo_ipe: ModeloIPE, matriz_pesos: np.ndarray, cobertura_frac: float, min_dist: float,
+                       max_cruzamentos: int = None, raio_cobertura: float = 50,
+                       limite_cobertura_logradouro: float = None,
+                       pontos_minimos: pd.DataFrame = None,
+                       max_cameras: int = None,
+                       logs: pd.DataFrame = None, modo: str = MODO_IPE,
+                       matriz_cobertura: MatrizCobertura = None,
+                       distancias_rede: DistanciasRede = None,
+                       processos: int = None) -> tuple:
+    """
+    Executa `filtrar_por_cobertura_e_distancia` para cada linha de
+    `matriz_pesos` (K×4), com o IPE de todas as linhas em um único produto
+    matricial e as seleções em um pool de `processos` (padrão: CPUs
+    disponíveis; com 1, no processo atual).
+
+    Devolve `(planos, ipes, segundos_ipe, segundos_selecao, processos)`, com
+    `planos[k] = (selecionados, cobertos, cobertura, total_cameras)` e
+    posições na ordem de `modelo_ipe.cruzamentos`.
+    """
+    inicio = time.perf_counter()
+    ipes = modelo_ipe.ipe_em_lote(matriz_pesos)
+    segundos_ipe = time.perf_counter() - inicio
+
+    contexto = {
+        'cruzamentos': modelo_ipe.cruzamentos[['id', 'cod_log1', 'cod_log2', 'lat', 'lon']],
+        'cobertura_frac': cobertura_frac, 'min_dist': min_dist, 'max_cruzamentos': max_cruzamentos,
+        'raio_cobertura': raio_cobertura, 'limite_cobertura_logradouro': limite_cobertura_logradouro,
+        'pontos_minimos': pontos_minimos, 'max_cameras': max_cameras, 'logs': logs, 'modo': modo,
+        'matriz_cobertura': matriz_cobertura, 'distancias_rede': distancias_rede,
+    }
+    blocos = [ipes[:, k:k + AMOSTRAS_POR_TAREFA] for k in range(0, ipes.shape[1], AMOSTRAS_POR_TAREFA)]
+
+    inicio = time.perf_counter()
+    processos = processos or os.cpu_count() or 1
+    if processos <= 1 or len(blocos) <= 1:
+        processos = 1
+        resultados = [_selecionar_amostras(contexto, bloco) for bloco in blocos]
+    else:
+        with ProcessPoolExecutor(max_workers=min(processos, len(blocos)), initializer=_iniciar_processo,
+                                 initargs=(contexto,)) as executor:
+            resultados = list(executor.map(_selecionar_amostras_no_processo, blocos))
+    planos = [plano for bloco in resultados for plano in bloco]
+    return planos, ipes, segundos_ipe, time.perf_counter() - inicio, processos
+
+
+def analisar_sensibilidade(modelo_ipe: ModeloIPE, pesos, cobertura_frac: float, min_dist: float,
+                           max_cruzamentos: int = None, raio_cobertura: float = 50,
+                           limite_cobertura_logradouro: float = None,
+                           pontos_minimos: pd.DataFrame = None,
+                           max_cameras: int = None,
+                           logs: pd.DataFrame = None, modo: str = MODO_IPE,
+                           matriz_cobertura: MatrizCobertura = None,
+                           distancias_rede: DistanciasRede = None,
+                           amostras: int = 200, amplitude: float = 0.10, semente: int = 0,
+                           processos: int = None) -> AnaliseSensibilidade:
+    """
+    Executa `filtrar_por_cobertura_e_distancia` (mesmos parâmetros) para
+    `amostras` vetores de pesos em torno de `pesos` (ver `amostrar_pesos`).
+
+    `processos` como em `selecionar_em_lote`.
+    """
+    if modelo_ipe is None or modelo_ipe.vazio:
+        raise ValueError("Modelo de IPE vazio: não há cruzamentos para analisar")
+
+    matriz_pesos = amostrar_pesos(pesos, max(int(amostras), 1), amplitude, semente)
+    por_amostra, ipes, segundos_ipe, segundos_selecao, processos = selecionar_em_lote(
+        modelo_ipe, matriz_pesos, cobertura_frac, min_dist, max_cruzamentos, raio_cobertura,
+        limite_cobertura_logradouro, pontos_minimos, max_cameras, logs, modo, matriz_cobertura, distancias_rede,
+        processos
+    )
+    cruzamentos = modelo_ipe.cruzamentos
+
+    # Cada plano também é avaliado com os pesos atuais (amostra 0)
+    n = len(cruzamentos)
+    usar_cobertura_ajustada = logs is not None and not logs.empty
+    base = cruzamentos[['id', 'cod_log1', 'cod_log2', 'lat', 'lon']].assign(ipe_cruz=ipes[:, 0])
+    tabela_base = TabelaCruzamentos(base)
+    vezes_selecionado = np.zeros(n, dtype=np.int64)
+    vezes_coberto = np.zeros(n, dtype=np.int64)
+    cobertura = np.empty(len(por_amostra))
+    cobertura_pesos_atuais = np.empty(len(por_amostra))
+    cameras = np.empty(len(por_amostra), dtype=np.int64)
+    for k, (selecionados, cobertos, cobertura_k, cameras_k) in enumerate(por_amostra):
+        vezes_selecionado[selecionados] += 1
+        coberto = np.zeros(n, dtype=bool)
+        coberto[cobertos] = True
+        vezes_coberto += coberto
+        cobertura[k], cameras[k] = cobertura_k, cameras_k
+        if usar_cobertura_ajustada:
+            cobertura_pesos_atuais[k] = tabela_base.cobertura_ajustada(coberto)
+        else:
+            cobertura_pesos_atuais[k] = tabela_base.ipe[coberto].sum() / tabela_base.ipe.sum()
+
+    qtd = len(por_amostra)
+    frequencia = cruzamentos[['id', 'log1', 'log2', 'lat', 'lon']].copy()
+    frequencia['ipe_cruz'] = ipes[:, 0]
+    frequencia['freq_selecao'] = vezes_selecionado / qtd
+    frequencia['freq_cobertura'] = vezes_coberto / qtd
+    frequencia['var_cobertura'] = frequencia['freq_cobertura'] * (1 - frequencia['freq_cobertura'])
+    no_plano_atual = np.zeros(n, dtype=bool)
+    no_plano_atual[por_amostra[0][0]] = True
+    frequencia['no_plano_atual'] = no_plano_atual
+
+    return AnaliseSensibilidade(matriz_pesos, cobertura, cobertura_pesos_atuais, cameras, frequencia,
+                                segundos_ipe, segundos_selecao, processos)
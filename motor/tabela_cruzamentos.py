@@ -0,0 +1,74 @@
+"""
+Cruzamentos do otimizador em arrays contíguos.
+
+Em vez de um dicionário por cruzamento e dicionários por `cod_log`, cada
+cruzamento é uma posição `0..n-1` (a ordem do DataFrame de IPE) com
+coordenadas, IPE e logradouros em arrays NumPy, e cada logradouro recebe um
+código inteiro denso `0..m-1`. A lista de cruzamentos de cada logradouro fica
+em formato CSR (`log_indptr`/`log_indices`).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class TabelaCruzamentos:
+    """
+    Colunas usadas pelo otimizador, indexadas por posição.
+
+    `log1`/`log2` são códigos densos de logradouro (`cods_log[k]` é o
+    `cod_log` original) e `ipe_por_log[k]` é o IPE somado dos cruzamentos do
+    logradouro `k`, contando duas vezes o cruzamento cujos dois lados são o
+    mesmo logradouro.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        n = len(df)
+        self.ids = df['id'].to_numpy()
+        self.lat = df['lat'].to_numpy(dtype=np.float64)
+        self.lon = df['lon'].to_numpy(dtype=np.float64)
+        self.ipe = df['ipe_cruz'].to_numpy(dtype=np.float64)
+
+        # Lados intercalados (log1, log2 de cada cruzamento): códigos na ordem de primeira aparição
+        lados = np.column_stack([df['cod_log1'].to_numpy(), df['cod_log2'].to_numpy()]).ravel()
+        codigos, self.cods_log = pd.factorize(lados, sort=False)
+        codigos = codigos.astype(np.int32)
+        m = len(self.cods_log)
+        self.log1 = np.ascontiguousarray(codigos[0::2])
+        self.log2 = np.ascontiguousarray(codigos[1::2])
+        self.ipe_por_log = np.bincount(codigos, weights=np.repeat(self.ipe, 2), minlength=m)
+
+        # CSR logradouro → cruzamentos (cada cruzamento uma vez por logradouro, em ordem de posição)
+        posicoes = np.repeat(np.arange(n, dtype=np.int32), 2)
+        distintos = np.ones(2 * n, dtype=bool)
+        distintos[1::2] = self.log1 != self.log2
+        logs, posicoes = codigos[distintos], posicoes[distintos]
+        ordem = np.lexsort((posicoes, logs))
+        self.log_indices = posicoes[ordem]
+        self.log_indptr = np.zeros(m + 1, dtype=np.int64)
+        np.cumsum(np.bincount(logs, minlength=m), out=self.log_indptr[1:])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def qtd_logradouros(self) -> int:
+        return len(self.cods_log)
+
+    def cruzamentos_do_logradouro(self, log: int) -> np.ndarray:
+        """Posições dos cruzamentos do logradouro de código denso `log`"""
+        return self.log_indices[self.log_indptr[log]:self.log_indptr[log + 1]]
+
+    def cobertura_ajustada(self, coberto: np.ndarray, limiar: float = 0.15) -> float:
+        """
+        Cobertura ajustada (regra de 15%) de um conjunto final de cobertos,
+        igual à do `AcumuladorCoberturaAjustada` ao fim da seleção.
+        """
+        pesos = np.where(np.repeat(coberto, 2), np.repeat(self.ipe, 2), 0.0)
+        lados = np.column_stack([self.log1, self.log2]).ravel()
+        coberto_log = np.bincount(lados, weights=pesos, minlength=self.qtd_logradouros)
+        total_log = self.ipe_por_log
+        atingiu = (total_log > 0) & (coberto_log >= limiar * total_log)
+        contribuicao = np.where(atingiu, total_log, np.where(total_log > 0, coberto_log, 0.0))
+        total = total_log.sum()
+        return float(contribuicao.sum() / total) if total > 0 else 0.0